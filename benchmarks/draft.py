@@ -0,0 +1,74 @@
+"""Micro-benchmark comparing per-interaction embed handling before and after the server-side draft.
+
+Before: every callback re-deserialized the embed from ``interaction.message.embeds[0]`` and mutated it.
+After: the callback mutates the :class:`core.EmbedDraft` owned by the editor and rebuilds the embed only if it changed.
+
+Run with ``python -m benchmarks.draft`` from the repository root."""
+import timeit
+import tracemalloc
+
+import discord
+
+from core import EmbedDraft
+
+ITERATIONS = 20_000
+
+
+def make_payload() -> dict:
+    """Returns the embed payload of a typical, fully populated editor message."""
+    embed = discord.Embed(title="Title", description="Description " * 40, color=0x5865F2)
+    for index in range(10):
+        embed.add_field(name=f"Field {index}", value="Value " * 20, inline=index % 2 == 0)
+    embed.set_thumbnail(url="https://example.com/thumbnail.png")
+    embed.set_image(url="https://example.com/image.png")
+    embed.set_footer(text="Footer", icon_url="https://example.com/footer.png")
+    embed.set_author(name="Author", icon_url="https://example.com/author.png")
+    return embed.to_dict()
+
+
+def before(payload: dict, title: str) -> discord.Embed:
+    """Old path: rebuild the embed from the message payload, then mutate it."""
+    embed = discord.Embed.from_dict(payload)
+    embed.title = title
+    return embed
+
+
+def after(draft: EmbedDraft, title: str) -> discord.Embed:
+    """New path: mutate the draft and only rebuild the embed if something changed."""
+    draft.title = title
+    return draft.to_embed()
+
+
+def measure(name: str, func, *args) -> None:
+    """Prints CPU time and peak allocated bytes per call of ``func``."""
+    seconds = timeit.timeit(lambda: func(*args), number=ITERATIONS)
+    total = 0
+    tracemalloc.start()
+    for _ in range(1000):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func(*args)
+        total += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    print(f"{name:<16} {seconds / ITERATIONS * 1e6:8.2f} µs/interaction  {total / 1000:8.0f} B/interaction")
+
+
+class Toggle(str):
+    """A title that differs from the previous one on every comparison, forcing a rebuild."""
+
+    def __eq__(self, other) -> bool:
+        return False
+
+    __hash__ = str.__hash__
+
+
+def main() -> None:
+    payload = make_payload()
+    draft = EmbedDraft.from_embed(discord.Embed.from_dict(payload))
+    measure("before", before, payload, "Title")
+    measure("after/unchanged", after, draft, "Title")
+    measure("after/changed", after, draft, Toggle("Title"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Memory benchmark comparing the draft's delta history against naive per-step snapshots over a long session.
+
+Before: an undo history would keep a ``to_dict()`` copy of the whole embed for every step.
+After: :class:`core.DraftHistory` keeps only the changed attributes and fields of every step.
+
+Run with ``python -m benchmarks.history`` from the repository root, see ``--help`` for the options."""
+import argparse
+import collections
+import copy
+import random
+import tracemalloc
+
+import discord
+
+from core import DraftHistory, EmbedDraft
+from .draft import make_payload
+
+
+def edit(draft: EmbedDraft, rng: random.Random, step: int) -> None:
+    """Applies one typical editor action to the draft."""
+    action = rng.randrange(4)
+    if action == 0:
+        draft.title = f"Title {step}"
+    elif action == 1:
+        draft.description = f"Description {step} " * rng.randint(1, 40)
+    elif action == 2 and draft.fields:
+        index = rng.randrange(len(draft.fields))
+        draft.set_field_at(index, f"Field {step}", "Value " * rng.randint(1, 20), bool(step % 2))
+    elif len(draft.fields) < 25:
+        draft.add_field(f"Field {step}", "Value " * rng.randint(1, 20), bool(step % 2))
+    else:
+        draft.remove_field(rng.randrange(len(draft.fields)))
+
+
+def snapshots(steps: int, depth: int, seed: int) -> int:
+    """Returns the bytes held by a history of whole-embed snapshots."""
+    rng = random.Random(seed)
+    draft = EmbedDraft.from_embed(discord.Embed.from_dict(make_payload()))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    history = collections.deque(maxlen=depth)
+    for step in range(steps):
+        history.append(copy.deepcopy(draft.to_dict()))
+        edit(draft, rng, step)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size
+
+
+def deltas(steps: int, depth: int, seed: int) -> int:
+    """Returns the bytes held by a delta history."""
+    rng = random.Random(seed)
+    draft = EmbedDraft.from_embed(discord.Embed.from_dict(make_payload()))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    draft.history = DraftHistory(depth)
+    for step in range(steps):
+        edit(draft, rng, step)
+        draft.history.checkpoint()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=1000, help="number of edits in the session")
+    parser.add_argument("--depth", type=int, default=50, help="number of steps kept for undo")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random edits")
+    args = parser.parse_args()
+    for name, func in (("snapshots", snapshots), ("deltas", deltas)):
+        size = func(args.steps, args.depth, args.seed)
+        print(f"{name:<10} {size / 1024:8.1f} KiB for {args.depth} steps")
+
+
+if __name__ == "__main__":
+    main()
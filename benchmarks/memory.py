@@ -0,0 +1,112 @@
+"""Memory benchmark comparing the gateway cache footprint of the bot's memory profiles.
+
+Every profile runs in a fresh process. The library's connection state is fed synthetic GUILD_CREATE payloads
+(containing the members the profile's intents would receive) and MESSAGE_CREATE events, then the steady-state RSS
+growth is reported per 1,000 guilds.
+
+Run with ``python -m benchmarks.memory`` from the repository root, see ``--help`` for the options."""
+import argparse
+import asyncio
+import gc
+import multiprocessing
+import os
+
+import discord
+
+from core.bot import profile_options
+
+PROFILES = ("default", "minimal")
+BOT_ID = 1
+
+
+def rss() -> int:
+    """Returns the resident set size of this process in bytes."""
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def user(user_id: int) -> dict:
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None}
+
+
+def member(user_id: int) -> dict:
+    return {"user": user(user_id), "roles": [], "joined_at": "2020-01-01T00:00:00+00:00", "deaf": False,
+            "mute": False}
+
+
+def guild_payload(guild_id: int, members: int, channels: int, roles: int, intents: discord.Intents) -> dict:
+    """Returns a GUILD_CREATE payload, including members only if the intents would receive them."""
+    member_ids = range(guild_id * 100_000, guild_id * 100_000 + members) if intents.members else ()
+    return {
+        "id": str(guild_id),
+        "name": f"Guild {guild_id}",
+        "owner_id": str(guild_id * 100_000),
+        "roles": [
+            {"id": str(guild_id + index), "name": f"Role {index}", "permissions": "0", "position": index,
+             "color": 0, "colors": {"primary_color": 0}, "hoist": False, "managed": False, "mentionable": False}
+            for index in range(roles)
+        ],
+        "channels": [
+            {"id": str(guild_id * 1000 + index), "type": 0, "name": f"channel-{index}", "position": index,
+             "permission_overwrites": []}
+            for index in range(channels)
+        ],
+        "members": [member(user_id) for user_id in member_ids] + [member(BOT_ID)],
+        "member_count": members + 1,
+        "emojis": [],
+        "features": [],
+        "large": members > 250
+    }
+
+
+def message_payload(message_id: int, guild_id: int, author_id: int) -> dict:
+    return {
+        "id": str(message_id), "channel_id": str(guild_id * 1000), "guild_id": str(guild_id),
+        "author": user(author_id), "member": {"roles": [], "joined_at": "2020-01-01T00:00:00+00:00"},
+        "content": "Hello world " * 10, "timestamp": "2020-01-01T00:00:00+00:00", "edited_timestamp": None,
+        "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+        "embeds": [], "pinned": False, "type": 0
+    }
+
+
+def measure(profile: str, guilds: int, members: int, channels: int, roles: int, messages: int) -> float:
+    """Returns the RSS growth in bytes per 1,000 guilds of a profile."""
+
+    async def run() -> int:
+        options = profile_options(profile)
+        bot = discord.Bot(**options)
+        state = bot._connection
+        state.user = discord.ClientUser(state=state, data=user(BOT_ID))
+        intents = options["intents"]
+        gc.collect()
+        before = rss()
+        message_ids = iter(range(10 ** 12, 10 ** 13))
+        for guild_id in range(1, guilds + 1):
+            state._add_guild_from_data(guild_payload(guild_id, members, channels, roles, intents))
+            if intents.guild_messages:
+                for index in range(messages):
+                    state.parse_message_create(message_payload(next(message_ids), guild_id, guild_id * 100_000 + index))
+        gc.collect()
+        return rss() - before
+
+    return asyncio.run(run()) / guilds * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=5000, help="number of guilds to simulate")
+    parser.add_argument("--members", type=int, default=200, help="members per guild, sent if the intents allow")
+    parser.add_argument("--channels", type=int, default=20, help="text channels per guild")
+    parser.add_argument("--roles", type=int, default=10, help="roles per guild")
+    parser.add_argument("--messages", type=int, default=5, help="messages received per guild")
+    args = parser.parse_args()
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for profile in PROFILES:
+            growth = pool.apply(measure, (profile, args.guilds, args.members, args.channels, args.roles,
+                                          args.messages))
+            print(f"{profile:<10} {growth / (1024 * 1024):8.2f} MiB RSS per 1,000 guilds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""Offline benchmark simulating concurrent editor sessions.
+
+Drives the ``Embeds`` cog, :class:`core.EmbedToolView` and the modals in ``core/general.py``, ``core/images.py``,
+``core/fields.py`` and ``core/options.py`` with fake interactions and a stub response layer, so no Discord
+connection is needed. Every session runs the same scripted sequence of clicks and modal submits and the harness
+reports per-callback latency percentiles, allocations and throughput.
+
+Run with ``python -m benchmarks.sessions`` from the repository root, see ``--help`` for the options."""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+import tracemalloc
+from collections import defaultdict
+
+import discord
+
+import core
+from cogs.threads import Embeds
+
+_ids = itertools.count(1_000_000)
+
+
+class FakeAsset:
+    """Stand-in for :class:`discord.Asset`."""
+
+    def __init__(self, key: str):
+        self.key: str = key
+        self.url: str = f"https://cdn.example.com/{key}.png"
+
+
+class FakeMember:
+    """Stand-in for :class:`discord.Member`, used for both the bot member and the editing user."""
+
+    def __init__(self, name: str):
+        self.id: int = next(_ids)
+        self.display_name: str = name
+        self.color: discord.Colour = discord.Colour(0x5865F2)
+        self.avatar: FakeAsset = FakeAsset(name)
+        self.display_avatar: FakeAsset = self.avatar
+
+
+class FakeMessage:
+    """Stand-in for :class:`discord.Message` sent by the bot."""
+
+    def __init__(self, channel: "FakeChannel", author: FakeMember, embeds: list[discord.Embed], latency: float):
+        self.id: int = next(_ids)
+        self.channel: FakeChannel = channel
+        self.author: FakeMember = author
+        self.embeds: list[discord.Embed] = embeds
+        self.edited_at = None
+        self.attachments: list = []
+        self.jump_url: str = f"https://discord.com/channels/{channel.guild.id}/{channel.id}/{self.id}"
+        self._latency: float = latency
+
+    async def edit(self, embed: discord.Embed | None = None, embeds: list[discord.Embed] | None = None,
+                   **kwargs) -> "FakeMessage":
+        await asyncio.sleep(self._latency)
+        if embed is not None:
+            self.embeds = [embed]
+        if embeds is not None:
+            self.embeds = embeds
+        return self
+
+
+class FakeChannel:
+    """Stand-in for a guild text channel."""
+
+    def __init__(self, guild: "FakeGuild", latency: float):
+        self.id: int = next(_ids)
+        self.guild: FakeGuild = guild
+        self._latency: float = latency
+
+    async def send(self, embed: discord.Embed | None = None, embeds: list[discord.Embed] | None = None,
+                   **kwargs) -> FakeMessage:
+        await asyncio.sleep(self._latency)
+        return FakeMessage(self, self.guild.me, embeds or ([embed] if embed else []), self._latency)
+
+
+class FakeGuild:
+    """Stand-in for :class:`discord.Guild`."""
+
+    def __init__(self, latency: float):
+        self.id: int = next(_ids)
+        self.me: FakeMember = FakeMember("EmbedTool")
+        self.channel: FakeChannel = FakeChannel(self, latency)
+
+
+class FakeResponse:
+    """Stub of :class:`discord.InteractionResponse` that only sleeps for the simulated API latency."""
+
+    def __init__(self, latency: float):
+        self._latency: float = latency
+        self._done: bool = False
+        self.modal: discord.ui.Modal | None = None
+        self.message: dict | None = None
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self) -> None:
+        if self._done:
+            raise discord.InteractionResponded(None)
+        self._done = True
+        await asyncio.sleep(self._latency)
+
+    async def defer(self, *args, **kwargs) -> None:
+        await self._respond()
+
+    async def send_message(self, *args, **kwargs) -> None:
+        await self._respond()
+        self.message = kwargs
+
+    async def edit_message(self, *args, **kwargs) -> None:
+        await self._respond()
+
+    async def send_modal(self, modal: discord.ui.Modal) -> None:
+        await self._respond()
+        self.modal = modal
+
+
+class FakeWebhook:
+    """Stub of :class:`discord.Webhook` used for interaction followups."""
+
+    def __init__(self, channel: FakeChannel, latency: float):
+        self._channel: FakeChannel = channel
+        self._latency: float = latency
+        self.view: discord.ui.View | None = None
+
+    async def send(self, *args, embed: discord.Embed | None = None, view: discord.ui.View | None = None,
+                   **kwargs) -> FakeMessage:
+        await asyncio.sleep(self._latency)
+        self.view = view
+        return FakeMessage(self._channel, self._channel.guild.me, [embed] if embed else [], self._latency)
+
+
+class FakeInteraction:
+    """Stand-in for :class:`discord.Interaction`."""
+
+    def __init__(self, bot: "FakeBot", guild: FakeGuild, user: FakeMember, values: list[str] | None = None):
+        self.id: int = next(_ids)
+        self.client: FakeBot = bot
+        self.guild: FakeGuild = guild
+        self.user: FakeMember = user
+        self.channel_id: int = guild.channel.id
+        self.data: dict = {"values": values or []}
+        self._cs_response: FakeResponse = FakeResponse(bot.latency)
+        self.followup: FakeWebhook = FakeWebhook(guild.channel, bot.latency)
+
+    @property
+    def response(self) -> FakeResponse:
+        return self._cs_response
+
+    async def edit_original_response(self, *args, **kwargs) -> None:
+        await asyncio.sleep(self.client.latency)
+
+    async def delete_original_response(self, *args, **kwargs) -> None:
+        await asyncio.sleep(self.client.latency)
+
+
+class FakeContext:
+    """Stand-in for :class:`discord.ApplicationContext`."""
+
+    def __init__(self, bot: "FakeBot", guild: FakeGuild, user: FakeMember):
+        self.bot: FakeBot = bot
+        self.guild: FakeGuild = guild
+        self.author: FakeMember = user
+        self.channel: FakeChannel = guild.channel
+        self.interaction: FakeInteraction = FakeInteraction(bot, guild, user)
+        self.view: core.EmbedToolView | None = None
+
+    async def respond(self, *args, view: discord.ui.View | None = None, **kwargs) -> None:
+        self.view = view
+        await self.interaction.response.send_message()
+
+    async def defer(self, *args, **kwargs) -> None:
+        await self.interaction.response.defer()
+
+
+class FakeValidator:
+    """Image validator that accepts every URL without a network request."""
+
+    def cached(self, url: str) -> None:
+        return None
+
+    async def validate(self, url: str) -> None:
+        return None
+
+
+class FakeBot:
+    """Stand-in for :class:`core.EmbedTool` with the real caches, registry and scheduler."""
+
+    def __init__(self, latency: float):
+        self.latency: float = latency
+        self.user: FakeMember = FakeMember("EmbedTool")
+        self.metrics: core.Metrics = core.Metrics()
+        self.tutorial_cache: core.TutorialEmbedCache = core.TutorialEmbedCache()
+        self.outbound: core.OutboundScheduler = core.OutboundScheduler({"channel": (1000.0, 50),
+                                                                         "webhook": (1000.0, 50)}, self.metrics)
+        self.message_cache: core.MessageCache = core.MessageCache()
+        self.embed_index: core.EmbedIndex = core.EmbedIndex()
+        self.session_registry: core.SessionRegistry = core.SessionRegistry()
+        self.session_store = None
+        self.image_validator: FakeValidator = FakeValidator()
+        self.preview_debounce: float = 0
+        self.auto_defer_budget: float = 2.0
+        self.history_depth: int = 50
+        self.session_idle_timeout: float = 900
+
+
+class Recorder:
+    """Collects the latency of every simulated callback."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+
+    async def run(self, name: str, coroutine) -> None:
+        started = time.perf_counter()
+        await coroutine
+        self.latencies[name].append(time.perf_counter() - started)
+
+    def report(self, elapsed: float) -> None:
+        total = sum(len(samples) for samples in self.latencies.values())
+        print(f"{'callback':<34} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for name, samples in sorted(self.latencies.items()):
+            samples.sort()
+            print(f"{name:<34} {len(samples):>7} {percentile(samples, 50):8.2f} {percentile(samples, 95):8.2f} "
+                  f"{percentile(samples, 99):8.2f} {samples[-1] * 1000:8.2f}")
+        print(f"\n{total} interactions in {elapsed:.2f} s, {total / elapsed:.0f} interactions/s")
+
+
+def percentile(samples: list[float], percent: int) -> float:
+    """Returns a percentile of sorted samples in milliseconds."""
+    if len(samples) == 1:
+        return samples[0] * 1000
+    return statistics.quantiles(samples, n=100, method="inclusive")[percent - 1] * 1000
+
+
+async def click(recorder: Recorder, bot: FakeBot, guild: FakeGuild, user: FakeMember, view: discord.ui.View,
+                name: str, values: list[str] | None = None) -> FakeInteraction:
+    """Clicks a button or select of a view, the same way the library dispatches component interactions."""
+    interaction = FakeInteraction(bot, guild, user, values)
+    item = getattr(view, name)
+    if values is not None:
+        item._selected_values = values
+        item._interaction = interaction
+    await view.interaction_check(interaction)
+    await recorder.run(f"{type(view).__name__}.{name}", item.callback(interaction))
+    return interaction
+
+
+async def submit(recorder: Recorder, bot: FakeBot, guild: FakeGuild, user: FakeMember, opened: FakeInteraction,
+                 *values: str) -> None:
+    """Fills in and submits the modal opened by an interaction."""
+    modal = opened.response.modal
+    for child, value in zip(modal.children, values):
+        child.value = value
+    await recorder.run(type(modal).__name__, modal.callback(FakeInteraction(bot, guild, user)))
+
+
+async def run_session(recorder: Recorder, bot: FakeBot, cog: Embeds, guild: FakeGuild) -> None:
+    """Runs the scripted click and modal sequence of a single editor session."""
+    user = FakeMember("User")
+    ctx = FakeContext(bot, guild, user)
+    await recorder.run("embed_send", Embeds.embed_send.callback(cog, ctx, None))
+    view = ctx.view
+
+    async def modal(button: str, *values: str) -> None:
+        await submit(recorder, bot, guild, user, await click(recorder, bot, guild, user, view, button), *values)
+
+    await modal("set_title", "Announcement")
+    await modal("set_description", "Lorem ipsum dolor sit amet. " * 20)
+    await modal("set_color", "#57F287")
+    for index in range(5):
+        await modal("add_field", f"Field {index}", "Value " * 30, "true")
+    opened = await click(recorder, bot, guild, user, view, "edit_field")
+    picked = await click(recorder, bot, guild, user, opened.followup.view, "edit_field", ["1"])
+    await submit(recorder, bot, guild, user, picked, "Edited field", "Edited value", "false")
+    opened = await click(recorder, bot, guild, user, view, "edit_field")
+    await submit(recorder, bot, guild, user,
+                 await click(recorder, bot, guild, user, opened.followup.view, "reorder_fields"), "5, 3")
+    opened = await click(recorder, bot, guild, user, view, "edit_field")
+    await submit(recorder, bot, guild, user,
+                 await click(recorder, bot, guild, user, opened.followup.view, "edit_all_fields"))
+    opened = await click(recorder, bot, guild, user, view, "remove_field")
+    await click(recorder, bot, guild, user, opened.followup.view, "remove_field", ["0", "2"])
+    await modal("set_thumbnail", "https://example.com/thumbnail.png")
+    await modal("set_image", "https://example.com/image.png")
+    await modal("set_footer_image", "https://example.com/footer.png")
+    await modal("set_footer_text", "Footer")
+    await click(recorder, bot, guild, user, view, "set_author")
+    await click(recorder, bot, guild, user, view, "set_timestamp")
+    await click(recorder, bot, guild, user, view, "new_embed")
+    await modal("set_title", "Second embed")
+    await click(recorder, bot, guild, user, view, "cycle_embed")
+    await click(recorder, bot, guild, user, view, "undo")
+    await click(recorder, bot, guild, user, view, "redo")
+    await click(recorder, bot, guild, user, view, "show_tutorial")
+    await click(recorder, bot, guild, user, view, "send_embed")
+
+
+async def main(sessions: int, guilds: int, latency: float, trace: bool) -> None:
+    bot = FakeBot(latency)
+    cog = Embeds(bot)
+    guild_pool = [FakeGuild(latency) for _ in range(guilds)]
+    recorder = Recorder()
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(run_session(recorder, bot, cog, guild_pool[index % guilds]) for index in range(sessions)))
+    elapsed = time.perf_counter() - started
+    recorder.report(elapsed)
+    if trace:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"allocations: {peak / sessions / 1024:.1f} KiB peak per session, "
+              f"{current / 1024:.1f} KiB retained after all sessions")
+    print(f"scheduler: {bot.outbound.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500, help="number of concurrent editor sessions")
+    parser.add_argument("--guilds", type=int, default=50, help="number of guilds the sessions are spread over")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated API latency in seconds")
+    parser.add_argument("--trace", action="store_true", help="trace allocations with tracemalloc (slower)")
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.guilds, args.latency, args.trace))
@@ -1,7 +1,26 @@
+import datetime
+import io
+
 import discord
 
 import core
 
+INTERACTION_TOKEN_LIFETIME: datetime.timedelta = datetime.timedelta(minutes=14)
+
+
+async def message_id_autocomplete(ctx: discord.AutocompleteContext) -> list[discord.OptionChoice]:
+    """Suggests recent embeds sent by the bot in the selected channel from the in-memory index.
+
+    Parameters
+    ------------
+    ctx: discord.AutocompleteContext
+        The context of the autocomplete interaction."""
+    channel_id = ctx.options.get("channel") or ctx.interaction.channel_id
+    return [
+        discord.OptionChoice(name=f"{title[:75]} ({message_id})", value=str(message_id))
+        for message_id, title in ctx.bot.embed_index.search(int(channel_id), ctx.value or "")
+    ]
+
 
 class Embeds(core.Cog):
     """Send or edit embeds!"""
@@ -12,6 +31,73 @@ class Embeds(core.Cog):
         default_member_permissions=discord.Permissions(administrator=True)
     )
 
+    async def resolve_message(self, ctx: discord.ApplicationContext, message_id: str,
+                              channel: discord.abc.GuildChannel | None) -> discord.Message | None:
+        """Returns the message a command option refers to, responding with an error if the reference is invalid.
+
+        Only channels of the current server that the invoking member can read are accepted, whatever guild ID a
+        message link contains.
+
+        Messages sent by the bot are served from and added to the message cache.
+
+        Parameters
+        ------------
+        ctx: discord.ApplicationContext
+            The context used for command invocation.
+        message_id: str
+            The ID or link of the message.
+        channel: discord.abc.GuildChannel | None
+            The channel of the message, defaults to the current channel. Ignored if a message link is given."""
+        try:
+            guild_id, channel_id, message_id = core.parse_message_reference(message_id)
+        except ValueError:
+            await ctx.respond(embed=discord.Embed(
+                title="Error",
+                description="Please enter a valid message ID or link!",
+                color=discord.Color.red()
+            ), ephemeral=True)
+            return None
+        if guild_id is not None and guild_id != ctx.guild.id:
+            await ctx.respond(embed=discord.Embed(
+                title="Error",
+                description="Can't use messages from other servers!",
+                color=discord.Color.red()
+            ), ephemeral=True)
+            return None
+        if channel_id is not None:
+            channel = ctx.guild.get_channel_or_thread(channel_id)
+            if channel is None:
+                try:
+                    channel = await self.bot.fetch_channel(channel_id)
+                except (discord.NotFound, discord.Forbidden):
+                    channel = None
+        elif channel is None:
+            channel = ctx.channel
+        if channel is None or getattr(channel, "guild", None) is None or channel.guild.id != ctx.guild.id:
+            await ctx.respond(embed=discord.Embed(
+                title="Error",
+                description="Can't use messages from other servers!",
+                color=discord.Color.red()
+            ), ephemeral=True)
+            return None
+        permissions = channel.permissions_for(ctx.author)
+        if not permissions.read_messages or not permissions.read_message_history:
+            await ctx.respond(embed=discord.Embed(
+                title="Error",
+                description="You can't read the messages of this channel!",
+                color=discord.Color.red()
+            ), ephemeral=True)
+            return None
+        message = self.bot.message_cache.get(message_id)
+        if message is None or message.channel.id != channel.id:
+            with self.bot.metrics.timer("fetch_message"):
+                message = await channel.fetch_message(message_id)
+            if message.author == self.bot.user:
+                self.bot.message_cache.put(message)
+                if message.embeds:
+                    self.bot.embed_index.add(message)
+        return message
+
     @embed_group.command(name="send", description="Sends an embed to the channel specified!")
     async def embed_send(self, ctx: discord.ApplicationContext,
                          channel: discord.Option(discord.abc.GuildChannel, "Please enter the channel!",
@@ -31,14 +117,22 @@ class Embeds(core.Cog):
             description='Use the buttons below to edit the embed.\nPress "Tutorial" to hide/show the embed below.',
             color=ctx.guild.me.color
         )
-        tutorial_embed = core.get_tutorial_embed(ctx=ctx)
-        embed_tool = core.EmbedToolView(channel_or_message=channel, is_new_embed=True, tutorial_embed=tutorial_embed,
-                                        ctx=ctx)
+        tutorial_embed = self.bot.tutorial_cache.get(ctx)
+        embed_tool = core.EmbedToolView(channel_or_message=channel, is_new_embed=True, user_embeds=[user_embed],
+                                        tutorial_embed=tutorial_embed, user_id=ctx.author.id,
+                                        history_depth=self.bot.history_depth,
+                                        store=self.bot.session_store,
+                                        idle_timeout=self.bot.session_idle_timeout)
+        embed_tool.last_interaction = ctx.interaction
+        self.bot.session_registry.add(embed_tool)
         await ctx.respond(embeds=[user_embed, tutorial_embed], view=embed_tool, ephemeral=True)
+        if embed_tool.store is not None:
+            embed_tool.detach()
 
     @embed_group.command(name="edit", description="Edits an embed in the channel specified!")
     async def embed_edit(self, ctx: discord.ApplicationContext,
-                         message_id: discord.Option(str, "Please enter the message ID!", required=True),
+                         message_id: discord.Option(str, "Please enter the message ID or link!", required=True,
+                                                    autocomplete=message_id_autocomplete),
                          channel: discord.Option(discord.abc.GuildChannel, "Please enter the channel!",
                                                  required=False)):
         """Edits an embed in the channel specified!
@@ -48,24 +142,309 @@ class Embeds(core.Cog):
         ctx: discord.ApplicationContext
             The context used for command invocation.
         message_id: str
-            The ID of the message to edit.
+            The ID or link of the message to edit.
         channel: discord.abc.GuildChannel
-            The channel to edit the embed in."""
+            The channel to edit the embed in. Ignored if a message link is given."""
+        async with core.deadline_guard(ctx.interaction, self.bot.auto_defer_budget):
+            message = await self.resolve_message(ctx, message_id, channel)
+            if message is None:
+                return
+            if message.author != self.bot.user:
+                await ctx.respond(embed=discord.Embed(
+                    title="Error",
+                    description="Can't edit this embed as it wasn't sent by me!",
+                    color=discord.Color.red()
+                ), ephemeral=True)
+                return
+            if not message.embeds:
+                await ctx.respond(embed=discord.Embed(
+                    title="Error",
+                    description="This message doesn't have any embeds!",
+                    color=discord.Color.red()
+                ), ephemeral=True)
+                return
+            tutorial_embed = self.bot.tutorial_cache.get(ctx)
+            embed_tool = core.EmbedToolView(channel_or_message=message, is_new_embed=False, user_embeds=message.embeds,
+                                            tutorial_embed=tutorial_embed, user_id=ctx.author.id,
+                                            history_depth=self.bot.history_depth,
+                                            store=self.bot.session_store,
+                                            idle_timeout=self.bot.session_idle_timeout)
+            embed_tool.last_interaction = ctx.interaction
+            self.bot.session_registry.add(embed_tool)
+            await ctx.respond(embeds=[embed_tool.draft.to_embed(), tutorial_embed], view=embed_tool, ephemeral=True)
+            if embed_tool.store is not None:
+                embed_tool.detach()
+
+    @embed_group.command(name="export", description="Exports the embeds of a message as JSON!")
+    async def embed_export(self, ctx: discord.ApplicationContext,
+                           message_id: discord.Option(str, "Please enter the message ID or link!", required=True,
+                                                      autocomplete=message_id_autocomplete),
+                           channel: discord.Option(discord.abc.GuildChannel, "Please enter the channel!",
+                                                   required=False)):
+        """Exports the embeds of a message as JSON!
+
+        Parameters
+        ------------
+        ctx: discord.ApplicationContext
+            The context used for command invocation.
+        message_id: str
+            The ID or link of the message to export.
+        channel: discord.abc.GuildChannel
+            The channel of the message. Ignored if a message link is given."""
+        async with core.deadline_guard(ctx.interaction, self.bot.auto_defer_budget):
+            message = await self.resolve_message(ctx, message_id, channel)
+            if message is None:
+                return
+            if not message.embeds:
+                await ctx.respond(embed=discord.Embed(
+                    title="Error",
+                    description="This message doesn't have any embeds!",
+                    color=discord.Color.red()
+                ), ephemeral=True)
+                return
+            file = discord.File(io.BytesIO(core.export_embeds(message.embeds)), filename=f"embeds-{message.id}.json")
+            await ctx.respond(embed=discord.Embed(
+                title="Embeds Exported",
+                description=f"Use `/embed import` with this file to recreate the [embeds]({message.jump_url}).",
+                color=discord.Color.green()
+            ), file=file, ephemeral=True)
+
+    @embed_group.command(name="import", description="Opens the editor with embeds imported from JSON!")
+    async def embed_import(self, ctx: discord.ApplicationContext,
+                           file: discord.Option(discord.Attachment, "Please upload the JSON file!", required=False),
+                           payload: discord.Option(str, "Or paste the JSON!", required=False),
+                           channel: discord.Option(discord.abc.GuildChannel, "Please enter the channel!",
+                                                   required=False)):
+        """Opens the editor with embeds imported from JSON!
+
+        Parameters
+        ------------
+        ctx: discord.ApplicationContext
+            The context used for command invocation.
+        file: discord.Attachment
+            The JSON file to import.
+        payload: str
+            The JSON to import, used if no file is given.
+        channel: discord.abc.GuildChannel
+            The channel to send the embeds to."""
+        if file is not None and file.size > core.MAX_IMPORT_SIZE:
+            error = f"The JSON can't be larger than {core.MAX_IMPORT_SIZE // 1024} KiB."
+        elif file is None and payload is None:
+            error = "Please upload a JSON file or paste the JSON!"
+        else:
+            try:
+                drafts = core.import_drafts(await file.read() if file is not None else payload)
+            except ValueError as e:
+                error = str(e)
+            else:
+                error = None
+        if error is not None:
+            await ctx.respond(embed=discord.Embed(
+                title="Error",
+                description=error,
+                color=discord.Color.red()
+            ), ephemeral=True)
+            return
         if channel is None:
             channel = ctx.channel
-        message = await channel.fetch_message(message_id)
-        if message.author != self.bot.user:
+        tutorial_embed = self.bot.tutorial_cache.get(ctx)
+        embed_tool = core.EmbedToolView(channel_or_message=channel, is_new_embed=True, user_embeds=[discord.Embed()],
+                                        tutorial_embed=tutorial_embed, user_id=ctx.author.id,
+                                        history_depth=self.bot.history_depth,
+                                        store=self.bot.session_store,
+                                        idle_timeout=self.bot.session_idle_timeout)
+        embed_tool.load(drafts)
+        embed_tool.last_interaction = ctx.interaction
+        self.bot.session_registry.add(embed_tool)
+        await ctx.respond(embeds=[embed_tool.draft.to_embed(), tutorial_embed], view=embed_tool, ephemeral=True)
+        if embed_tool.store is not None:
+            embed_tool.detach()
+
+    @embed_group.command(name="upload", description="Uploads an image for the embed you are editing!")
+    async def embed_upload(self, ctx: discord.ApplicationContext,
+                           image: discord.Option(discord.Attachment, "Please upload the image!", required=True),
+                           target: discord.Option(str, "Please choose where to use the image!", required=True,
+                                                  choices=[
+                                                      discord.OptionChoice(name="Thumbnail", value="thumbnail_url"),
+                                                      discord.OptionChoice(name="Image", value="image_url"),
+                                                      discord.OptionChoice(name="Footer Icon",
+                                                                           value="footer_icon_url")
+                                                  ])):
+        """Uploads an image for the embed you are editing!
+
+        Parameters
+        ------------
+        ctx: discord.ApplicationContext
+            The context used for command invocation.
+        image: discord.Attachment
+            The image to resize and use.
+        target: str
+            The draft attribute to set the image as."""
+        processor = self.bot.image_processor
+        if self.bot.asset_channel_id is None:
+            # Attachment URLs of ephemeral messages expire, an asset channel keeps the uploaded files available.
+            error = "Image uploads are not available on this bot."
+        else:
+            error = processor.check(image)
+        if error is not None:
             await ctx.respond(embed=discord.Embed(
                 title="Error",
-                description="Can't edit this embed as it wasn't sent by me!",
+                description=error,
                 color=discord.Color.red()
             ), ephemeral=True)
             return
-        user_embed = message.embeds[0]
-        tutorial_embed = core.get_tutorial_embed(ctx=ctx)
-        embed_tool = core.EmbedToolView(channel_or_message=message, is_new_embed=False, tutorial_embed=tutorial_embed,
-                                        ctx=ctx)
-        await ctx.respond(embeds=[user_embed, tutorial_embed], view=embed_tool, ephemeral=True)
+        await ctx.defer(ephemeral=True)
+
+        async def upload(file: discord.File) -> str:
+            asset_channel = self.bot.get_channel(self.bot.asset_channel_id) \
+                or await self.bot.fetch_channel(self.bot.asset_channel_id)
+            message = await self.bot.outbound.submit(("channel", asset_channel.id),
+                                                     lambda: asset_channel.send(file=file))
+            return message.attachments[0].url
+
+        try:
+            url = await processor.process(image, target, upload)
+        except ValueError as e:
+            await ctx.followup.send(embed=discord.Embed(
+                title="Error",
+                description=str(e),
+                color=discord.Color.red()
+            ), ephemeral=True)
+            return
+        except discord.HTTPException:
+            await ctx.followup.send(embed=discord.Embed(
+                title="Error",
+                description="The image could not be uploaded, please try again later.",
+                color=discord.Color.red()
+            ), ephemeral=True)
+            return
+        if self.bot.session_store is not None:
+            session_id = self.bot.session_store.latest_session(ctx.author.id)
+            editor = None if session_id is None \
+                else await core.EmbedToolView.live_session(self.bot, ctx.interaction, session_id)
+        else:
+            editor = self.bot.session_registry.latest(core.EmbedToolView, user_id=ctx.author.id)
+        if editor is None:
+            await ctx.followup.send(embed=discord.Embed(
+                title="Image Uploaded",
+                description=f"No open editor found, use this URL in the image modal:\n{url}",
+                color=discord.Color.green()
+            ), ephemeral=True)
+            return
+        if target == "footer_icon_url" and not editor.draft.footer_text:
+            editor.draft.footer_text = "⠀"
+        setattr(editor.draft, target, url)
+        editor.save()
+        preview_updated = False
+        last_interaction = editor.last_interaction
+        if last_interaction is not None \
+                and discord.utils.utcnow() - last_interaction.created_at < INTERACTION_TOKEN_LIFETIME:
+            try:
+                await editor.update_preview(last_interaction)
+                preview_updated = True
+            except discord.HTTPException:
+                pass
+        description = "The image was added to the embed you are editing."
+        if not preview_updated:
+            description += " The preview of the editor shows it after your next change."
+        await ctx.followup.send(embed=discord.Embed(
+            title="Image Uploaded",
+            description=description,
+            color=discord.Color.green()
+        ), ephemeral=True)
+
+    @embed_group.command(name="stats", description="Shows runtime statistics of the bot!")
+    async def embed_stats(self, ctx: discord.ApplicationContext):
+        """Shows runtime statistics of the bot!
+
+        Parameters
+        ------------
+        ctx: discord.ApplicationContext
+            The context used for command invocation."""
+        if not await self.bot.is_owner(ctx.author):
+            await ctx.respond(embed=discord.Embed(
+                title="Error",
+                description="Only the owner of the bot can view its statistics!",
+                color=discord.Color.red()
+            ), ephemeral=True)
+            return
+        registry = self.bot.session_registry.stats()
+        outbound = self.bot.outbound.stats()
+        stats_embed = discord.Embed(title="Statistics", color=discord.Color.green(), timestamp=discord.utils.utcnow())
+        stats_embed.add_field(name="Sessions", value=(
+            f"{registry['sessions']} live, {registry['estimated_bytes'] / 1024:.0f} KiB\n"
+            f"{registry['evictions']} evicted"
+        ))
+        stats_embed.add_field(name="Outbound", value=(
+            f"{outbound['queue_depth']} queued, {outbound['completed']} sent, {outbound['failed']} failed\n"
+            f"{outbound['coalesced']} coalesced, max wait {outbound['max_wait'] * 1000:.0f} ms"
+        ))
+        stats_embed.add_field(name="Caches", value=(
+            f"Messages: {len(self.bot.message_cache)}, {self.bot.message_cache.hit_rate:.0%} hits\n"
+            f"Tutorials: {len(self.bot.tutorial_cache)}, {self.bot.tutorial_cache.hit_rate:.0%} hits\n"
+            f"Embed index: {len(self.bot.embed_index)} messages"
+        ))
+        slowest = self.bot.metrics.slowest("callback_seconds", "callback")
+        stats_embed.add_field(name="Slowest Callbacks (p95)", value="\n".join(
+            f"{name}: ≤{histogram.quantile(0.95) * 1000:.0f} ms ({histogram.count} calls)"
+            for name, histogram in slowest
+        ) or "No callbacks yet.", inline=False)
+        await ctx.respond(embed=stats_embed, ephemeral=True)
+
+    @core.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        """Rehydrates persisted editor sessions that have no live view."""
+        if self.bot.session_store is None or interaction.type is not discord.InteractionType.component:
+            return
+        if interaction.custom_id.startswith(core.EmbedToolView.SESSION_PREFIX):
+            await core.EmbedToolView.dispatch_session(self.bot, interaction)
+
+    @core.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """Caches embeds sent by the bot."""
+        if message.author == self.bot.user and message.embeds:
+            self.bot.message_cache.put(message)
+            self.bot.embed_index.add(message)
+
+    @core.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        """Drops cached messages that were edited elsewhere."""
+        self.bot.message_cache.on_raw_edit(payload)
+
+    @core.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """Drops deleted messages from the cache and index."""
+        self.bot.message_cache.invalidate(payload.message_id)
+        self.bot.embed_index.remove(payload.channel_id, payload.message_id)
+
+    @core.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        """Drops bulk deleted messages from the cache and index."""
+        for message_id in payload.message_ids:
+            self.bot.message_cache.invalidate(message_id)
+            self.bot.embed_index.remove(payload.channel_id, message_id)
+
+    @core.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Invalidates the cached tutorial embed when the bot's color or avatar changes."""
+        if after.id == self.bot.user.id:
+            self.bot.tutorial_cache.invalidate(after.guild.id)
+
+    @core.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        """Invalidates the cached tutorial embed when one of the bot's roles changes color."""
+        if before.color != after.color and after in after.guild.me.roles:
+            self.bot.tutorial_cache.invalidate(after.guild.id)
+
+    @core.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        """Invalidates the cached tutorial embed when the guild changes."""
+        self.bot.tutorial_cache.invalidate(after.id)
+
+    @core.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        """Drops the cached tutorial embed of a guild the bot left."""
+        self.bot.tutorial_cache.invalidate(guild.id)
 
 
 def setup(bot):
@@ -1,13 +1,46 @@
+from . import startup
+
 from discord.ext import commands
 
-from .bot import EmbedTool
-from .embedTool import EmbedToolView, get_tutorial_embed
+from .bot import AutoShardedEmbedTool, EmbedTool
+from .broadcast import Broadcaster, BroadcastView
+from .draft import DraftField, DraftHistory, EmbedDraft
+from .embedTool import EmbedToolView, TutorialEmbedCache, get_tutorial_embed
+from .messages import EmbedIndex, MessageCache, parse_message_reference
+from .metrics import Metrics, instrumented
+from .scheduler import PREVIEW, PUBLISH, OutboundScheduler
+from .serialization import MAX_IMPORT_SIZE, export_embeds, import_drafts
+from .sessions import SessionRegistry, SessionStore, TrackedView
+from .watchdog import ResponseProxy, deadline_guard
 
 __all__ = (
+    "AutoShardedEmbedTool",
+    "BroadcastView",
+    "Broadcaster",
     "Cog",
+    "DraftField",
+    "DraftHistory",
+    "EmbedDraft",
+    "EmbedIndex",
     "EmbedTool",
     "EmbedToolView",
-    "get_tutorial_embed"
+    "MAX_IMPORT_SIZE",
+    "MessageCache",
+    "Metrics",
+    "OutboundScheduler",
+    "PREVIEW",
+    "PUBLISH",
+    "ResponseProxy",
+    "SessionRegistry",
+    "SessionStore",
+    "TrackedView",
+    "TutorialEmbedCache",
+    "deadline_guard",
+    "export_embeds",
+    "get_tutorial_embed",
+    "import_drafts",
+    "instrumented",
+    "parse_message_reference"
 )
 
 
@@ -1,44 +1,242 @@
+import importlib
 import os
 import platform
+import time
 import traceback
 
 import discord
 
+from .broadcast import Broadcaster
+from .cluster import IdentifyCoordinator
+from .embedTool import TutorialEmbedCache
+from .images import ImageProcessor, ImageValidator
+from .messages import EmbedIndex, MessageCache
+from .metrics import Metrics
+from .profiler import SlowInteractionProfiler
+from .scheduler import OutboundScheduler
+from .sessions import SessionRegistry, SessionStore
+from .startup import IMPORT_STARTED, PROFILE_STARTUP
+from .sync import CommandSyncCache, command_tree_hash
+
+
+def profile_options(profile: str) -> dict:
+    """Returns the gateway and cache options of a memory profile.
+
+    ``default`` keeps the library defaults. ``minimal`` only subscribes to guild and guild message events, caches
+    no members except the bot itself and disables the library's message cache, relying on the bot's own
+    :class:`MessageCache` of messages it sent instead.
+
+    Parameters
+    ------------
+    profile: str
+        The name of the profile, ``default`` or ``minimal``."""
+    if profile == "default":
+        return {"intents": discord.Intents.default()}
+    if profile == "minimal":
+        return {
+            "intents": discord.Intents(guilds=True, guild_messages=True),
+            "member_cache_flags": discord.MemberCacheFlags.none(),
+            "max_messages": None,
+            "chunk_guilds_at_startup": False
+        }
+    raise ValueError(f"Unknown profile {profile!r}, expected 'default' or 'minimal'")
+
 
 class EmbedTool(discord.Bot):
     on_ready_fired: bool = False
+    on_connect_fired: bool = False
+
+    def __init__(self, cluster_id: int | None = None, **kwargs):
+        """Initializes the bot and loads all cogs.
 
-    def __init__(self):
+        Parameters
+        ------------
+        cluster_id: int | None
+            The ID of the cluster this process runs, if started by the cluster launcher.
+        **kwargs
+            Passed to the library's bot, e.g. ``shard_ids`` and ``shard_count``."""
+        self.cluster_id: int | None = cluster_id
+        self.started_at: float = time.perf_counter()
+        self.startup_timings: dict[str, float | None] = {"import": self.started_at - IMPORT_STARTED}
+        self.extension_timings: dict[str, tuple[float, float]] = {}
         super().__init__(
             activity=discord.Activity(
                 type=discord.ActivityType.listening, name=f"/embed"
             ),
             help_command=None,
             owner_ids=[672768917885681678],
+            **{**profile_options(os.environ.get("EMBED_TOOL_PROFILE", "default")), **kwargs}
+        )
+        self.metrics: Metrics = Metrics()
+        self.profiler: SlowInteractionProfiler | None = None
+        if slow_threshold := os.environ.get("EMBED_TOOL_SLOW_INTERACTION_THRESHOLD"):
+            self.profiler = SlowInteractionProfiler(
+                os.environ.get("EMBED_TOOL_PROFILE_DIR", "profiles"), threshold=float(slow_threshold)
+            )
+        self.tutorial_cache: TutorialEmbedCache = TutorialEmbedCache()
+        self.outbound: OutboundScheduler = OutboundScheduler(metrics=self.metrics)
+        self.message_cache: MessageCache = MessageCache()
+        self._image_validator: ImageValidator | None = None
+        self._image_processor: ImageProcessor | None = None
+        self.asset_channel_id: int | None = int(os.environ["EMBED_TOOL_ASSET_CHANNEL"]) \
+            if os.environ.get("EMBED_TOOL_ASSET_CHANNEL") else None
+        self.auto_defer_budget: float = float(os.environ.get("EMBED_TOOL_AUTO_DEFER", 2.0))
+        self.history_depth: int = int(os.environ.get("EMBED_TOOL_HISTORY_DEPTH", 50))
+        self.preview_debounce: float = float(os.environ.get("EMBED_TOOL_PREVIEW_DEBOUNCE", 0))
+        self.session_registry: SessionRegistry = SessionRegistry(
+            max_sessions=int(os.environ.get("EMBED_TOOL_MAX_SESSIONS", 5000)),
+            max_bytes=int(os.environ.get("EMBED_TOOL_MAX_SESSION_BYTES", 64 * 1024 * 1024))
+        )
+        self.session_idle_timeout: float = float(os.environ.get("EMBED_TOOL_SESSION_IDLE", 900))
+        self.session_store: SessionStore | None = None
+        if session_db := os.environ.get("EMBED_TOOL_SESSION_DB"):
+            self.session_store = SessionStore(session_db)
+            self.session_store.purge()
+        self.embed_index: EmbedIndex = EmbedIndex(store=self.session_store)
+        self.embed_index.warm()
+        self.broadcaster: Broadcaster = Broadcaster(
+            self, concurrency=int(os.environ.get("EMBED_TOOL_BROADCAST_CONCURRENCY", 5))
+        )
+
+        self.metrics.gauge("active_sessions", lambda: len(self.session_registry))
+        self.metrics.gauge("session_estimated_bytes", lambda: self.session_registry.total_bytes)
+        self.metrics.gauge("outbound_queue_depth", lambda: self.outbound.queue_depth)
+        self.metrics.gauge("message_cache_size", lambda: len(self.message_cache))
+        self.metrics.gauge("message_cache_hit_rate", lambda: self.message_cache.hit_rate)
+        self.metrics.gauge("tutorial_cache_hit_rate", lambda: self.tutorial_cache.hit_rate)
+        self.metrics.gauge("embed_index_size", lambda: len(self.embed_index))
+
+        self.command_sync_cache: CommandSyncCache = CommandSyncCache(
+            os.environ.get("EMBED_TOOL_COMMAND_CACHE", ".command_cache.json")
         )
 
+        started_at = time.perf_counter()
         for filename in os.listdir("cogs"):
             if filename.endswith(".py"):
                 self.load_cog(f"cogs.{filename[:-3]}")
+        self.startup_timings["cogs"] = time.perf_counter() - started_at
+
+    @property
+    def image_validator(self) -> ImageValidator:
+        """The shared image URL validator, created on first use."""
+        if self._image_validator is None:
+            self._image_validator = ImageValidator()
+        return self._image_validator
+
+    @property
+    def image_processor(self) -> ImageProcessor:
+        """The shared uploaded image processor, created on first use."""
+        if self._image_processor is None:
+            self._image_processor = ImageProcessor()
+        return self._image_processor
 
     def load_cog(self, cog: str) -> None:
         try:
+            started_at = time.perf_counter()
+            importlib.import_module(cog)
+            imported_at = time.perf_counter()
             self.load_extension(cog)
+            self.extension_timings[cog] = (imported_at - started_at, time.perf_counter() - imported_at)
         except Exception as e:
             e = getattr(e, "original", e)
             print("".join(traceback.format_exception(type(e), e, e.__traceback__)))
 
+    async def on_connect(self):
+        if self.on_connect_fired:
+            return
+        self.on_connect_fired = True
+        self.startup_timings["connect"] = time.perf_counter() - self.started_at
+        if metrics_port := os.environ.get("EMBED_TOOL_METRICS_PORT"):
+            await self.metrics.serve(os.environ.get("EMBED_TOOL_METRICS_HOST", "127.0.0.1"),
+                                     int(metrics_port) + (self.cluster_id or 0))
+
+        started_at = time.perf_counter()
+        command_hash = command_tree_hash(self.pending_application_commands, self.user.id)
+        if self.command_sync_cache.restore(self, command_hash):
+            self.startup_timings["command_sync"] = None
+            return
+        await self.sync_commands()
+        self.command_sync_cache.save(self, command_hash)
+        self.startup_timings["command_sync"] = time.perf_counter() - started_at
+
+    async def on_unknown_application_command(self, interaction: discord.Interaction):
+        self.command_sync_cache.clear()
+
     async def on_ready(self):
         if self.on_ready_fired:
             return
         self.on_ready_fired = True
+        self.startup_timings["ready"] = time.perf_counter() - self.started_at
 
         msg = f"""{self.user.name} is online now!
             BotID: {self.user.id}
             Ping: {round(self.latency * 1000)} ms
             Python Version: {platform.python_version()}
-            PyCord API version: {discord.__version__}"""
+            PyCord API version: {discord.__version__}
+            Startup: {self.format_startup_timings()}"""
+        if self.cluster_id is not None:
+            msg += f"\n            Cluster: {self.cluster_id}"
+        for line in self.shard_summary():
+            msg += f"\n            {line}"
+        if PROFILE_STARTUP:
+            for cog, (import_time, setup_time) in self.extension_timings.items():
+                msg += f"\n            {cog}: import {import_time * 1000:.1f} ms, setup {setup_time * 1000:.1f} ms"
         print(f"\n\n{msg}\n\n")
+        if resumed := await self.broadcaster.resume():
+            print(f"Resumed {resumed} unfinished broadcasts")
+
+    def shard_summary(self) -> list[str]:
+        """Returns one line per shard with its latency and guild count."""
+        return []
+
+    def format_startup_timings(self) -> str:
+        """Returns the recorded startup phases in a human-readable form."""
+        phases = []
+        for phase, duration in self.startup_timings.items():
+            phases.append(f"{phase} skipped" if duration is None else f"{phase} {round(duration * 1000)} ms")
+        return ", ".join(phases)
+
+    async def close(self):
+        await super().close()
+        await self.metrics.close()
+        if self._image_validator is not None:
+            await self._image_validator.close()
+        if self._image_processor is not None:
+            self._image_processor.close()
+        if self.session_store is not None:
+            self.session_store.close()
 
     def run(self, token: str):
         super().run(os.environ.get(token))
+
+
+class AutoShardedEmbedTool(EmbedTool, discord.AutoShardedBot):
+    """EmbedTool running multiple shards in one process, so a slow shard only delays its own guilds."""
+
+    def __init__(self, identify_coordinator: IdentifyCoordinator | None = None, **kwargs):
+        """Initializes the bot.
+
+        Parameters
+        ------------
+        identify_coordinator: IdentifyCoordinator | None
+            Coordinates the identifies with the other cluster processes, if started by the cluster launcher.
+        **kwargs
+            Passed to :class:`EmbedTool`."""
+        self.identify_coordinator: IdentifyCoordinator | None = identify_coordinator
+        super().__init__(**kwargs)
+
+    async def before_identify_hook(self, shard_id: int | None, *, initial: bool = False) -> None:
+        if self.identify_coordinator is None:
+            await super().before_identify_hook(shard_id, initial=initial)
+            return
+        await self.identify_coordinator.wait(shard_id or 0)
+
+    def shard_summary(self) -> list[str]:
+        """Returns one line per shard with its latency and guild count."""
+        guild_counts = dict.fromkeys(self.shards, 0)
+        for guild in self.guilds:
+            guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+        return [
+            f"Shard {shard_id}: {round(latency * 1000)} ms, {guild_counts.get(shard_id, 0)} guilds"
+            for shard_id, latency in sorted(self.latencies)
+        ]
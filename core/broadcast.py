@@ -0,0 +1,140 @@
+import asyncio
+import secrets
+from typing import TYPE_CHECKING
+
+import discord
+
+from .metrics import instrumented
+from .sessions import TrackedView
+
+if TYPE_CHECKING:
+    from .bot import EmbedTool
+    from .embedTool import EmbedToolView
+
+
+class Broadcaster:
+    """Sends the same embeds to many channels with bounded concurrency.
+
+    Every send goes through the bot's outbound scheduler, so per-channel rate limits are respected. If the bot has a
+    session store, the progress of each broadcast is persisted and unfinished broadcasts are resumed on restart."""
+
+    def __init__(self, bot: "EmbedTool", concurrency: int = 5):
+        """Initializes the broadcaster.
+
+        Parameters
+        ------------
+        bot: EmbedTool
+            The bot to send the embeds with.
+        concurrency: int
+            The maximum number of channels sent to at once."""
+        self.bot: "EmbedTool" = bot
+        self.concurrency: int = concurrency
+
+    async def broadcast(self, payloads: list[dict], channel_ids: list[int]) -> dict[int, str | None]:
+        """Sends embeds to several channels, as one message per channel, and returns the outcome per channel.
+
+        Parameters
+        ------------
+        payloads: list[dict]
+            The payloads of the embeds to send.
+        channel_ids: list[int]
+            The IDs of the channels to send the embeds to.
+
+        Returns
+        ------------
+        dict[int, str | None]
+            The error per channel ID, ``None`` if the embed was sent."""
+        broadcast_id = secrets.token_hex(8)
+        if self.bot.session_store is not None:
+            self.bot.session_store.save_broadcast(broadcast_id, payloads, channel_ids, self.bot.cluster_id or 0)
+        return await self._run(broadcast_id, payloads, channel_ids)
+
+    async def resume(self) -> int:
+        """Resumes the unfinished broadcasts of this process and returns how many were resumed."""
+        if self.bot.session_store is None:
+            return 0
+        pending = self.bot.session_store.load_pending_broadcasts(self.bot.cluster_id or 0)
+        for broadcast_id, payloads, channel_ids in pending:
+            await self._run(broadcast_id, payloads, channel_ids)
+        return len(pending)
+
+    async def _run(self, broadcast_id: str, payloads: list[dict], channel_ids: list[int]) -> dict[int, str | None]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        embeds = [discord.Embed.from_dict(payload) for payload in payloads]
+        errors = await asyncio.gather(*(self._send(broadcast_id, embeds, channel_id, semaphore)
+                                        for channel_id in channel_ids))
+        if self.bot.session_store is not None:
+            self.bot.session_store.delete_broadcast(broadcast_id)
+        return dict(zip(channel_ids, errors))
+
+    async def _send(self, broadcast_id: str, embeds: list[discord.Embed], channel_id: int,
+                    semaphore: asyncio.Semaphore) -> str | None:
+        async with semaphore:
+            try:
+                channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+                message = await self.bot.outbound.submit(("channel", channel_id), lambda: channel.send(embeds=embeds))
+            except discord.Forbidden:
+                error = "Missing permissions"
+            except discord.NotFound:
+                error = "Channel not found"
+            except discord.HTTPException as e:
+                error = e.text or f"HTTP {e.status}"
+            else:
+                error = None
+                self.bot.message_cache.put(message)
+                self.bot.embed_index.add(message)
+        self.bot.metrics.increment("broadcast_sends_total", status="failed" if error else "sent")
+        if self.bot.session_store is not None:
+            self.bot.session_store.set_broadcast_status(broadcast_id, channel_id, "failed" if error else "sent")
+        return error
+
+
+class BroadcastView(TrackedView):
+    """View for selecting the channels to broadcast an embed to."""
+
+    def __init__(self, *args, editor: "EmbedToolView", **kwargs):
+        """Initialize the view.
+
+        Parameters
+        ------------
+        editor: EmbedToolView
+            The editor whose drafts to broadcast."""
+        self.editor: "EmbedToolView" = editor
+        super().__init__(*args, disable_on_timeout=True, **kwargs)
+
+    @discord.ui.channel_select(
+        placeholder="Please select the channels to send the embed to...",
+        min_values=1,
+        max_values=25,
+        channel_types=[discord.ChannelType.text, discord.ChannelType.news]
+    )
+    @instrumented
+    async def select_channels(self, select: discord.ui.Select, interaction: discord.Interaction) -> None:
+        """Callback for when the channels are selected.
+
+        Parameters
+        ------------
+        select: discord.ui.Select
+            The select that was used to select the channels.
+        interaction: discord.Interaction
+            The interaction that selected the channels."""
+        await interaction.response.edit_message(embed=discord.Embed(
+            title="Broadcasting...",
+            description=f"Sending the embed to {len(select.values)} channels.",
+            color=discord.Color.blurple(),
+            timestamp=discord.utils.utcnow()
+        ), view=None)
+        self.stop()
+        results = await interaction.client.broadcaster.broadcast(
+            [draft.to_dict() for draft in self.editor.publishable()], [channel.id for channel in select.values]
+        )
+        sent = sum(error is None for error in results.values())
+        await interaction.edit_original_response(embed=discord.Embed(
+            title="Broadcast Finished",
+            description=f"Sent to {sent} of {len(results)} channels.\n\n" + "\n".join(
+                f"✅ <#{channel_id}>" if error is None else f"❌ <#{channel_id}>: {error}"
+                for channel_id, error in results.items()
+            ),
+            color=discord.Color.green() if sent == len(results) else discord.Color.orange(),
+            timestamp=discord.utils.utcnow()
+        ))
@@ -0,0 +1,146 @@
+import asyncio
+import multiprocessing
+import os
+import time
+
+import aiohttp
+
+RESTART_DELAY: float = 5
+IDENTIFY_INTERVAL: float = 5
+
+
+def split_shards(shard_count: int, clusters: int) -> list[list[int]]:
+    """Splits the shard IDs into contiguous, evenly sized groups.
+
+    Parameters
+    ------------
+    shard_count: int
+        The total number of shards.
+    clusters: int
+        The number of groups."""
+    size, remainder = divmod(shard_count, clusters)
+    groups = []
+    start = 0
+    for cluster_id in range(clusters):
+        end = start + size + (cluster_id < remainder)
+        groups.append(list(range(start, end)))
+        start = end
+    return groups
+
+
+async def gateway_limits(token: str) -> tuple[int, int]:
+    """Returns the number of shards Discord recommends for the bot and its identify concurrency.
+
+    Parameters
+    ------------
+    token: str
+        The bot token."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get("https://discord.com/api/v10/gateway/bot",
+                               headers={"Authorization": f"Bot {token}"}) as response:
+            response.raise_for_status()
+            data = await response.json()
+            return data["shards"], data["session_start_limit"]["max_concurrency"]
+
+
+class IdentifyCoordinator:
+    """Spaces out the identifies of all cluster processes per rate limit bucket.
+
+    Discord allows one identify per 5 seconds in each of the bot's ``max_concurrency`` buckets, the bucket of a shard
+    is ``shard_id % max_concurrency``. Every identify reserves the next free slot of its bucket in state shared
+    through a :class:`multiprocessing.Manager`, so no two processes identify in the same bucket within the interval.
+    The bucket locks are only held while reserving, a process dying mid-identify can't block the others."""
+
+    def __init__(self, manager, max_concurrency: int):
+        """Initializes the shared state.
+
+        Parameters
+        ------------
+        manager: multiprocessing.managers.SyncManager
+            The running manager to create the shared state in.
+        max_concurrency: int
+            The number of identify rate limit buckets of the bot."""
+        self.max_concurrency: int = max_concurrency
+        self._locks: list = [manager.Lock() for _ in range(max_concurrency)]
+        self._next_slots = manager.list([0.0] * max_concurrency)
+
+    def reserve(self, shard_id: int) -> float:
+        """Reserves the next identify slot of the shard's bucket and returns the seconds to wait until it starts.
+
+        Blocks on the manager, use :meth:`wait` from the event loop.
+
+        Parameters
+        ------------
+        shard_id: int
+            The ID of the shard about to identify."""
+        bucket = shard_id % self.max_concurrency
+        with self._locks[bucket]:
+            now = time.time()
+            slot = max(now, self._next_slots[bucket])
+            self._next_slots[bucket] = slot + IDENTIFY_INTERVAL
+        return slot - now
+
+    async def wait(self, shard_id: int) -> None:
+        """Waits until the shard may identify.
+
+        Parameters
+        ------------
+        shard_id: int
+            The ID of the shard about to identify."""
+        await asyncio.sleep(await asyncio.to_thread(self.reserve, shard_id))
+
+
+def _run_cluster(token_env: str, cluster_id: int, shard_ids: list[int], shard_count: int,
+                 identify_coordinator: IdentifyCoordinator) -> None:
+    from .bot import AutoShardedEmbedTool
+
+    AutoShardedEmbedTool(cluster_id=cluster_id, shard_ids=shard_ids, shard_count=shard_count,
+                         identify_coordinator=identify_coordinator).run(token_env)
+
+
+def launch(token_env: str, clusters: int, shard_count: int | None = None) -> None:
+    """Runs the bot as several worker processes, each running an auto-sharded bot for its share of the shards.
+
+    Workers that exit are restarted, so one crashing cluster doesn't take down the others. The identifies of all
+    workers are coordinated by an :class:`IdentifyCoordinator`, so the workers start at once.
+
+    Parameters
+    ------------
+    token_env: str
+        The name of the environment variable holding the bot token.
+    clusters: int
+        The number of worker processes.
+    shard_count: int | None
+        The total number of shards, fetched from Discord if not given."""
+    recommended_shards, max_concurrency = asyncio.run(gateway_limits(os.environ[token_env]))
+    shard_count = shard_count or recommended_shards
+    clusters = max(1, min(clusters, shard_count))
+    context = multiprocessing.get_context("spawn")
+    manager = context.Manager()
+    identify_coordinator = IdentifyCoordinator(manager, max_concurrency)
+    groups = split_shards(shard_count, clusters)
+    processes: dict[int, multiprocessing.Process] = {}
+
+    def start(cluster_id: int) -> None:
+        process = context.Process(target=_run_cluster,
+                                  args=(token_env, cluster_id, groups[cluster_id], shard_count, identify_coordinator),
+                                  name=f"embed-tool-cluster-{cluster_id}")
+        process.start()
+        processes[cluster_id] = process
+        print(f"Started cluster {cluster_id} (PID {process.pid}) with shards {groups[cluster_id]}")
+
+    for cluster_id in range(clusters):
+        start(cluster_id)
+    try:
+        while True:
+            time.sleep(RESTART_DELAY)
+            for cluster_id, process in list(processes.items()):
+                if not process.is_alive():
+                    print(f"Cluster {cluster_id} exited with code {process.exitcode}, restarting")
+                    start(cluster_id)
+    except KeyboardInterrupt:
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.join()
+        manager.shutdown()
@@ -0,0 +1,601 @@
+import collections
+import datetime
+import hashlib
+import itertools
+import json
+import sys
+
+import discord
+
+_MISSING = object()
+
+TOTAL_LIMIT: int = 6000
+EMBED_COUNT_LIMIT: int = 10
+FIELD_COUNT_LIMIT: int = 25
+FIELD_NAME_LIMIT: int = 256
+FIELD_VALUE_LIMIT: int = 1024
+TEXT_LIMITS: dict[str, int] = {"title": 256, "description": 4096, "footer_text": 2048, "author_name": 256}
+TEXT_LABELS: dict[str, str] = {
+    "title": "title",
+    "description": "description",
+    "footer_text": "footer",
+    "author_name": "author name"
+}
+
+
+class DraftField:
+    """A single field of an embed draft."""
+
+    __slots__ = ("name", "value", "inline")
+
+    def __init__(self, name: str, value: str, inline: bool = True):
+        """Initializes the field.
+
+        Parameters
+        ------------
+        name: str
+            The name of the field.
+        value: str
+            The value of the field.
+        inline: bool
+            Whether the field is inline or not."""
+        self.name: str = name
+        self.value: str = value
+        self.inline: bool = inline
+
+
+class EmbedDraft:
+    """Server-side model of the embed being edited.
+
+    The draft is parsed once from the original embed and then mutated in place by the editor. The outgoing
+    :class:`discord.Embed` is only rebuilt when something actually changed since the last call to
+    :meth:`to_embed`.
+
+    The draft also keeps a running count of the characters Discord counts towards the total embed limit, updated
+    on every mutation, so limit checks never have to walk the whole embed."""
+
+    __slots__ = (
+        "title",
+        "description",
+        "color",
+        "timestamp",
+        "thumbnail_url",
+        "image_url",
+        "footer_text",
+        "footer_icon_url",
+        "author_name",
+        "author_icon_url",
+        "fields",
+        "version",
+        "length",
+        "history",
+        "_embed",
+        "_embed_fields",
+        "_options"
+    )
+
+    def __init__(self):
+        """Initializes an empty draft."""
+        object.__setattr__(self, "history", None)
+        object.__setattr__(self, "version", 0)
+        object.__setattr__(self, "length", 0)
+        object.__setattr__(self, "_embed", None)
+        object.__setattr__(self, "_embed_fields", None)
+        object.__setattr__(self, "_options", None)
+        self.title: str | None = None
+        self.description: str | None = None
+        self.color: discord.Colour | None = None
+        self.timestamp: datetime.datetime | None = None
+        self.thumbnail_url: str | None = None
+        self.image_url: str | None = None
+        self.footer_text: str | None = None
+        self.footer_icon_url: str | None = None
+        self.author_name: str | None = None
+        self.author_icon_url: str | None = None
+        self.fields: list[DraftField] = []
+
+    def __setattr__(self, name: str, value) -> None:
+        if name == "history":
+            object.__setattr__(self, name, value)
+            return
+        previous = getattr(self, name, _MISSING)
+        if name == "fields":
+            if previous is not _MISSING:
+                self._count(-sum(len(field.name) + len(field.value) for field in previous))
+                self._record(("set", name, list(previous), list(value)))
+            self._count(sum(len(field.name) + len(field.value) for field in value))
+            object.__setattr__(self, "_embed_fields", None)
+            object.__setattr__(self, "_options", None)
+        elif previous == value:
+            return
+        else:
+            if name in TEXT_LIMITS:
+                self._count(len(value or "") - (0 if previous is _MISSING else len(previous or "")))
+            if previous is not _MISSING:
+                self._record(("set", name, previous, value))
+        object.__setattr__(self, name, value)
+        self._touch()
+
+    def _record(self, change: tuple) -> None:
+        """Records a change in the history, if enabled."""
+        if self.history is not None:
+            self.history.record(change)
+
+    def _count(self, delta: int) -> None:
+        """Adjusts the running character count."""
+        object.__setattr__(self, "length", self.length + delta)
+
+    def _touch(self) -> None:
+        """Marks the draft as changed."""
+        object.__setattr__(self, "version", self.version + 1)
+        object.__setattr__(self, "_embed", None)
+
+    @classmethod
+    def from_embed(cls, embed: discord.Embed) -> "EmbedDraft":
+        """Creates a draft from an existing embed.
+
+        Parameters
+        ------------
+        embed: discord.Embed
+            The embed to create the draft from."""
+        return cls.from_dict(embed.to_dict())
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "EmbedDraft":
+        """Creates a draft from an embed payload.
+
+        Parameters
+        ------------
+        payload: dict
+            The embed payload to create the draft from."""
+        draft = cls()
+        draft.title = payload.get("title")
+        draft.description = payload.get("description")
+        if "color" in payload:
+            draft.color = discord.Colour(payload["color"])
+        if "timestamp" in payload:
+            draft.timestamp = datetime.datetime.fromisoformat(payload["timestamp"])
+        draft.thumbnail_url = payload.get("thumbnail", {}).get("url")
+        draft.image_url = payload.get("image", {}).get("url")
+        draft.footer_text = payload.get("footer", {}).get("text")
+        draft.footer_icon_url = payload.get("footer", {}).get("icon_url")
+        draft.author_name = payload.get("author", {}).get("name")
+        draft.author_icon_url = payload.get("author", {}).get("icon_url")
+        draft.fields = [
+            DraftField(field["name"], field["value"], field.get("inline", True)) for field in payload.get("fields", [])
+        ]
+        return draft
+
+    def estimated_size(self) -> int:
+        """Returns the estimated memory held by this draft and its cached embed in bytes."""
+        size = sys.getsizeof(self)
+        for value in (self.title, self.description, self.footer_text, self.author_name, self.thumbnail_url,
+                      self.image_url, self.footer_icon_url, self.author_icon_url):
+            if value:
+                size += sys.getsizeof(value)
+        for field in self.fields:
+            size += sys.getsizeof(field) + sys.getsizeof(field.name) + sys.getsizeof(field.value)
+        if self._embed is not None:
+            size *= 2
+        if self.history is not None:
+            size += self.history.estimated_size()
+        return size
+
+    @property
+    def empty(self) -> bool:
+        """Whether the draft has no visible content."""
+        return not (self.title or self.description or self.fields or self.thumbnail_url or self.image_url
+                    or self.footer_text or self.author_name or self.timestamp)
+
+    @property
+    def changed(self) -> bool:
+        """Whether the draft changed since the last call to :meth:`to_embed`."""
+        return self._embed is None
+
+    def to_dict(self) -> dict:
+        """Returns the embed payload of this draft."""
+        payload = {"type": "rich"}
+        if self.title:
+            payload["title"] = self.title
+        if self.description:
+            payload["description"] = self.description
+        if self.color is not None:
+            payload["color"] = int(self.color)
+        if self.timestamp is not None:
+            payload["timestamp"] = self.timestamp.isoformat()
+        if self.fields:
+            payload["fields"] = [
+                {"name": field.name, "value": field.value, "inline": field.inline} for field in self.fields
+            ]
+        if self.thumbnail_url:
+            payload["thumbnail"] = {"url": self.thumbnail_url}
+        if self.image_url:
+            payload["image"] = {"url": self.image_url}
+        if self.footer_text or self.footer_icon_url:
+            payload["footer"] = {"text": self.footer_text, "icon_url": self.footer_icon_url}
+        if self.author_name:
+            payload["author"] = {"name": self.author_name, "icon_url": self.author_icon_url}
+        return payload
+
+    def fingerprint(self) -> str:
+        """Returns a canonical hash of the embed payload, equal for drafts that would render the same embed."""
+        payload = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def to_embed(self) -> discord.Embed:
+        """Returns the embed for this draft, rebuilding it only if the draft changed.
+
+        The embed is built from the attributes directly, going through :meth:`to_dict` and
+        :meth:`discord.Embed.from_dict` would build and parse an intermediate payload on every change. The embed
+        fields are cached separately and patched by the field operations, so a change only builds what changed."""
+        if self._embed is None:
+            if self._embed_fields is None:
+                object.__setattr__(self, "_embed_fields", [_embed_field(field) for field in self.fields])
+            embed = discord.Embed(
+                title=self.title or None,
+                description=self.description or None,
+                colour=self.color,
+                timestamp=self.timestamp,
+                fields=list(self._embed_fields),
+                thumbnail=self.thumbnail_url or None,
+                image=self.image_url or None
+            )
+            if self.footer_text or self.footer_icon_url:
+                embed.set_footer(text=self.footer_text, icon_url=self.footer_icon_url)
+            if self.author_name:
+                embed.set_author(name=self.author_name, icon_url=self.author_icon_url)
+            object.__setattr__(self, "_embed", embed)
+        return self._embed
+
+    def check(self, attribute: str, value: str | None) -> str | None:
+        """Returns why setting a text attribute would exceed an embed limit or ``None`` if it fits.
+
+        Parameters
+        ------------
+        attribute: str
+            The attribute to set, one of ``title``, ``description``, ``footer_text`` or ``author_name``.
+        value: str | None
+            The new value of the attribute."""
+        new_length = len(value or "")
+        if new_length > TEXT_LIMITS[attribute]:
+            return f"The {TEXT_LABELS[attribute]} can't be longer than {TEXT_LIMITS[attribute]} characters."
+        return self._check_total(new_length - len(getattr(self, attribute) or ""))
+
+    def check_field(self, name: str, value: str, index: int | None = None) -> str | None:
+        """Returns why adding or replacing a field would exceed an embed limit or ``None`` if it fits.
+
+        Parameters
+        ------------
+        name: str
+            The name of the field.
+        value: str
+            The value of the field.
+        index: int | None
+            The index of the field to replace or ``None`` to check adding a new field."""
+        if index is None and len(self.fields) >= FIELD_COUNT_LIMIT:
+            return f"Embeds can't have more than {FIELD_COUNT_LIMIT} fields."
+        if len(name) > FIELD_NAME_LIMIT:
+            return f"Field titles can't be longer than {FIELD_NAME_LIMIT} characters."
+        if len(value) > FIELD_VALUE_LIMIT:
+            return f"Field values can't be longer than {FIELD_VALUE_LIMIT} characters."
+        delta = len(name) + len(value)
+        if index is not None:
+            delta -= len(self.fields[index].name) + len(self.fields[index].value)
+        return self._check_total(delta)
+
+    def check_fields(self, fields: list[DraftField]) -> str | None:
+        """Returns why replacing all fields would exceed the total embed limit or ``None`` if they fit.
+
+        The limits of the individual fields are not checked.
+
+        Parameters
+        ------------
+        fields: list[DraftField]
+            The new fields."""
+        if len(fields) > FIELD_COUNT_LIMIT:
+            return f"Embeds can't have more than {FIELD_COUNT_LIMIT} fields."
+        return self._check_total(sum(len(field.name) + len(field.value) for field in fields)
+                                 - sum(len(field.name) + len(field.value) for field in self.fields))
+
+    def _check_total(self, delta: int) -> str | None:
+        if delta > 0 and self.length + delta > TOTAL_LIMIT:
+            return (f"Embeds can't be longer than {TOTAL_LIMIT} characters in total, "
+                    f"{TOTAL_LIMIT - self.length} characters are left.")
+        return None
+
+    def add_field(self, name: str, value: str, inline: bool) -> None:
+        """Appends a field to the draft.
+
+        Parameters
+        ------------
+        name: str
+            The name of the field.
+        value: str
+            The value of the field.
+        inline: bool
+            Whether the field is inline or not."""
+        self.insert_field(len(self.fields), name, value, inline)
+
+    def insert_field(self, index: int, name: str, value: str, inline: bool) -> None:
+        """Inserts a field before the given index.
+
+        Parameters
+        ------------
+        index: int
+            The index to insert the field at.
+        name: str
+            The name of the field.
+        value: str
+            The value of the field.
+        inline: bool
+            Whether the field is inline or not."""
+        field = DraftField(name, value, inline)
+        self.fields.insert(index, field)
+        self._patch_options(index, 0, 1)
+        self._count(len(name) + len(value))
+        self._record(("insert", index, field))
+        self._touch()
+
+    def set_field_at(self, index: int, name: str, value: str, inline: bool) -> None:
+        """Replaces the field at the given index.
+
+        Parameters
+        ------------
+        index: int
+            The index of the field to replace.
+        name: str
+            The new name of the field.
+        value: str
+            The new value of the field.
+        inline: bool
+            Whether the field is inline or not."""
+        field = self.fields[index]
+        if (field.name, field.value, field.inline) == (name, value, inline):
+            return
+        self.fields[index] = DraftField(name, value, inline)
+        self._patch_options(index, 1, 1)
+        self._count(len(name) + len(value) - len(field.name) - len(field.value))
+        self._record(("replace", index, field, self.fields[index]))
+        self._touch()
+
+    def remove_field(self, index: int) -> None:
+        """Removes the field at the given index.
+
+        Parameters
+        ------------
+        index: int
+            The index of the field to remove."""
+        field = self.fields.pop(index)
+        self._patch_options(index, 1, 0)
+        self._count(-len(field.name) - len(field.value))
+        self._record(("remove", index, field))
+        self._touch()
+
+    def field_options(self) -> list[discord.SelectOption]:
+        """Returns a select option per field, valued with the index of the field.
+
+        The options are cached and patched by the field operations instead of being rebuilt for every select.
+        Options are never mutated, so a list returned earlier keeps matching the select it was shown in."""
+        if self._options is None:
+            object.__setattr__(self, "_options", [_field_option(index, field)
+                                                  for index, field in enumerate(self.fields)])
+        return list(self._options)
+
+    def _patch_options(self, index: int, removed: int, inserted: int) -> None:
+        """Updates the cached select options and embed fields after fields were replaced, inserted or removed at an
+        index."""
+        if self._embed_fields is not None:
+            self._embed_fields[index:index + removed] = [_embed_field(self.fields[i])
+                                                         for i in range(index, index + inserted)]
+        options = self._options
+        if options is None:
+            return
+        options[index:index + removed] = [_field_option(i, self.fields[i]) for i in range(index, index + inserted)]
+        if removed != inserted:
+            # The following fields moved, their values and default labels contain the index.
+            for i in range(index + inserted, len(options)):
+                options[i] = _field_option(i, self.fields[i])
+
+    def apply(self, change: tuple, reverse: bool = False) -> None:
+        """Applies or reverts a change recorded by the history.
+
+        Parameters
+        ------------
+        change: tuple
+            The recorded change.
+        reverse: bool
+            Whether to revert the change instead of applying it."""
+        kind = change[0]
+        if kind == "set":
+            _, name, old, new = change
+            setattr(self, name, list(old if reverse else new) if name == "fields" else old if reverse else new)
+        elif kind == "replace":
+            _, index, old, new = change
+            field = old if reverse else new
+            self.set_field_at(index, field.name, field.value, field.inline)
+        elif (kind == "insert") != reverse:
+            _, index, field = change
+            self.insert_field(index, field.name, field.value, field.inline)
+        else:
+            self.remove_field(change[1])
+
+
+class DraftHistory:
+    """Bounded undo/redo history of an :class:`EmbedDraft`.
+
+    Only the changed attributes and fields are recorded, so a step costs memory proportional to what changed
+    instead of a snapshot of the whole embed. Changes are grouped into steps by :meth:`checkpoint`."""
+
+    __slots__ = ("depth", "_pending", "_undo", "_redo")
+
+    def __init__(self, depth: int = 50):
+        """Initializes an empty history.
+
+        Parameters
+        ------------
+        depth: int
+            The maximum number of steps that can be undone."""
+        self.depth: int = depth
+        self._pending: list[tuple] = []
+        self._undo: collections.deque[tuple[tuple, ...]] = collections.deque(maxlen=depth)
+        self._redo: list[tuple[tuple, ...]] = []
+
+    @property
+    def can_undo(self) -> bool:
+        """Whether there is a step to undo."""
+        return bool(self._pending or self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        """Whether there is a step to redo."""
+        return bool(self._redo) and not self._pending
+
+    def record(self, change: tuple) -> None:
+        """Adds a change to the current step, discarding the redo history.
+
+        Parameters
+        ------------
+        change: tuple
+            The change to record."""
+        self._pending.append(change)
+        self._redo.clear()
+
+    def checkpoint(self) -> None:
+        """Closes the current step."""
+        if self._pending:
+            self._undo.append(tuple(self._pending))
+            self._pending = []
+
+    def undo(self, draft: EmbedDraft) -> bool:
+        """Reverts the last step of a draft and returns whether there was one.
+
+        Parameters
+        ------------
+        draft: EmbedDraft
+            The draft the history belongs to."""
+        self.checkpoint()
+        if not self._undo:
+            return False
+        step = self._undo.pop()
+        self._replay(draft, reversed(step), reverse=True)
+        self._redo.append(step)
+        return True
+
+    def redo(self, draft: EmbedDraft) -> bool:
+        """Reapplies the last undone step of a draft and returns whether there was one.
+
+        Parameters
+        ------------
+        draft: EmbedDraft
+            The draft the history belongs to."""
+        if not self.can_redo:
+            return False
+        step = self._redo.pop()
+        self._replay(draft, step, reverse=False)
+        self._undo.append(step)
+        return True
+
+    def _replay(self, draft: EmbedDraft, changes, reverse: bool) -> None:
+        draft.history = None
+        try:
+            for change in changes:
+                draft.apply(change, reverse)
+        finally:
+            draft.history = self
+
+    def to_state(self) -> dict:
+        """Returns the JSON serializable state of the history, the current step becomes an undo step."""
+        undo = list(self._undo)
+        if self._pending:
+            undo.append(tuple(self._pending))
+        return {
+            "undo": [[_encode_change(change) for change in step] for step in undo[-self.depth:]],
+            "redo": [[_encode_change(change) for change in step] for step in self._redo]
+        }
+
+    @classmethod
+    def from_state(cls, state: dict, depth: int = 50) -> "DraftHistory":
+        """Restores a history from the state returned by :meth:`to_state`.
+
+        Parameters
+        ------------
+        state: dict
+            The state of the history.
+        depth: int
+            The maximum number of steps that can be undone."""
+        history = cls(depth)
+        history._undo.extend(tuple(_decode_change(change) for change in step) for step in state["undo"])
+        history._redo.extend(tuple(_decode_change(change) for change in step) for step in state["redo"])
+        return history
+
+    def estimated_size(self) -> int:
+        """Returns the estimated memory held by the recorded steps in bytes."""
+        size = sys.getsizeof(self._undo) + sys.getsizeof(self._redo) + sys.getsizeof(self._pending)
+        for step in itertools.chain(self._undo, self._redo, (self._pending,)):
+            size += sys.getsizeof(step)
+            for change in step:
+                size += sys.getsizeof(change) + sum(sys.getsizeof(value) for value in change[2:]
+                                                    if isinstance(value, (str, DraftField)))
+        return size
+
+
+def _encode_value(name: str, value):
+    if value is None:
+        return None
+    if name == "color":
+        return value.value
+    if name == "timestamp":
+        return value.isoformat()
+    if name == "fields":
+        return [[field.name, field.value, field.inline] for field in value]
+    return value
+
+
+def _decode_value(name: str, value):
+    if value is None:
+        return None
+    if name == "color":
+        return discord.Colour(value)
+    if name == "timestamp":
+        return datetime.datetime.fromisoformat(value)
+    if name == "fields":
+        return [DraftField(*field) for field in value]
+    return value
+
+
+def _encode_change(change: tuple) -> list:
+    if change[0] == "set":
+        _, name, old, new = change
+        return ["set", name, _encode_value(name, old), _encode_value(name, new)]
+    return [change[0], change[1], *([field.name, field.value, field.inline] for field in change[2:])]
+
+
+def _decode_change(change: list) -> tuple:
+    if change[0] == "set":
+        _, name, old, new = change
+        return "set", name, _decode_value(name, old), _decode_value(name, new)
+    return change[0], change[1], *(DraftField(*field) for field in change[2:])
+
+
+def _field_option(index: int, field: DraftField) -> discord.SelectOption:
+    return discord.SelectOption(label=field.name[:100] or f"Field {index + 1}", description=field.value[:100] or None,
+                                value=str(index))
+
+
+def _embed_field(field: DraftField) -> discord.EmbedField:
+    return discord.EmbedField(name=field.name, value=field.value, inline=field.inline)
+
+
+def over_limit_embed(error: str) -> discord.Embed:
+    """Returns the error embed for a change that would exceed an embed limit.
+
+    Parameters
+    ------------
+    error: str
+        Which limit would be exceeded."""
+    return discord.Embed(
+        title="Embed Limit Reached",
+        description=f"{error} Your change was not applied.",
+        color=discord.Color.red(),
+        timestamp=discord.utils.utcnow()
+    )
@@ -1,16 +1,36 @@
+import asyncio
+import secrets
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
 import discord
 
+from .broadcast import BroadcastView
+from .draft import EMBED_COUNT_LIMIT, FIELD_COUNT_LIMIT, TOTAL_LIMIT, DraftHistory, EmbedDraft, over_limit_embed
 from .fields import AddFieldModal, RemoveFieldView, EditFieldView
 from .general import TitleModal, DescriptionModal, ColorModal
 from .images import ThumbnailModal, ImageModal, FooterImageModal
+from .metrics import instrumented
 from .options import FooterTextModal
+from .scheduler import PREVIEW
+from .sessions import SessionStore, TrackedView
+
+if TYPE_CHECKING:
+    from .bot import EmbedTool
+
+EMPTY_EMBED_HINT: str = "This embed is empty, use the buttons below to edit it. Empty embeds are not sent."
 
 
-class EmbedToolView(discord.ui.View):
+class EmbedToolView(TrackedView):
     """View for the embed tool."""
 
+    BASE_SIZE: int = 13 * 1024
+    SESSION_PREFIX: str = "embed_tool:"
+
     def __init__(self, *args, channel_or_message: discord.abc.GuildChannel | discord.Message, is_new_embed: bool,
-                 tutorial_embed: discord.Embed, ctx: discord.ApplicationContext, **kwargs):
+                 user_embeds: list[discord.Embed], tutorial_embed: discord.Embed, user_id: int | None = None,
+                 history_depth: int = 50, store: SessionStore | None = None, session_id: str | None = None,
+                 idle_timeout: float = 900, **kwargs):
         """Initializes the view.
 
         Parameters
@@ -19,10 +39,22 @@ class EmbedToolView(discord.ui.View):
             The channel to send the embed in or the message to edit.
         is_new_embed: bool
             Whether the embed is new or not. Decides whether to send or edit the embed.
+        user_embeds: list[discord.Embed]
+            The embeds to start editing from, one draft is created per embed.
         tutorial_embed: discord.Embed
             The tutorial embed to show.
-        ctx: discord.ApplicationContext
-            The context used for command invocation."""
+        user_id: int | None
+            The ID of the user editing the embed.
+        history_depth: int
+            The number of changes that can be undone.
+        store: SessionStore | None
+            The store to persist the session in. If given, the view uses stable custom IDs and never times out.
+        session_id: str | None
+            The ID of the persisted session. A new one is generated if not given.
+        idle_timeout: float
+            The number of seconds without activity after which a persisted session is dropped from memory."""
+        if store is not None:
+            kwargs["timeout"] = None
         super().__init__(*args, disable_on_timeout=True, **kwargs)
         self.is_new_embed: bool = is_new_embed
         if self.is_new_embed:
@@ -31,17 +63,356 @@ class EmbedToolView(discord.ui.View):
             self.message = channel_or_message
             self.channel = self.message.channel
         self.tutorial_embed: discord.Embed = tutorial_embed
-        self.ctx: discord.ApplicationContext = ctx
+        self.user_id: int | None = user_id
+        self.last_interaction: discord.Interaction | None = None
         self.tutorial_hidden: bool = False
-        self.author_hidden: bool = True
-        self.timestamp_hidden: bool = True
         self.canceled_before: bool = False
+        self.history_depth: int = history_depth
+        self.drafts: list[EmbedDraft] = []
+        self.index: int = 0
+        self._rendered_version: int = 0
+        self.load([EmbedDraft.from_embed(embed) for embed in user_embeds])
+        self.original_fingerprint: str | None = None if self.is_new_embed else self.fingerprint()
+        self.background_tasks: set[asyncio.Task] = set()
+        self._preview_interaction: discord.Interaction | None = None
+        self._preview_task: asyncio.Task | None = None
+        self.store: SessionStore | None = store
+        self.session_id: str | None = None
+        self.idle_timeout: float = idle_timeout
+        self.released: bool = False
+        self._release_handle: asyncio.TimerHandle | None = None
+        if self.store is not None:
+            self.session_id = session_id or secrets.token_hex(8)
+            for func in self.__view_children_items__:
+                getattr(self, func.__name__).custom_id = f"{self.SESSION_PREFIX}{self.session_id}:{func.__name__}"
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        self.last_interaction = interaction
+        return await super().interaction_check(interaction)
+
+    def estimated_size(self) -> int:
+        """Returns the estimated memory held by this view and its draft in bytes."""
+        return self.BASE_SIZE + sum(draft.estimated_size() for draft in self.drafts)
+
+    def to_state(self) -> dict:
+        """Returns the JSON serializable state of the session."""
+        return {
+            "channel_id": self.channel.id,
+            "message_id": None if self.is_new_embed else self.message.id,
+            "drafts": [draft.to_dict() for draft in self.drafts],
+            "histories": [draft.history.to_state() for draft in self.drafts],
+            "index": self.index,
+            "tutorial_color": self.tutorial_embed.colour.value,
+            "tutorial_hidden": self.tutorial_hidden,
+            "canceled_before": self.canceled_before,
+            "user_id": self.user_id,
+            "original_fingerprint": self.original_fingerprint
+        }
+
+    def save(self) -> None:
+        """Persists the session if the view is backed by a store and restarts its idle timer.
+
+        Released views never write, so a stale instance can't overwrite the state of a newer one."""
+        if self.store is None or self.released:
+            return
+        self.store.save(self.session_id, self.to_state())
+        if self._release_handle is not None:
+            self._release_handle.cancel()
+        self._release_handle = asyncio.get_running_loop().call_later(self.idle_timeout, self.release)
+
+    def detach(self) -> None:
+        """Persists the session and stops the library from dispatching to the view.
+
+        The view stays registered under its session ID, and :meth:`dispatch_session` routes every interaction with
+        the editor to it until it is idle. Sub-views and modals holding the view therefore always work on the
+        current state, as does the undo history."""
+        registry = self.registry
+        self.save()
+        self.stop()
+        if registry is not None:
+            registry.add(self)
+
+    def release(self) -> None:
+        """Persists the session and drops the live view, later interactions rehydrate it from the store."""
+        self.save()
+        self.released = True
+        if self._release_handle is not None:
+            self._release_handle.cancel()
+            self._release_handle = None
+        if self.registry is not None:
+            self.registry.remove(self)
+
+    def close_session(self) -> None:
+        """Deletes the persisted session once the editor is closed."""
+        if self.store is not None:
+            self.release()
+            self.store.delete(self.session_id)
+
+    async def on_timeout(self) -> None:
+        if self.store is not None:
+            self.release()
+            return
+        await super().on_timeout()
+
+    @classmethod
+    async def rehydrate(cls, bot: "EmbedTool", interaction: discord.Interaction,
+                        session_id: str | None = None) -> "EmbedToolView | None":
+        """Restores the persisted session an interaction belongs to.
+
+        Parameters
+        ------------
+        bot: EmbedTool
+            The bot the session belongs to.
+        interaction: discord.Interaction
+            The interaction with the editor message or any interaction in the session's server.
+        session_id: str | None
+            The ID of the session. Taken from the custom ID of the interaction if not given.
+
+        Returns
+        ------------
+        EmbedToolView | None
+            The restored view or ``None`` if the session does not exist anymore."""
+        if session_id is None:
+            session_id = interaction.custom_id[len(cls.SESSION_PREFIX):].split(":", 1)[0]
+        state = bot.session_store.load(session_id)
+        if state is None:
+            return None
+        channel = bot.get_channel(state["channel_id"]) or await bot.fetch_channel(state["channel_id"])
+        if state["message_id"] is None:
+            channel_or_message = channel
+        else:
+            channel_or_message = channel.get_partial_message(state["message_id"])
+        tutorial_embed = bot.tutorial_cache.get(interaction)
+        if tutorial_embed.colour.value != state["tutorial_color"]:
+            tutorial_embed = tutorial_embed.copy()
+            tutorial_embed.colour = state["tutorial_color"]
+        view = cls(channel_or_message=channel_or_message, is_new_embed=state["message_id"] is None,
+                   user_embeds=[discord.Embed()], tutorial_embed=tutorial_embed, history_depth=bot.history_depth,
+                   store=bot.session_store, session_id=session_id, idle_timeout=bot.session_idle_timeout)
+        view.load([EmbedDraft.from_dict(payload) for payload in state.get("drafts") or [state["draft"]]],
+                  state.get("index", 0))
+        for draft, history in zip(view.drafts, state.get("histories", [])):
+            draft.history = DraftHistory.from_state(history, view.history_depth)
+        view.tutorial_hidden = state["tutorial_hidden"]
+        view.canceled_before = state["canceled_before"]
+        view.user_id = state.get("user_id")
+        view.original_fingerprint = state.get("original_fingerprint")
+        if view.canceled_before:
+            view.cancel_editing.label = "ﾠConfirmﾠﾠ"
+        return view
+
+    @classmethod
+    async def live_session(cls, bot: "EmbedTool", interaction: discord.Interaction,
+                           session_id: str) -> "EmbedToolView | None":
+        """Returns the live view of a persisted session, rehydrating and registering it if it was released.
+
+        Parameters
+        ------------
+        bot: EmbedTool
+            The bot the session belongs to.
+        interaction: discord.Interaction
+            The interaction to rehydrate the session for.
+        session_id: str
+            The ID of the session.
+
+        Returns
+        ------------
+        EmbedToolView | None
+            The live view or ``None`` if the session does not exist anymore."""
+        view = bot.session_registry.session(session_id)
+        if view is None:
+            view = await cls.rehydrate(bot, interaction, session_id)
+            if view is not None:
+                bot.session_registry.add(view)
+                view.detach()
+        return view
+
+    @classmethod
+    async def dispatch_session(cls, bot: "EmbedTool", interaction: discord.Interaction) -> None:
+        """Routes an interaction with a persisted editor to its live view, rehydrating the view if it was released.
+
+        Parameters
+        ------------
+        bot: EmbedTool
+            The bot the session belongs to.
+        interaction: discord.Interaction
+            The interaction with the editor message."""
+        name = interaction.custom_id.rsplit(":", 1)[-1]
+        if name not in {func.__name__ for func in cls.__view_children_items__}:
+            return
+        session_id = interaction.custom_id[len(cls.SESSION_PREFIX):].split(":", 1)[0]
+        view = await cls.live_session(bot, interaction, session_id)
+        if view is None:
+            await interaction.response.send_message(embed=discord.Embed(
+                title="Error",
+                description="This editor session has expired. Please start a new one.",
+                color=discord.Color.red(),
+                timestamp=discord.utils.utcnow()
+            ), ephemeral=True)
+            return
+        if not await view.interaction_check(interaction):
+            return
+        await getattr(view, name).callback(interaction)
+
+    @property
+    def draft(self) -> EmbedDraft:
+        """The draft of the embed currently being edited."""
+        return self.drafts[self.index]
+
+    async def check_draft(self, interaction: discord.Interaction, draft: EmbedDraft,
+                          version: int | None = None) -> bool:
+        """Returns whether a draft captured by a sub-view or modal is still the one being edited.
+
+        If the user switched to another embed since, or ``version`` is given and the draft changed since, the
+        interaction is answered with an error, so the submit can't apply to the wrong embed or stale field indices.
+
+        Parameters
+        ------------
+        interaction: discord.Interaction
+            The interaction that submitted the sub-view or modal.
+        draft: EmbedDraft
+            The draft the sub-view or modal was opened on.
+        version: int | None
+            The version of the draft when the sub-view or modal was opened."""
+        if draft is self.draft and (version is None or draft.version == version):
+            return True
+        await interaction.response.send_message(embed=discord.Embed(
+            title="Error",
+            description="The embed changed since this was opened. Please open it again.",
+            color=discord.Color.red(),
+            timestamp=discord.utils.utcnow()
+        ), ephemeral=True)
+        return False
+
+    @property
+    def author_hidden(self) -> bool:
+        """Whether the draft has no author."""
+        return self.draft.author_name is None
+
+    @property
+    def timestamp_hidden(self) -> bool:
+        """Whether the draft has no timestamp."""
+        return self.draft.timestamp is None
+
+    def load(self, drafts: list[EmbedDraft], index: int = 0) -> None:
+        """Replaces the drafts being edited.
+
+        Parameters
+        ------------
+        drafts: list[EmbedDraft]
+            The drafts to edit, each gets its own undo history.
+        index: int
+            The index of the draft to show."""
+        self.drafts = [self._track(draft) for draft in drafts]
+        self.index = index
+        self._rendered_version = self.draft.version
+        self._update_embed_buttons()
+
+    def _track(self, draft: EmbedDraft) -> EmbedDraft:
+        """Attaches an undo history to a draft and returns it."""
+        draft.history = DraftHistory(self.history_depth)
+        return draft
+
+    def _update_embed_buttons(self) -> None:
+        """Updates the embed counter and disables adding embeds once the message is full."""
+        self.cycle_embed.label = f"Embed {self.index + 1}/{len(self.drafts)}"
+        self.cycle_embed.disabled = len(self.drafts) < 2
+        self.new_embed.disabled = len(self.drafts) >= EMBED_COUNT_LIMIT
+
+    def publishable(self) -> list[EmbedDraft]:
+        """Returns the drafts to publish, skipping drafts without any visible content."""
+        return [draft for draft in self.drafts if not draft.empty]
+
+    def fingerprint(self) -> str:
+        """Returns a canonical hash of the embeds that would be published."""
+        return ":".join(draft.fingerprint() for draft in self.publishable())
+
+    def render(self) -> list[discord.Embed]:
+        """Returns the embeds to show in the editor, marks the preview as up to date and persists the session.
+
+        Only the embed being edited is shown, an empty one is shown as a hint that is never part of the draft. All
+        changes since the last render become one undo step."""
+        self.draft.history.checkpoint()
+        self._rendered_version = self.draft.version
+        self.save()
+        if self.draft.empty:
+            embed = discord.Embed(description=EMPTY_EMBED_HINT, colour=self.draft.color)
+        else:
+            embed = self.draft.to_embed()
+        if self.tutorial_hidden:
+            return [embed]
+        return [embed, self.tutorial_embed]
+
+    async def refresh(self, interaction: discord.Interaction, force: bool = False) -> None:
+        """Updates the editor message, skipping the payload if the draft did not change.
+
+        Parameters
+        ------------
+        interaction: discord.Interaction
+            The interaction to respond to.
+        force: bool
+            Whether to update the editor message even if the draft did not change."""
+        if not force and self.draft.version == self._rendered_version:
+            await interaction.response.defer()
+            return
+        if not force and interaction.client.preview_debounce > 0:
+            await interaction.response.defer()
+            self._preview_interaction = interaction
+            if self._preview_task is None:
+                self._preview_task = asyncio.create_task(self._flush_preview(interaction.client.preview_debounce))
+            return
+        await interaction.response.edit_message(embeds=self.render())
+
+    async def _flush_preview(self, delay: float) -> None:
+        """Sends a single preview edit for all changes made within the debounce interval.
+
+        Parameters
+        ------------
+        delay: float
+            The debounce interval in seconds, counted from the first pending change."""
+        await asyncio.sleep(delay)
+        self._preview_task = None
+        if self.draft.version != self._rendered_version:
+            await self.update_preview(self._preview_interaction)
+
+    async def update_preview(self, editor_interaction: discord.Interaction) -> None:
+        """Edits the editor message outside of an interaction response.
+
+        The edit goes through the outbound scheduler, so rapid updates of the same editor are coalesced. Persisted
+        sessions are keyed by their session ID, so edits still coalesce if the session was rehydrated in between.
+
+        Parameters
+        ------------
+        editor_interaction: discord.Interaction
+            A deferred interaction with the editor message."""
+        await editor_interaction.client.outbound.submit(
+            ("webhook", editor_interaction.id),
+            lambda: editor_interaction.edit_original_response(embeds=self.render()),
+            priority=PREVIEW,
+            key=("preview", self.session_id or self.id)
+        )
+
+    async def _replay_history(self, interaction: discord.Interaction, replay, nothing_left: str) -> None:
+        if not replay(self.draft):
+            await interaction.response.send_message(embed=discord.Embed(
+                title="Error",
+                description=nothing_left,
+                color=discord.Color.red(),
+                timestamp=discord.utils.utcnow()
+            ), ephemeral=True)
+            return
+        if self.draft.color is not None and self.tutorial_embed.colour != self.draft.color:
+            tutorial_embed = self.tutorial_embed.copy()
+            tutorial_embed.colour = self.draft.color
+            self.tutorial_embed = tutorial_embed
+        await self.refresh(interaction)
 
     @discord.ui.button(label="GENERALﾠ", style=discord.ButtonStyle.blurple, disabled=True, row=0)
     async def general_row(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         pass
 
     @discord.ui.button(label="⠀ﾠTitleﾠ⠀", style=discord.ButtonStyle.gray, row=0)
+    @instrumented(auto_defer=False)
     async def set_title(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the title button.
 
@@ -51,15 +422,12 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        initial_title = interaction.message.embeds[0].title
-        tutorial_embed = None
-        if not self.tutorial_hidden:
-            tutorial_embed = self.tutorial_embed
         await interaction.response.send_modal(
-            TitleModal(title="Set the Embed Title", initial_title=initial_title, tutorial_embed=tutorial_embed)
+            TitleModal(title="Set the Embed Title", editor=self)
         )
 
     @discord.ui.button(label="Description", style=discord.ButtonStyle.gray, row=0)
+    @instrumented(auto_defer=False)
     async def set_description(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the description button.
 
@@ -69,16 +437,12 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        initial_description = interaction.message.embeds[0].description
-        tutorial_embed = None
-        if not self.tutorial_hidden:
-            tutorial_embed = self.tutorial_embed
         await interaction.response.send_modal(
-            DescriptionModal(title="Set the Embed Description", initial_description=initial_description,
-                             tutorial_embed=tutorial_embed)
+            DescriptionModal(title="Set the Embed Description", editor=self)
         )
 
     @discord.ui.button(label="ﾠ⠀Colorﾠ⠀", style=discord.ButtonStyle.gray, row=0)
+    @instrumented(auto_defer=False)
     async def set_color(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the color button.
 
@@ -88,19 +452,29 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        initial_color = str(interaction.message.embeds[0].color)
-        tutorial_embed = None
-        if not self.tutorial_hidden:
-            tutorial_embed = self.tutorial_embed
         await interaction.response.send_modal(
-            ColorModal(title="Set the Embed Color", initial_color=initial_color, tutorial_embed=tutorial_embed)
+            ColorModal(title="Set the Embed Color", editor=self)
         )
 
+    @discord.ui.button(label="ﾠﾠUndoﾠﾠ", style=discord.ButtonStyle.gray, emoji="↩️", row=0)
+    @instrumented
+    async def undo(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+        """Callback for the undo button.
+
+        Parameters
+        ------------
+        button: discord.ui.Button
+            The button that was clicked.
+        interaction: discord.Interaction
+            The interaction that clicked the button."""
+        await self._replay_history(interaction, self.draft.history.undo, "There is nothing to undo.")
+
     @discord.ui.button(label="FIELDSﾠﾠﾠ", style=discord.ButtonStyle.blurple, disabled=True, row=1)
     async def fields_row(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         pass
 
     @discord.ui.button(label="ﾠﾠﾠAddﾠ⠀", style=discord.ButtonStyle.gray, row=1)
+    @instrumented(auto_defer=False)
     async def add_field(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the add field button.
 
@@ -110,14 +484,17 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        tutorial_embed = None
-        if not self.tutorial_hidden:
-            tutorial_embed = self.tutorial_embed
+        if len(self.draft.fields) >= FIELD_COUNT_LIMIT:
+            await interaction.response.send_message(embed=over_limit_embed(
+                f"Embeds can't have more than {FIELD_COUNT_LIMIT} fields."
+            ), ephemeral=True)
+            return
         await interaction.response.send_modal(
-            AddFieldModal(title="Add a Field", tutorial_embed=tutorial_embed)
+            AddFieldModal(title="Add a Field", editor=self)
         )
 
     @discord.ui.button(label="ﾠRemoveﾠﾠ", style=discord.ButtonStyle.gray, row=1)
+    @instrumented
     async def remove_field(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the remove field button.
 
@@ -127,7 +504,7 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        fields = interaction.message.embeds[0].fields
+        fields = self.draft.fields
         if not fields:
             await interaction.response.send_message(embed=discord.Embed(
                 title="Error",
@@ -136,25 +513,19 @@ class EmbedToolView(discord.ui.View):
                 timestamp=discord.utils.utcnow()
             ), ephemeral=True)
             return
-        tutorial_embed = None
-        if not self.tutorial_hidden:
-            tutorial_embed = self.tutorial_embed
-        options = []
-        for index, field in enumerate(fields):
-            options.append(discord.SelectOption(label=field.name, description=field.value, value=str(index)))
-        await interaction.response.send_message(embed=discord.Embed(
-            title="Remove a Field",
-            description="Select the field you want to remove.",
+        options = self.draft.field_options()
+        view = RemoveFieldView(editor=self, editor_interaction=interaction, options=options)
+        interaction.client.session_registry.add(view)
+        await interaction.response.defer()
+        await interaction.followup.send(embed=discord.Embed(
+            title="Remove Fields",
+            description="Select the fields you want to remove.",
             color=discord.Color.green(),
             timestamp=discord.utils.utcnow()
-        ), view=RemoveFieldView(
-            ctx=self.ctx,
-            user_embed=interaction.message.embeds[0],
-            tutorial_embed=tutorial_embed,
-            options=options
-        ), ephemeral=True)
+        ), view=view, ephemeral=True)
 
     @discord.ui.button(label="ﾠﾠﾠEditﾠﾠﾠ", style=discord.ButtonStyle.gray, row=1)
+    @instrumented
     async def edit_field(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the edit field button.
 
@@ -164,7 +535,7 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        fields = interaction.message.embeds[0].fields
+        fields = self.draft.fields
         if not fields:
             await interaction.response.send_message(embed=discord.Embed(
                 title="Error",
@@ -173,29 +544,36 @@ class EmbedToolView(discord.ui.View):
                 timestamp=discord.utils.utcnow()
             ), ephemeral=True)
             return
-        tutorial_embed = None
-        if not self.tutorial_hidden:
-            tutorial_embed = self.tutorial_embed
-        options = []
-        for index, field in enumerate(fields):
-            options.append(discord.SelectOption(label=field.name, description=field.value, value=str(index)))
-        await interaction.response.send_message(embed=discord.Embed(
+        options = self.draft.field_options()
+        view = EditFieldView(editor=self, editor_interaction=interaction, options=options)
+        interaction.client.session_registry.add(view)
+        await interaction.response.defer()
+        await interaction.followup.send(embed=discord.Embed(
             title="Edit a Field",
-            description="Select the field you want to edit.",
+            description="Select the field you want to edit, reorder the fields or edit all of them at once.",
             color=discord.Color.green(),
             timestamp=discord.utils.utcnow()
-        ), view=EditFieldView(
-            ctx=self.ctx,
-            user_embed=interaction.message.embeds[0],
-            tutorial_embed=tutorial_embed,
-            options=options
-        ), ephemeral=True)
+        ), view=view, ephemeral=True)
+
+    @discord.ui.button(label="ﾠﾠRedoﾠﾠ", style=discord.ButtonStyle.gray, emoji="↪️", row=1)
+    @instrumented
+    async def redo(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+        """Callback for the redo button.
+
+        Parameters
+        ------------
+        button: discord.ui.Button
+            The button that was clicked.
+        interaction: discord.Interaction
+            The interaction that clicked the button."""
+        await self._replay_history(interaction, self.draft.history.redo, "There is nothing to redo.")
 
     @discord.ui.button(label="IMAGESﾠﾠ", style=discord.ButtonStyle.blurple, disabled=True, row=2)
     async def images_row(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         pass
 
     @discord.ui.button(label="Thumbnail", style=discord.ButtonStyle.gray, row=2)
+    @instrumented(auto_defer=False)
     async def set_thumbnail(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the thumbnail button.
 
@@ -205,16 +583,12 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        initial_thumbnail_url = interaction.message.embeds[0].thumbnail.url
-        tutorial_embed = None
-        if not self.tutorial_hidden:
-            tutorial_embed = self.tutorial_embed
         await interaction.response.send_modal(
-            ThumbnailModal(title="Set the Thumbnail", initial_thumbnail_url=initial_thumbnail_url,
-                           tutorial_embed=tutorial_embed)
+            ThumbnailModal(title="Set the Thumbnail", editor=self)
         )
 
     @discord.ui.button(label="⠀ﾠImage⠀ﾠ", style=discord.ButtonStyle.gray, row=2)
+    @instrumented(auto_defer=False)
     async def set_image(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the image button.
 
@@ -224,15 +598,12 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        initial_image_url = interaction.message.embeds[0].image.url
-        tutorial_embed = None
-        if not self.tutorial_hidden:
-            tutorial_embed = self.tutorial_embed
         await interaction.response.send_modal(
-            ImageModal(title="Set the Image", initial_image_url=initial_image_url, tutorial_embed=tutorial_embed)
+            ImageModal(title="Set the Image", editor=self)
         )
 
     @discord.ui.button(label="ﾠﾠFooterﾠﾠ", style=discord.ButtonStyle.gray, row=2)
+    @instrumented(auto_defer=False)
     async def set_footer_image(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the footer image button.
 
@@ -242,20 +613,31 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        initial_footer_icon_url = interaction.message.embeds[0].footer.icon_url
-        tutorial_embed = None
-        if not self.tutorial_hidden:
-            tutorial_embed = self.tutorial_embed
         await interaction.response.send_modal(
-            FooterImageModal(title="Set the Footer Image", initial_footer_image_url=initial_footer_icon_url,
-                             tutorial_embed=tutorial_embed)
+            FooterImageModal(title="Set the Footer Image", editor=self)
         )
 
+    @discord.ui.button(label="Embed 1/1", style=discord.ButtonStyle.gray, disabled=True, row=2)
+    @instrumented
+    async def cycle_embed(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+        """Callback for the embed counter button, switches to the next embed of the message.
+
+        Parameters
+        ------------
+        button: discord.ui.Button
+            The button that was clicked.
+        interaction: discord.Interaction
+            The interaction that clicked the button."""
+        self.index = (self.index + 1) % len(self.drafts)
+        self._update_embed_buttons()
+        await interaction.response.edit_message(embeds=self.render(), view=self)
+
     @discord.ui.button(label="OPTIONSﾠ", style=discord.ButtonStyle.blurple, disabled=True, row=3)
     async def options_row(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         pass
 
     @discord.ui.button(label="ﾠAuthorﾠﾠ", style=discord.ButtonStyle.gray, row=3)
+    @instrumented
     async def set_author(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the author button.
 
@@ -265,19 +647,19 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        user_embed = interaction.message.embeds[0]
         if self.author_hidden:
-            self.author_hidden = False
-            user_embed.set_author(name=interaction.user.display_name, icon_url=interaction.user.avatar.url)
+            if (error := self.draft.check("author_name", interaction.user.display_name)) is not None:
+                await interaction.response.send_message(embed=over_limit_embed(error), ephemeral=True)
+                return
+            self.draft.author_name = interaction.user.display_name
+            self.draft.author_icon_url = interaction.user.avatar.url
         else:
-            self.author_hidden = True
-            user_embed.remove_author()
-        if not self.tutorial_hidden:
-            await interaction.response.edit_message(embeds=[user_embed, self.tutorial_embed])
-            return
-        await interaction.response.edit_message(embed=user_embed)
+            self.draft.author_name = None
+            self.draft.author_icon_url = None
+        await self.refresh(interaction)
 
     @discord.ui.button(label="ﾠﾠFooterﾠﾠ", style=discord.ButtonStyle.gray, row=3)
+    @instrumented(auto_defer=False)
     async def set_footer_text(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the footer text button.
 
@@ -287,18 +669,12 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        initial_footer = interaction.message.embeds[0].footer.text
-        if initial_footer == "⠀":
-            initial_footer = None
-        tutorial_embed = None
-        if not self.tutorial_hidden:
-            tutorial_embed = self.tutorial_embed
         await interaction.response.send_modal(
-            FooterTextModal(title="Set the Embed Description", initial_footer=initial_footer,
-                            tutorial_embed=tutorial_embed)
+            FooterTextModal(title="Set the Embed Description", editor=self)
         )
 
     @discord.ui.button(label="Timestamp", style=discord.ButtonStyle.gray, row=3)
+    @instrumented
     async def set_timestamp(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the timestamp button.
 
@@ -308,23 +684,41 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        user_embed = interaction.message.embeds[0]
         if self.timestamp_hidden:
-            self.timestamp_hidden = False
-            user_embed.timestamp = discord.utils.utcnow()
+            self.draft.timestamp = discord.utils.utcnow()
         else:
-            self.timestamp_hidden = True
-            user_embed.timestamp = discord.Embed.Empty
-        if not self.tutorial_hidden:
-            await interaction.response.edit_message(embeds=[user_embed, self.tutorial_embed])
+            self.draft.timestamp = None
+        await self.refresh(interaction)
+
+    @discord.ui.button(label="New Embed", style=discord.ButtonStyle.gray, row=3)
+    @instrumented
+    async def new_embed(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+        """Callback for the new embed button, adds an embed to the message and switches to it.
+
+        Parameters
+        ------------
+        button: discord.ui.Button
+            The button that was clicked.
+        interaction: discord.Interaction
+            The interaction that clicked the button."""
+        if len(self.drafts) >= EMBED_COUNT_LIMIT:
+            await interaction.response.send_message(embed=over_limit_embed(
+                f"Messages can't have more than {EMBED_COUNT_LIMIT} embeds."
+            ), ephemeral=True, delete_after=10)
             return
-        await interaction.response.edit_message(embed=user_embed)
+        draft = EmbedDraft()
+        draft.color = self.draft.color
+        self.drafts.append(self._track(draft))
+        self.index = len(self.drafts) - 1
+        self._update_embed_buttons()
+        await interaction.response.edit_message(embeds=self.render(), view=self)
 
     @discord.ui.button(label="SETTINGS", style=discord.ButtonStyle.blurple, disabled=True, row=4)
     async def settings_row(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         pass
 
     @discord.ui.button(label="⠀ﾠSend⠀⠀", style=discord.ButtonStyle.green, row=4)
+    @instrumented
     async def send_embed(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the send button.
 
@@ -334,18 +728,52 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        user_embed = interaction.message.embeds[0]
+        drafts = self.publishable()
+        error = None
+        if not drafts:
+            error = "All embeds are empty, please add some content first."
+        elif (length := sum(draft.length for draft in drafts)) > TOTAL_LIMIT:
+            error = f"The embeds of a message can't be longer than {TOTAL_LIMIT} characters in total, " \
+                    f"these have {length}."
+        if error is not None:
+            await interaction.response.send_message(embed=discord.Embed(
+                title="Error",
+                description=error,
+                color=discord.Color.red(),
+                timestamp=discord.utils.utcnow()
+            ), ephemeral=True, delete_after=10)
+            return
+        user_embeds = [draft.to_embed() for draft in drafts]
+        outbound = interaction.client.outbound
         await interaction.response.defer()
         if self.is_new_embed:
-            message = await self.channel.send(embed=user_embed)
+            message = await outbound.submit(("channel", self.channel.id),
+                                            lambda: self.channel.send(embeds=user_embeds))
+            interaction.client.message_cache.put(message)
+            interaction.client.embed_index.add(message)
+            interaction.client.metrics.increment("publishes_total", outcome="sent")
             await interaction.followup.send(embed=discord.Embed(
                 title="Embed Send",
                 description=f"[Jump to message]({message.jump_url})",
                 color=discord.Color.green(),
                 timestamp=discord.utils.utcnow()
             ), ephemeral=True)
+        elif self.fingerprint() == self.original_fingerprint:
+            interaction.client.metrics.increment("publishes_total", outcome="skipped")
+            await interaction.followup.send(embed=discord.Embed(
+                title="Nothing Changed",
+                description=f"The [embeds]({self.message.jump_url}) are identical to the original ones, "
+                            "they were left as is.",
+                color=discord.Color.green(),
+                timestamp=discord.utils.utcnow()
+            ), ephemeral=True)
         else:
-            await self.message.edit(embed=user_embed)
+            message = await outbound.submit(("channel", self.channel.id),
+                                            lambda: self.message.edit(embeds=user_embeds),
+                                            key=("publish", self.message.id))
+            interaction.client.message_cache.put(message)
+            interaction.client.embed_index.add(message)
+            interaction.client.metrics.increment("publishes_total", outcome="sent")
             await interaction.followup.send(embed=discord.Embed(
                 title="Embed Edited",
                 description=f"[Jump to message]({self.message.jump_url})",
@@ -353,8 +781,39 @@ class EmbedToolView(discord.ui.View):
                 timestamp=discord.utils.utcnow()
             ), ephemeral=True)
         await interaction.delete_original_response()
+        self.close_session()
+
+    @discord.ui.button(label="Broadcast", style=discord.ButtonStyle.blurple, row=4)
+    @instrumented
+    async def broadcast_embed(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+        """Callback for the broadcast button.
+
+        Parameters
+        ------------
+        button: discord.ui.Button
+            The button that was clicked.
+        interaction: discord.Interaction
+            The interaction that clicked the button."""
+        if not self.publishable():
+            await interaction.response.send_message(embed=discord.Embed(
+                title="Error",
+                description="All embeds are empty, please add some content first.",
+                color=discord.Color.red(),
+                timestamp=discord.utils.utcnow()
+            ), ephemeral=True, delete_after=10)
+            return
+        view = BroadcastView(editor=self)
+        interaction.client.session_registry.add(view)
+        await interaction.response.defer()
+        await interaction.followup.send(embed=discord.Embed(
+            title="Broadcast the Embeds",
+            description="Select up to 25 channels to send the embeds to.",
+            color=discord.Color.green(),
+            timestamp=discord.utils.utcnow()
+        ), view=view, ephemeral=True)
 
     @discord.ui.button(label="ﾠTutorialﾠﾠ", style=discord.ButtonStyle.gray, row=4)
+    @instrumented
     async def show_tutorial(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the tutorial button.
 
@@ -364,15 +823,11 @@ class EmbedToolView(discord.ui.View):
             The button that was clicked.
         interaction: discord.Interaction
             The interaction that clicked the button."""
-        user_embed = interaction.message.embeds[0]
-        if self.tutorial_hidden:
-            self.tutorial_hidden = False
-            await interaction.response.edit_message(embeds=[user_embed, self.tutorial_embed])
-            return
-        self.tutorial_hidden = True
-        await interaction.response.edit_message(embed=user_embed)
+        self.tutorial_hidden = not self.tutorial_hidden
+        await self.refresh(interaction, force=True)
 
     @discord.ui.button(label="ﾠﾠCancelﾠﾠ", style=discord.ButtonStyle.red, row=4)
+    @instrumented
     async def cancel_editing(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
         """Callback for the cancel button.
 
@@ -385,19 +840,21 @@ class EmbedToolView(discord.ui.View):
         if self.canceled_before:
             await interaction.response.defer()
             await interaction.delete_original_response()
+            self.close_session()
             return
         self.canceled_before = True
+        self.save()
         button.label = "ﾠConfirmﾠﾠ"
         await interaction.response.edit_message(view=self)
 
 
-def get_tutorial_embed(ctx: discord.ApplicationContext) -> discord.Embed:
+def get_tutorial_embed(ctx: discord.ApplicationContext | discord.Interaction) -> discord.Embed:
     """Returns the tutorial embed.
 
     Parameters
     ------------
-    ctx: discord.ApplicationContext
-        The context used for command invocation."""
+    ctx: discord.ApplicationContext | discord.Interaction
+        The context or interaction to build the tutorial embed for."""
     tutorial_embed = discord.Embed(
         title="Title",
         description="Description",
@@ -408,7 +865,7 @@ def get_tutorial_embed(ctx: discord.ApplicationContext) -> discord.Embed:
     tutorial_embed.add_field(name="Inline Field 2", value="Value 2")
     tutorial_embed.add_field(name="Inline Field 3", value="Inline fields will be next to each other!")
     tutorial_embed.add_field(name="Non-inline Field", value="Value", inline=False)
-    tutorial_embed.set_author(name="Author", icon_url=ctx.guild.me.avatar.url)
+    tutorial_embed.set_author(name="Author", icon_url=ctx.guild.me.display_avatar.url)
     tutorial_embed.set_footer(text="Footer", icon_url="https://cdn.discordapp.com/attachments/751512715872436416"
                                                       "/1125701630273261629/13YRA70M.png")
     tutorial_embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/751512715872436416"
@@ -416,3 +873,64 @@ def get_tutorial_embed(ctx: discord.ApplicationContext) -> discord.Embed:
     tutorial_embed.set_image(url="https://cdn.discordapp.com/attachments/751512715872436416/1125132939160731799"
                                  "/kJ9NYtR1.png")
     return tutorial_embed
+
+
+class TutorialEmbedCache:
+    """Bounded per-guild cache of prebuilt tutorial embeds.
+
+    Entries are keyed on the guild and validated against the bot member's color and avatar, so a stale entry is
+    rebuilt even if an invalidation event was missed. The least recently used guilds are evicted first."""
+
+    def __init__(self, max_size: int = 1000):
+        """Initializes the cache.
+
+        Parameters
+        ------------
+        max_size: int
+            The maximum number of guilds to keep tutorial embeds for."""
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._embeds: OrderedDict[int, tuple[tuple[int, str], discord.Embed]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._embeds)
+
+    @property
+    def hit_rate(self) -> float:
+        """The ratio of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, ctx: discord.ApplicationContext | discord.Interaction) -> discord.Embed:
+        """Returns the tutorial embed for the guild of the context, building it if needed.
+
+        The returned embed is shared between sessions and must not be mutated.
+
+        Parameters
+        ------------
+        ctx: discord.ApplicationContext | discord.Interaction
+            The context or interaction to get the tutorial embed for."""
+        me = ctx.guild.me
+        key = (me.color.value, me.display_avatar.key)
+        entry = self._embeds.get(ctx.guild.id)
+        if entry is not None and entry[0] == key:
+            self._embeds.move_to_end(ctx.guild.id)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        tutorial_embed = get_tutorial_embed(ctx=ctx)
+        self._embeds[ctx.guild.id] = (key, tutorial_embed)
+        self._embeds.move_to_end(ctx.guild.id)
+        while len(self._embeds) > self.max_size:
+            self._embeds.popitem(last=False)
+        return tutorial_embed
+
+    def invalidate(self, guild_id: int) -> None:
+        """Drops the cached tutorial embed of a guild.
+
+        Parameters
+        ------------
+        guild_id: int
+            The ID of the guild to drop the tutorial embed for."""
+        self._embeds.pop(guild_id, None)
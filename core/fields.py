@@ -1,17 +1,28 @@
+from typing import TYPE_CHECKING
+
 import discord
 
+from .draft import EmbedDraft, over_limit_embed
+from .metrics import instrumented
+from .serialization import INPUT_TEXT_LIMIT, dump_fields, parse_fields
+from .sessions import TrackedView
+
+if TYPE_CHECKING:
+    from .embedTool import EmbedToolView
+
 
 class AddFieldModal(discord.ui.Modal):
     """Modal for receiving a field to be added to an embed to send or edit."""
 
-    def __init__(self, *args, tutorial_embed=None, **kwargs):
+    def __init__(self, *args, editor: "EmbedToolView", **kwargs):
         """Initialize the modal.
 
         Parameters
         ------------
-        tutorial_embed: discord.Embed | None
-            The embed to show in the tutorial."""
-        self.tutorial_embed: discord.Embed | None = tutorial_embed
+        editor: EmbedToolView
+            The editor whose draft to modify."""
+        self.editor: "EmbedToolView" = editor
+        self.draft: EmbedDraft = editor.draft
         super().__init__(
             discord.ui.InputText(
                 label="Field Title:",
@@ -38,6 +49,7 @@ class AddFieldModal(discord.ui.Modal):
             **kwargs
         )
 
+    @instrumented
     async def callback(self, interaction: discord.Interaction) -> None:
         """Callback for when the modal is submitted.
 
@@ -45,7 +57,6 @@ class AddFieldModal(discord.ui.Modal):
         ------------
         interaction: discord.Interaction
             The interaction that submitted the modal."""
-        user_embed: discord.Embed = interaction.message.embeds[0]
         title = self.children[0].value
         value = self.children[1].value
         inline_str = self.children[2].value.lower()
@@ -61,79 +72,99 @@ class AddFieldModal(discord.ui.Modal):
                 timestamp=discord.utils.utcnow()
             ), ephemeral=True)
             return
-        user_embed.add_field(name=title, value=value, inline=inline)
-        if self.tutorial_embed:
-            await interaction.response.edit_message(embeds=[user_embed, self.tutorial_embed])
+        if not await self.editor.check_draft(interaction, self.draft):
+            return
+        if (error := self.draft.check_field(title, value)) is not None:
+            await interaction.response.send_message(embed=over_limit_embed(error), ephemeral=True)
             return
-        await interaction.response.edit_message(embed=user_embed)
+        self.draft.add_field(name=title, value=value, inline=inline)
+        await self.editor.refresh(interaction)
 
 
-class RemoveFieldView(discord.ui.View):
-    """View for removing a field from an embed."""
+class RemoveFieldView(TrackedView):
+    """View for removing fields from an embed.
 
-    def __init__(self, *args, ctx: discord.ApplicationContext, user_embed: discord.Embed, tutorial_embed=None,
+    The view keeps the draft it was opened on and refuses to remove fields once that draft changed or the user
+    switched to another embed, as the options would point at the wrong fields."""
+
+    def __init__(self, *args, editor: "EmbedToolView", editor_interaction: discord.Interaction,
                  options: list[discord.SelectOption], **kwargs):
         """Initialize the view.
 
         Parameters
         ------------
-        ctx: discord.ApplicationContext
-            The context used for command invocation.
-        tutorial_embed: discord.Embed | None
-            The embed to show in the tutorial.
+        editor: EmbedToolView
+            The editor whose draft to modify.
+        editor_interaction: discord.Interaction
+            The deferred interaction with the editor message, used to update the preview.
         options: list[discord.SelectOption]
             The options to show in the select."""
-        self.ctx: discord.ApplicationContext = ctx
-        self.user_embed: discord.Embed = user_embed
-        self.tutorial_embed: discord.Embed | None = tutorial_embed
-        super().__init__(*args, **kwargs)
+        self.editor: "EmbedToolView" = editor
+        self.editor_interaction: discord.Interaction = editor_interaction
+        self.draft: EmbedDraft = editor.draft
+        self.draft_version: int = self.draft.version
+        super().__init__(*args, disable_on_timeout=True, **kwargs)
         self.remove_field.options = options
+        self.remove_field.max_values = len(options)
+
+    def estimated_size(self) -> int:
+        """Returns the estimated memory held by this view and its options in bytes."""
+        return self.BASE_SIZE + sum(150 + len(option.label) + len(option.description or "")
+                                    for option in self.remove_field.options)
 
-    @discord.ui.string_select(placeholder="Please select a field to remove...")
+    @discord.ui.string_select(placeholder="Please select the fields to remove...")
+    @instrumented
     async def remove_field(self, select: discord.ui.Select, interaction: discord.Interaction) -> None:
-        """Callback for when a field is selected to be removed.
+        """Callback for when fields are selected to be removed.
 
         Parameters
         ------------
         select: discord.ui.Select
-            The select that was used to select the field.
+            The select that was used to select the fields.
         interaction: discord.Interaction
-            The interaction that selected the field."""
-        print("remove field inside view")
-        await interaction.response.defer()
-        field_index: int = int(select.values[0])
-        self.user_embed.remove_field(field_index)
-        if self.tutorial_embed:
-            await self.ctx.edit(embeds=[self.user_embed, self.tutorial_embed])
+            The interaction that selected the fields."""
+        if not await self.editor.check_draft(interaction, self.draft, self.draft_version):
             return
-        await self.ctx.edit(embed=self.user_embed)
+        await interaction.response.defer()
+        for field_index in sorted(map(int, select.values), reverse=True):
+            self.draft.remove_field(field_index)
+        await self.editor.update_preview(self.editor_interaction)
         await interaction.delete_original_response()
 
 
-class EditFieldView(discord.ui.View):
-    """View for editing a field from an embed."""
+class EditFieldView(TrackedView):
+    """View for editing a field from an embed.
+
+    Like :class:`RemoveFieldView`, the view refuses to open a modal once its draft changed or was switched."""
 
-    def __init__(self, *args, ctx: discord.ApplicationContext, user_embed: discord.Embed, tutorial_embed=None,
+    def __init__(self, *args, editor: "EmbedToolView", editor_interaction: discord.Interaction,
                  options: list[discord.SelectOption], **kwargs):
         """Initialize the view.
 
         Parameters
         ------------
-        ctx: discord.ApplicationContext
-            The context used for command invocation.
-        tutorial_embed: discord.Embed | None
-            The embed to show in the tutorial.
+        editor: EmbedToolView
+            The editor whose draft to modify.
+        editor_interaction: discord.Interaction
+            The deferred interaction with the editor message, used to update the preview.
         options: list[discord.SelectOption]
             The options to show in the select."""
-        self.ctx: discord.ApplicationContext = ctx
-        self.user_embed: discord.Embed = user_embed
-        self.tutorial_embed: discord.Embed | None = tutorial_embed
-        super().__init__(*args, **kwargs)
+        self.editor: "EmbedToolView" = editor
+        self.editor_interaction: discord.Interaction = editor_interaction
+        self.draft: EmbedDraft = editor.draft
+        self.draft_version: int = self.draft.version
+        super().__init__(*args, disable_on_timeout=True, **kwargs)
         self.edit_field.options = options
 
-    @discord.ui.string_select(placeholder="Please select a field to remove...")
+    def estimated_size(self) -> int:
+        """Returns the estimated memory held by this view and its options in bytes."""
+        return self.BASE_SIZE + sum(150 + len(option.label) + len(option.description or "")
+                                    for option in self.edit_field.options)
+
+    @discord.ui.string_select(placeholder="Please select a field to edit...", row=0)
+    @instrumented(auto_defer=False)
     async def edit_field(self, select: discord.ui.Select, interaction: discord.Interaction) -> None:
-        """Callback for when a field is selected to be removed.
+        """Callback for when a field is selected to be edited.
 
         Parameters
         ------------
@@ -141,40 +172,95 @@ class EditFieldView(discord.ui.View):
             The select that was used to select the field.
         interaction: discord.Interaction
             The interaction that selected the field."""
+        if not await self.editor.check_draft(interaction, self.draft, self.draft_version):
+            return
         field_index: int = int(select.values[0])
         await interaction.response.send_modal(
             EditFieldModal(
-                ctx=self.ctx,
                 title="Edit a Field",
-                user_embed=self.user_embed,
-                tutorial_embed=self.tutorial_embed,
+                editor=self.editor,
+                editor_interaction=self.editor_interaction,
                 field_index=field_index)
         )
         await interaction.delete_original_response()
 
+    @discord.ui.button(label="Reorder", style=discord.ButtonStyle.gray, row=1)
+    @instrumented(auto_defer=False)
+    async def reorder_fields(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+        """Callback for the reorder button.
+
+        Parameters
+        ------------
+        button: discord.ui.Button
+            The button that was clicked.
+        interaction: discord.Interaction
+            The interaction that clicked the button."""
+        if not await self.editor.check_draft(interaction, self.draft, self.draft_version):
+            return
+        await interaction.response.send_modal(
+            ReorderFieldsModal(title="Reorder the Fields", editor=self.editor,
+                               editor_interaction=self.editor_interaction)
+        )
+        await interaction.delete_original_response()
+
+    @discord.ui.button(label="Edit All", style=discord.ButtonStyle.gray, row=1)
+    @instrumented(auto_defer=False)
+    async def edit_all_fields(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+        """Callback for the edit all button.
+
+        Parameters
+        ------------
+        button: discord.ui.Button
+            The button that was clicked.
+        interaction: discord.Interaction
+            The interaction that clicked the button."""
+        if not await self.editor.check_draft(interaction, self.draft, self.draft_version):
+            return
+        try:
+            texts = dump_fields(self.draft.fields)
+        except ValueError as e:
+            await interaction.response.send_message(embed=discord.Embed(
+                title="Error",
+                description=str(e),
+                color=discord.Color.red(),
+                timestamp=discord.utils.utcnow()
+            ), ephemeral=True)
+            return
+        await interaction.response.send_modal(
+            BulkFieldModal(title="Edit All Fields", editor=self.editor, editor_interaction=self.editor_interaction,
+                           texts=texts)
+        )
+        await interaction.delete_original_response()
+
 
 class EditFieldModal(discord.ui.Modal):
     """Modal for editing a field in an embed."""
 
-    def __init__(self, *args, ctx: discord.ApplicationContext, user_embed: discord.Embed, tutorial_embed=None,
-                 field_index: int, **kwargs):
+    def __init__(self, *args, editor: "EmbedToolView", editor_interaction: discord.Interaction, field_index: int,
+                 **kwargs):
         """Initialize the modal.
 
         Parameters
         ------------
-        tutorial_embed: discord.Embed | None
-            The embed to show in the tutorial."""
-        self.ctx: discord.ApplicationContext = ctx
-        self.user_embed: discord.Embed = user_embed
-        self.tutorial_embed: discord.Embed | None = tutorial_embed
+        editor: EmbedToolView
+            The editor whose draft to modify.
+        editor_interaction: discord.Interaction
+            The deferred interaction with the editor message, used to update the preview.
+        field_index: int
+            The index of the field to edit."""
+        self.editor: "EmbedToolView" = editor
+        self.editor_interaction: discord.Interaction = editor_interaction
         self.field_index: int = field_index
+        self.draft: EmbedDraft = editor.draft
+        self.draft_version: int = self.draft.version
+        field = self.draft.fields[self.field_index]
         super().__init__(
             discord.ui.InputText(
                 label="Field Title:",
                 placeholder="Please enter the title of the field...",
                 style=discord.InputTextStyle.long,
                 max_length=256,
-                value=self.user_embed.fields[self.field_index].name,
+                value=field.name,
                 required=False
             ),
             discord.ui.InputText(
@@ -182,7 +268,7 @@ class EditFieldModal(discord.ui.Modal):
                 placeholder="Please enter the value of the field...",
                 style=discord.InputTextStyle.long,
                 max_length=1024,
-                value=self.user_embed.fields[self.field_index].value,
+                value=field.value,
                 required=False
             ),
             discord.ui.InputText(
@@ -190,13 +276,14 @@ class EditFieldModal(discord.ui.Modal):
                 placeholder="Whether the field should be inline (True/False)...",
                 style=discord.InputTextStyle.short,
                 max_length=5,
-                value=str(self.user_embed.fields[self.field_index].inline),
+                value=str(field.inline),
                 required=True
             ),
             *args,
             **kwargs
         )
 
+    @instrumented
     async def callback(self, interaction: discord.Interaction) -> None:
         """Callback for when the modal is submitted.
 
@@ -204,7 +291,6 @@ class EditFieldModal(discord.ui.Modal):
         ------------
         interaction: discord.Interaction
             The interaction that submitted the modal."""
-        await interaction.response.defer()
         title = self.children[0].value
         value = self.children[1].value
         inline_str = self.children[2].value.lower()
@@ -220,8 +306,138 @@ class EditFieldModal(discord.ui.Modal):
                 timestamp=discord.utils.utcnow()
             ), ephemeral=True)
             return
-        self.user_embed.set_field_at(index=self.field_index, name=title, value=value, inline=inline)
-        if self.tutorial_embed:
-            await self.ctx.edit(embeds=[self.user_embed, self.tutorial_embed])
+        if not await self.editor.check_draft(interaction, self.draft, self.draft_version):
+            return
+        if (error := self.draft.check_field(title, value, self.field_index)) is not None:
+            await interaction.response.send_message(embed=over_limit_embed(error), ephemeral=True)
+            return
+        await interaction.response.defer()
+        self.draft.set_field_at(index=self.field_index, name=title, value=value, inline=inline)
+        await self.editor.update_preview(self.editor_interaction)
+
+
+class ReorderFieldsModal(discord.ui.Modal):
+    """Modal for reordering the fields of an embed."""
+
+    def __init__(self, *args, editor: "EmbedToolView", editor_interaction: discord.Interaction, **kwargs):
+        """Initialize the modal.
+
+        Parameters
+        ------------
+        editor: EmbedToolView
+            The editor whose draft to modify.
+        editor_interaction: discord.Interaction
+            The deferred interaction with the editor message, used to update the preview."""
+        self.editor: "EmbedToolView" = editor
+        self.editor_interaction: discord.Interaction = editor_interaction
+        self.draft: EmbedDraft = editor.draft
+        self.draft_version: int = self.draft.version
+        super().__init__(
+            discord.ui.InputText(
+                label="Field Order:",
+                placeholder="Please enter the field numbers in the new order, e.g. 3, 1, 2...",
+                style=discord.InputTextStyle.short,
+                max_length=100,
+                value=", ".join(str(index) for index in range(1, len(self.draft.fields) + 1)),
+                required=True
+            ),
+            *args,
+            **kwargs
+        )
+
+    @instrumented
+    async def callback(self, interaction: discord.Interaction) -> None:
+        """Callback for when the modal is submitted.
+
+        Fields missing from the order keep their relative order after the listed ones, so entering a single
+        number moves that field to the top.
+
+        Parameters
+        ------------
+        interaction: discord.Interaction
+            The interaction that submitted the modal."""
+        if not await self.editor.check_draft(interaction, self.draft, self.draft_version):
+            return
+        fields = self.draft.fields
+        numbers = self.children[0].value.replace(",", " ").split()
+        order = [int(number) - 1 for number in numbers if number.isascii() and number.isdecimal()]
+        if len(order) != len(numbers) or len(set(order)) != len(order) \
+                or not all(0 <= index < len(fields) for index in order):
+            await interaction.response.send_message(embed=discord.Embed(
+                title="Invalid Order",
+                description=f"Please enter each field number from 1 to {len(fields)} at most once, "
+                            f"separated by commas.",
+                color=discord.Color.red(),
+                timestamp=discord.utils.utcnow()
+            ), ephemeral=True)
+            return
+        order += [index for index in range(len(fields)) if index not in order]
+        await interaction.response.defer()
+        if order != sorted(order):
+            self.draft.fields = [fields[index] for index in order]
+        await self.editor.update_preview(self.editor_interaction)
+
+
+class BulkFieldModal(discord.ui.Modal):
+    """Modal for editing all fields of an embed at once, written as one JSON object per line."""
+
+    def __init__(self, *args, editor: "EmbedToolView", editor_interaction: discord.Interaction, texts: list[str],
+                 **kwargs):
+        """Initialize the modal.
+
+        Parameters
+        ------------
+        editor: EmbedToolView
+            The editor whose draft to modify.
+        editor_interaction: discord.Interaction
+            The deferred interaction with the editor message, used to update the preview.
+        texts: list[str]
+            The current fields as returned by :func:`dump_fields`, one input is shown per text."""
+        self.editor: "EmbedToolView" = editor
+        self.editor_interaction: discord.Interaction = editor_interaction
+        self.draft: EmbedDraft = editor.draft
+        self.draft_version: int = self.draft.version
+        if len(texts) < 5:
+            texts = [*texts, ""]
+        super().__init__(
+            *(discord.ui.InputText(
+                label="Fields (one per line):" if index == 0 else "More fields:",
+                placeholder='{"name": "Title", "value": "Text", "inline": true}',
+                style=discord.InputTextStyle.long,
+                max_length=INPUT_TEXT_LIMIT,
+                value=text or None,
+                required=False
+            ) for index, text in enumerate(texts)),
+            *args,
+            **kwargs
+        )
+
+    @instrumented
+    async def callback(self, interaction: discord.Interaction) -> None:
+        """Callback for when the modal is submitted.
+
+        Parameters
+        ------------
+        interaction: discord.Interaction
+            The interaction that submitted the modal."""
+        if not await self.editor.check_draft(interaction, self.draft, self.draft_version):
+            return
+        try:
+            fields = parse_fields([child.value or "" for child in self.children])
+        except ValueError as e:
+            await interaction.response.send_message(embed=discord.Embed(
+                title="Invalid Fields",
+                description=f"{e} Your changes were not applied.",
+                color=discord.Color.red(),
+                timestamp=discord.utils.utcnow()
+            ), ephemeral=True)
+            return
+        if (error := self.draft.check_fields(fields)) is not None:
+            await interaction.response.send_message(embed=over_limit_embed(error), ephemeral=True)
             return
-        await self.ctx.edit(embed=self.user_embed)
+        await interaction.response.defer()
+        draft = self.draft
+        if [(field.name, field.value, field.inline) for field in fields] \
+                != [(field.name, field.value, field.inline) for field in draft.fields]:
+            draft.fields = fields
+        await self.editor.update_preview(self.editor_interaction)
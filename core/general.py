@@ -1,33 +1,41 @@
+from typing import TYPE_CHECKING
+
 import discord
 from discord.ext import commands
 
+from .draft import EmbedDraft, over_limit_embed
+from .metrics import instrumented
+
+if TYPE_CHECKING:
+    from .embedTool import EmbedToolView
+
 
 class TitleModal(discord.ui.Modal):
     """Modal for receiving the title of an embed to send or edit."""
 
-    def __init__(self, *args, initial_title: str, tutorial_embed=None, **kwargs):
+    def __init__(self, *args, editor: "EmbedToolView", **kwargs):
         """Initialize the modal.
 
         Parameters
         ------------
-        initial_title: str
-            The initial title of the embed.
-        tutorial_embed: discord.Embed | None
-            The embed to show in the tutorial."""
-        self.tutorial_embed: discord.Embed | None = tutorial_embed
+        editor: EmbedToolView
+            The editor whose draft to modify."""
+        self.editor: "EmbedToolView" = editor
+        self.draft: EmbedDraft = editor.draft
         super().__init__(
             discord.ui.InputText(
                 label="Embed Title:",
                 placeholder="Please enter the title of the embed...",
                 style=discord.InputTextStyle.long,
                 max_length=256,
-                value=initial_title,
+                value=self.draft.title,
                 required=False
             ),
             *args,
             **kwargs
         )
 
+    @instrumented
     async def callback(self, interaction: discord.Interaction) -> None:
         """Callback for when the modal is submitted.
 
@@ -35,40 +43,41 @@ class TitleModal(discord.ui.Modal):
         ------------
         interaction: discord.Interaction
             The interaction that submitted the modal."""
-        user_embed: discord.Embed = interaction.message.embeds[0]
-        user_embed.title = self.children[0].value
-        if self.tutorial_embed:
-            await interaction.response.edit_message(embeds=[user_embed, self.tutorial_embed])
+        if not await self.editor.check_draft(interaction, self.draft):
+            return
+        if (error := self.draft.check("title", self.children[0].value)) is not None:
+            await interaction.response.send_message(embed=over_limit_embed(error), ephemeral=True)
             return
-        await interaction.response.edit_message(embed=user_embed)
+        self.draft.title = self.children[0].value
+        await self.editor.refresh(interaction)
 
 
 class DescriptionModal(discord.ui.Modal):
     """Modal for receiving the description of an embed to send or edit."""
 
-    def __init__(self, *args, initial_description: str, tutorial_embed=None, **kwargs):
+    def __init__(self, *args, editor: "EmbedToolView", **kwargs):
         """Initialize the modal.
 
         Parameters
         ------------
-        initial_description: str
-            The initial description of the embed.
-        tutorial_embed: discord.Embed | None
-            The embed to show in the tutorial."""
-        self.tutorial_embed: discord.Embed | None = tutorial_embed
+        editor: EmbedToolView
+            The editor whose draft to modify."""
+        self.editor: "EmbedToolView" = editor
+        self.draft: EmbedDraft = editor.draft
         super().__init__(
             discord.ui.InputText(
                 label="Embed Description:",
                 placeholder="Please enter the description of the embed...",
                 style=discord.InputTextStyle.long,
                 max_length=4000,
-                value=initial_description,
+                value=self.draft.description,
                 required=False
             ),
             *args,
             **kwargs
         )
 
+    @instrumented
     async def callback(self, interaction: discord.Interaction) -> None:
         """Callback for when the modal is submitted.
 
@@ -76,27 +85,30 @@ class DescriptionModal(discord.ui.Modal):
         ------------
         interaction: discord.Interaction
             The interaction that submitted the modal."""
-        user_embed: discord.Embed = interaction.message.embeds[0]
-        user_embed.description = self.children[0].value
-        if self.tutorial_embed:
-            await interaction.response.edit_message(embeds=[user_embed, self.tutorial_embed])
+        if not await self.editor.check_draft(interaction, self.draft):
             return
-        await interaction.response.edit_message(embed=user_embed)
+        if (error := self.draft.check("description", self.children[0].value)) is not None:
+            await interaction.response.send_message(embed=over_limit_embed(error), ephemeral=True)
+            return
+        self.draft.description = self.children[0].value
+        await self.editor.refresh(interaction)
 
 
 class ColorModal(discord.ui.Modal):
     """Modal for receiving the color of an embed to send or edit."""
 
-    def __init__(self, *args, initial_color: str, tutorial_embed=None, **kwargs):
+    def __init__(self, *args, editor: "EmbedToolView", **kwargs):
         """Initialize the modal.
 
         Parameters
         ------------
-        initial_color: str
-            The initial color of the embed.
-        tutorial_embed: discord.Embed | None
-            The embed to show in the tutorial."""
-        self.tutorial_embed: discord.Embed | None = tutorial_embed
+        editor: EmbedToolView
+            The editor whose draft to modify."""
+        self.editor: "EmbedToolView" = editor
+        self.draft: EmbedDraft = editor.draft
+        initial_color = None
+        if self.draft.color is not None:
+            initial_color = str(self.draft.color)
         super().__init__(
             discord.ui.InputText(
                 label="Embed Color:",
@@ -110,6 +122,7 @@ class ColorModal(discord.ui.Modal):
             **kwargs
         )
 
+    @instrumented
     async def callback(self, interaction: discord.Interaction) -> None:
         """Callback for when the modal is submitted.
 
@@ -117,15 +130,15 @@ class ColorModal(discord.ui.Modal):
         ------------
         interaction: discord.Interaction
             The interaction that submitted the modal."""
-        user_embed: discord.Embed = interaction.message.embeds[0]
+        if not await self.editor.check_draft(interaction, self.draft):
+            return
         color_string = self.children[0].value
         color = await commands.ColorConverter().convert(interaction, color_string)
-        user_embed.colour = color
-        if self.tutorial_embed:
-            self.tutorial_embed.colour = color
-            await interaction.response.edit_message(embeds=[user_embed, self.tutorial_embed])
-            return
-        await interaction.response.edit_message(embed=user_embed)
+        self.draft.color = color
+        tutorial_embed = self.editor.tutorial_embed.copy()
+        tutorial_embed.colour = color
+        self.editor.tutorial_embed = tutorial_embed
+        await self.editor.refresh(interaction)
 
     async def on_error(self, error: Exception, interaction: discord.Interaction) -> None:
         """Callback for when the modal has an error.
@@ -1,32 +1,432 @@
+import asyncio
+import hashlib
+import io
+import ipaddress
+import socket
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING
+
+import aiohttp
 import discord
+import yarl
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
+from .metrics import instrumented
+
+if TYPE_CHECKING:
+    from .draft import EmbedDraft
+    from .embedTool import EmbedToolView
+
+UNKNOWN = object()
+REDIRECT_STATUSES: frozenset[int] = frozenset({301, 302, 303, 307, 308})
+
+
+Network = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+def _check_address(address: str, allowed: tuple[Network, ...] = ()) -> None:
+    """Raises :exc:`OSError` if an IP address is not publicly routable and not in one of the allowed networks."""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    if any(ip in network for network in allowed):
+        return
+    if not ip.is_global or ip.is_multicast:
+        raise OSError(f"{address} is not a public address")
+
+
+class _PublicResolver(aiohttp.ThreadedResolver):
+    """Resolves host names and rejects them if any of their addresses is not public.
+
+    The connector connects to the addresses this resolver returns, so the checked addresses are the ones used."""
+
+    def __init__(self, allowed: tuple[Network, ...] = ()):
+        super().__init__()
+        self.allowed: tuple[Network, ...] = allowed
+
+    async def resolve(self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET) -> list:
+        addresses = await super().resolve(host, port, family)
+        for address in addresses:
+            _check_address(address["host"], self.allowed)
+        return addresses
+
+
+class ImageValidator:
+    """Checks that image URLs point to reachable images.
+
+    Uses a single connection-pooled HTTP session with bounded concurrency. Results are cached with a TTL, so a
+    repeated URL costs nothing, and concurrent checks of the same URL share one request.
+
+    Only public addresses are requested: host names are resolved and checked before connecting, the connection
+    uses the checked addresses, and redirects are followed manually so every target is checked the same way."""
+
+    def __init__(self, max_concurrency: int = 8, max_size: int = 8 * 1024 * 1024, ttl: float = 60 * 60,
+                 negative_ttl: float = 5 * 60, timeout: float = 5, max_entries: int = 4096,
+                 max_redirects: int = 3, allowed_networks: Iterable[str] = ()):
+        """Initializes the validator.
+
+        Parameters
+        ------------
+        max_concurrency: int
+            The maximum number of concurrent requests and pooled connections.
+        max_size: int
+            The maximum accepted size of an image in bytes.
+        ttl: float
+            The number of seconds to cache valid URLs for.
+        negative_ttl: float
+            The number of seconds to cache invalid URLs for.
+        timeout: float
+            The timeout of a single check in seconds.
+        max_entries: int
+            The maximum number of cached results.
+        max_redirects: int
+            The maximum number of redirects to follow.
+        allowed_networks: Iterable[str]
+            Networks such as ``"127.0.0.1/32"`` that may be requested although they are not public, e.g. for a
+            local test server or an internal image proxy."""
+        self.max_concurrency: int = max_concurrency
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self.negative_ttl: float = negative_ttl
+        self.timeout: float = timeout
+        self.max_entries: int = max_entries
+        self.max_redirects: int = max_redirects
+        self.allowed_networks: tuple[Network, ...] = tuple(ipaddress.ip_network(n) for n in allowed_networks)
+        self.hits: int = 0
+        self.misses: int = 0
+        self._session: aiohttp.ClientSession | None = None
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(max_concurrency)
+        self._results: OrderedDict[str, tuple[float, str | None]] = OrderedDict()
+        self._pending: dict[str, asyncio.Task] = {}
+
+    def cached(self, url: str):
+        """Returns the cached error of a URL, ``None`` if it is known to be valid or :data:`UNKNOWN`.
+
+        Parameters
+        ------------
+        url: str
+            The URL to look up."""
+        if not url.startswith(("http://", "https://")):
+            return "Image URLs have to start with http:// or https://."
+        entry = self._results.get(url)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return UNKNOWN
+        self._results.move_to_end(url)
+        self.hits += 1
+        return entry[1]
+
+    async def validate(self, url: str) -> str | None:
+        """Returns why the URL is not a valid image or ``None`` if it is valid.
+
+        Parameters
+        ------------
+        url: str
+            The URL to check."""
+        error = self.cached(url)
+        if error is not UNKNOWN:
+            return error
+        if (task := self._pending.get(url)) is None:
+            task = self._pending[url] = asyncio.create_task(self._check(url))
+            task.add_done_callback(lambda _: self._pending.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _check(self, url: str) -> str | None:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300,
+                                               resolver=_PublicResolver(self.allowed_networks)),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        async with self._semaphore:
+            try:
+                error = await self._request("HEAD", url)
+                if error is UNKNOWN:
+                    error = await self._request("GET", url)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError, ValueError):
+                error = "The image URL could not be reached."
+        ttl = self.negative_ttl if error else self.ttl
+        self._results[url] = (time.monotonic() + ttl, error)
+        self._results.move_to_end(url)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+        return error
+
+    async def _request(self, method: str, url: str):
+        """Requests the URL, following redirects, and returns the error or :data:`UNKNOWN` if HEAD is refused."""
+        target = yarl.URL(url)
+        for _ in range(self.max_redirects + 1):
+            if target.scheme not in ("http", "https") or not target.host:
+                raise ValueError("unsupported URL")
+            try:
+                ipaddress.ip_address(target.host)
+            except ValueError:
+                pass  # Host names are checked by the resolver, IP addresses don't go through it.
+            else:
+                _check_address(target.host, self.allowed_networks)
+            async with self._session.request(method, target, allow_redirects=False) as response:
+                if response.status in REDIRECT_STATUSES and "Location" in response.headers:
+                    target = response.url.join(yarl.URL(response.headers["Location"]))
+                    continue
+                if method == "HEAD" and response.status in (403, 405):
+                    return UNKNOWN
+                return self._check_response(response)
+        return "The image URL redirects too often."
+
+    def _check_response(self, response: aiohttp.ClientResponse) -> str | None:
+        if response.status >= 400:
+            return f"The image URL returned HTTP {response.status}."
+        if not response.content_type.startswith("image/"):
+            return f"The URL points to {response.content_type or 'unknown content'}, not an image."
+        if response.content_length is not None and response.content_length > self.max_size:
+            return f"The image is larger than {self.max_size // (1024 * 1024)} MB."
+        return None
+
+    async def close(self) -> None:
+        """Closes the HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+
+
+IMAGE_SIZES: dict[str, int] = {"thumbnail_url": 320, "image_url": 1600, "footer_icon_url": 64}
+
+
+def resize_image(data: bytes, max_size: int) -> tuple[bytes, str]:
+    """Downscales an image, strips its metadata and recompresses it.
+
+    The EXIF orientation is applied to the pixels first, so photos keep their orientation without the metadata.
+
+    Runs in a worker process, so it must stay a picklable module-level function.
+
+    Parameters
+    ------------
+    data: bytes
+        The encoded image.
+    max_size: int
+        The maximum width and height of the result in pixels.
+
+    Returns
+    ------------
+    tuple[bytes, str]
+        The encoded image and its file extension."""
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_size, max_size))
+        has_alpha = image.mode in ("RGBA", "LA", "P") and (image.mode != "P" or "transparency" in image.info)
+        output = io.BytesIO()
+        if has_alpha:
+            image.convert("RGBA").save(output, format="PNG", optimize=True)
+            return output.getvalue(), "png"
+        image.convert("RGB").save(output, format="JPEG", quality=85, optimize=True)
+        return output.getvalue(), "jpg"
+
+
+class ImageProcessor:
+    """Re-encodes uploaded images in a process pool and deduplicates them by content hash.
+
+    The same image uploaded for the same target is processed and uploaded only once, concurrent uploads of the
+    same image share one job. Asset URLs are remembered for less time than Discord's signed CDN URLs stay valid."""
+
+    def __init__(self, max_workers: int = 2, max_input_size: int = 8 * 1024 * 1024, max_entries: int = 1024,
+                 ttl: float = 12 * 60 * 60):
+        """Initializes the processor.
+
+        Parameters
+        ------------
+        max_workers: int
+            The number of worker processes.
+        max_input_size: int
+            The maximum accepted size of an uploaded image in bytes.
+        max_entries: int
+            The maximum number of remembered asset URLs.
+        ttl: float
+            The number of seconds to remember an asset URL for, it must be shorter than the lifetime of the URL's
+            signature."""
+        self.max_workers: int = max_workers
+        self.max_input_size: int = max_input_size
+        self.max_entries: int = max_entries
+        self.ttl: float = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._urls: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()
+        self._pending: dict[tuple[str, str], asyncio.Task] = {}
+
+    @property
+    def available(self) -> bool:
+        """Whether Pillow is installed and images can be processed."""
+        return Image is not None
+
+    def check(self, attachment: discord.Attachment) -> str | None:
+        """Returns why an attachment cannot be processed or ``None`` if it can.
+
+        Parameters
+        ------------
+        attachment: discord.Attachment
+            The uploaded attachment."""
+        if not self.available:
+            return "Image uploads are not available on this bot."
+        if not (attachment.content_type or "").startswith("image/"):
+            return "The uploaded file is not an image."
+        if attachment.size > self.max_input_size:
+            return f"The image is larger than {self.max_input_size // (1024 * 1024)} MB."
+        return None
+
+    async def process(self, attachment: discord.Attachment, attribute: str,
+                      upload: Callable[[discord.File], Awaitable[str]]) -> str:
+        """Returns the URL of the re-encoded attachment, processing and uploading it if it is not known yet.
+
+        Parameters
+        ------------
+        attachment: discord.Attachment
+            The uploaded attachment.
+        attribute: str
+            The draft attribute the image is for, e.g. ``"thumbnail_url"``.
+        upload: Callable[[discord.File], Awaitable[str]]
+            Uploads the processed file and returns its URL.
+
+        Raises
+        ------------
+        ValueError
+            The attachment is not an image that can be processed, the message says why.
+        discord.HTTPException
+            Reading the attachment or uploading the processed file failed."""
+        data = await attachment.read()
+        key = (hashlib.sha256(data).hexdigest(), attribute)
+        if (entry := self._urls.get(key)) is not None and entry[0] > time.monotonic():
+            self._urls.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        if (task := self._pending.get(key)) is None:
+            task = self._pending[key] = asyncio.create_task(self._process(key, data, upload))
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _process(self, key: tuple[str, str], data: bytes,
+                       upload: Callable[[discord.File], Awaitable[str]]) -> str:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        loop = asyncio.get_running_loop()
+        try:
+            output, extension = await loop.run_in_executor(self._executor, resize_image, data, IMAGE_SIZES[key[1]])
+        except Exception as e:
+            # Pillow raises a range of errors for unsupported, corrupt or truncated files, and a crashed worker
+            # breaks the pool. None of them are the user's to debug.
+            if isinstance(e, BrokenProcessPool):
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            raise ValueError("The image could not be processed, please upload a PNG, JPEG, GIF or WebP file.") from e
+        url = await upload(discord.File(io.BytesIO(output), filename=f"{key[0][:16]}.{extension}"))
+        self._urls[key] = (time.monotonic() + self.ttl, url)
+        self._urls.move_to_end(key)
+        while len(self._urls) > self.max_entries:
+            self._urls.popitem(last=False)
+        return url
+
+    def close(self) -> None:
+        """Shuts the process pool down."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def set_image_url(editor: "EmbedToolView", interaction: discord.Interaction, attribute: str, url: str) -> bool:
+    """Sets an image URL of the draft and validates it without delaying the interaction response.
+
+    URLs known to be invalid are rejected right away. Unknown URLs are applied immediately and checked in the
+    background; if the check fails, the change is reverted and the user is warned.
+
+    Parameters
+    ------------
+    editor: EmbedToolView
+        The editor whose draft to modify.
+    interaction: discord.Interaction
+        The interaction that submitted the URL.
+    attribute: str
+        The draft attribute to set, e.g. ``"thumbnail_url"``.
+    url: str
+        The submitted URL.
+
+    Returns
+    ------------
+    bool
+        Whether the URL was applied."""
+    validator: ImageValidator = interaction.client.image_validator
+    error = validator.cached(url) if url else None
+    if error is not None and error is not UNKNOWN:
+        await interaction.response.send_message(embed=invalid_image_embed(error), ephemeral=True)
+        return False
+    draft = editor.draft
+    previous = getattr(draft, attribute)
+    setattr(draft, attribute, url)
+    await editor.refresh(interaction)
+    if error is UNKNOWN:
+        task = asyncio.create_task(_revert_if_invalid(editor, draft, interaction, attribute, url, previous))
+        editor.background_tasks.add(task)
+        task.add_done_callback(editor.background_tasks.discard)
+    return True
+
+
+async def _revert_if_invalid(editor: "EmbedToolView", draft: "EmbedDraft", interaction: discord.Interaction,
+                             attribute: str, url: str, previous: str | None) -> None:
+    error = await interaction.client.image_validator.validate(url)
+    if error is None or getattr(draft, attribute) != url:
+        return
+    setattr(draft, attribute, previous)
+    editor.save()
+    await editor.update_preview(interaction)
+    await interaction.followup.send(embed=invalid_image_embed(error), ephemeral=True)
+
+
+def invalid_image_embed(error: str) -> discord.Embed:
+    """Returns the error embed for an invalid image URL.
+
+    Parameters
+    ------------
+    error: str
+        Why the URL is invalid."""
+    return discord.Embed(
+        title="Invalid Image",
+        description=f"{error} Please try again using a direct link to an image.",
+        color=discord.Color.red(),
+        timestamp=discord.utils.utcnow()
+    )
 
 
 class ThumbnailModal(discord.ui.Modal):
     """Modal for receiving the thumbnail of an embed to send or edit."""
 
-    def __init__(self, *args, initial_thumbnail_url: str, tutorial_embed=None, **kwargs):
+    def __init__(self, *args, editor: "EmbedToolView", **kwargs):
         """Initialize the modal.
 
         Parameters
         ------------
-        initial_thumbnail_url: str
-            The initial thumbnail url of the embed.
-        tutorial_embed: discord.Embed | None
-            The embed to show in the tutorial."""
-        self.tutorial_embed: discord.Embed | None = tutorial_embed
+        editor: EmbedToolView
+            The editor whose draft to modify."""
+        self.editor: "EmbedToolView" = editor
+        self.draft: "EmbedDraft" = editor.draft
         super().__init__(
             discord.ui.InputText(
                 label="Thumbnail URL:",
                 placeholder="Please enter Thumbnail URL of the embed...",
                 style=discord.InputTextStyle.long,
                 max_length=4000,
-                value=initial_thumbnail_url,
+                value=self.draft.thumbnail_url,
                 required=False
             ),
             *args,
             **kwargs
         )
 
+    @instrumented
     async def callback(self, interaction: discord.Interaction) -> None:
         """Callback for when the modal is submitted.
 
@@ -34,40 +434,37 @@ class ThumbnailModal(discord.ui.Modal):
         ------------
         interaction: discord.Interaction
             The interaction that submitted the modal."""
-        user_embed: discord.Embed = interaction.message.embeds[0]
-        user_embed.set_thumbnail(url=self.children[0].value)
-        if self.tutorial_embed:
-            await interaction.response.edit_message(embeds=[user_embed, self.tutorial_embed])
+        if not await self.editor.check_draft(interaction, self.draft):
             return
-        await interaction.response.edit_message(embed=user_embed)
+        await set_image_url(self.editor, interaction, "thumbnail_url", self.children[0].value)
 
 
 class ImageModal(discord.ui.Modal):
     """Modal for receiving the image of an embed to send or edit."""
 
-    def __init__(self, *args, initial_image_url: str, tutorial_embed=None, **kwargs):
+    def __init__(self, *args, editor: "EmbedToolView", **kwargs):
         """Initialize the modal.
 
         Parameters
         ------------
-        initial_image_url: str
-            The initial image url of the embed.
-        tutorial_embed: discord.Embed | None
-            The embed to show in the tutorial."""
-        self.tutorial_embed: discord.Embed | None = tutorial_embed
+        editor: EmbedToolView
+            The editor whose draft to modify."""
+        self.editor: "EmbedToolView" = editor
+        self.draft: "EmbedDraft" = editor.draft
         super().__init__(
             discord.ui.InputText(
                 label="Image URL:",
                 placeholder="Please enter Image URL of the embed...",
                 style=discord.InputTextStyle.long,
                 max_length=4000,
-                value=initial_image_url,
+                value=self.draft.image_url,
                 required=False
             ),
             *args,
             **kwargs
         )
 
+    @instrumented
     async def callback(self, interaction: discord.Interaction) -> None:
         """Callback for when the modal is submitted.
 
@@ -75,40 +472,37 @@ class ImageModal(discord.ui.Modal):
         ------------
         interaction: discord.Interaction
             The interaction that submitted the modal."""
-        user_embed: discord.Embed = interaction.message.embeds[0]
-        user_embed.set_image(url=self.children[0].value)
-        if self.tutorial_embed:
-            await interaction.response.edit_message(embeds=[user_embed, self.tutorial_embed])
+        if not await self.editor.check_draft(interaction, self.draft):
             return
-        await interaction.response.edit_message(embed=user_embed)
+        await set_image_url(self.editor, interaction, "image_url", self.children[0].value)
 
 
 class FooterImageModal(discord.ui.Modal):
     """Modal for receiving the footer image of an embed to send or edit."""
 
-    def __init__(self, *args, initial_footer_image_url: str, tutorial_embed=None, **kwargs):
+    def __init__(self, *args, editor: "EmbedToolView", **kwargs):
         """Initialize the modal.
 
         Parameters
         ------------
-        initial_footer_image_url: str
-            The initial footer image url of the embed.
-        tutorial_embed: discord.Embed | None
-            The embed to show in the tutorial."""
-        self.tutorial_embed: discord.Embed | None = tutorial_embed
+        editor: EmbedToolView
+            The editor whose draft to modify."""
+        self.editor: "EmbedToolView" = editor
+        self.draft: "EmbedDraft" = editor.draft
         super().__init__(
             discord.ui.InputText(
                 label="Footer Image URL:",
                 placeholder="Please enter Footer Image URL of the embed...",
                 style=discord.InputTextStyle.long,
                 max_length=4000,
-                value=initial_footer_image_url,
+                value=self.draft.footer_icon_url,
                 required=False
             ),
             *args,
             **kwargs
         )
 
+    @instrumented
     async def callback(self, interaction: discord.Interaction) -> None:
         """Callback for when the modal is submitted.
 
@@ -116,13 +510,11 @@ class FooterImageModal(discord.ui.Modal):
         ------------
         interaction: discord.Interaction
             The interaction that submitted the modal."""
-        user_embed: discord.Embed = interaction.message.embeds[0]
-        user_embed.footer.icon_url = self.children[0].value
-        footer_text = user_embed.footer.text
-        if footer_text is discord.Embed.Empty:
-            footer_text = "⠀"
-        user_embed.set_footer(text=footer_text, icon_url=self.children[0].value)
-        if self.tutorial_embed:
-            await interaction.response.edit_message(embeds=[user_embed, self.tutorial_embed])
+        if not await self.editor.check_draft(interaction, self.draft):
             return
-        await interaction.response.edit_message(embed=user_embed)
+        draft = self.draft
+        footer_text = draft.footer_text
+        if not footer_text:
+            draft.footer_text = "⠀"
+        if not await set_image_url(self.editor, interaction, "footer_icon_url", self.children[0].value):
+            draft.footer_text = footer_text
@@ -0,0 +1,223 @@
+import re
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import discord
+
+if TYPE_CHECKING:
+    from .sessions import SessionStore
+
+MESSAGE_LINK_RE = re.compile(
+    r"^<?https?://(?:(?:ptb|canary)\.)?discord(?:app)?\.com/channels/(\d+)/(\d+)/(\d+)/?>?$"
+)
+
+
+def parse_message_reference(reference: str) -> tuple[int | None, int | None, int]:
+    """Parses a message ID or a message link.
+
+    Parameters
+    ------------
+    reference: str
+        The message ID or link.
+
+    Returns
+    ------------
+    tuple[int | None, int | None, int]
+        The guild ID, channel ID and message ID. Guild and channel ID are ``None`` for plain message IDs.
+
+    Raises
+    ------------
+    ValueError
+        The reference is neither a message ID nor a message link."""
+    reference = reference.strip()
+    if reference.isdigit():
+        return None, None, int(reference)
+    match = MESSAGE_LINK_RE.match(reference)
+    if match is None:
+        raise ValueError(f"{reference!r} is not a message ID or link")
+    guild_id, channel_id, message_id = match.groups()
+    return int(guild_id), int(channel_id), int(message_id)
+
+
+class MessageCache:
+    """TTL and LRU bounded cache of messages authored by the bot."""
+
+    def __init__(self, max_size: int = 1000, ttl: float = 60 * 60):
+        """Initializes the cache.
+
+        Parameters
+        ------------
+        max_size: int
+            The maximum number of messages to keep.
+        ttl: float
+            The number of seconds after which a message is considered stale."""
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self._messages: OrderedDict[int, tuple[float, discord.Message]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    @property
+    def hit_rate(self) -> float:
+        """The ratio of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, message_id: int) -> discord.Message | None:
+        """Returns a cached message or ``None`` if it is not cached or stale.
+
+        Parameters
+        ------------
+        message_id: int
+            The ID of the message."""
+        entry = self._messages.get(message_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._messages[message_id]
+            self.misses += 1
+            return None
+        self._messages.move_to_end(message_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, message: discord.Message) -> None:
+        """Caches a message, evicting the least recently used messages if the cache is full.
+
+        Parameters
+        ------------
+        message: discord.Message
+            The message to cache."""
+        self._messages[message.id] = (time.monotonic() + self.ttl, message)
+        self._messages.move_to_end(message.id)
+        while len(self._messages) > self.max_size:
+            self._messages.popitem(last=False)
+
+    def invalidate(self, message_id: int) -> None:
+        """Drops a message from the cache.
+
+        Parameters
+        ------------
+        message_id: int
+            The ID of the message."""
+        self._messages.pop(message_id, None)
+
+    def on_raw_edit(self, payload: discord.RawMessageUpdateEvent) -> None:
+        """Drops a message that was edited elsewhere, keeping it if the edit is the one already cached.
+
+        Parameters
+        ------------
+        payload: discord.RawMessageUpdateEvent
+            The raw edit event."""
+        entry = self._messages.get(payload.message_id)
+        if entry is None:
+            return
+        edited_at = discord.utils.parse_time(payload.data.get("edited_timestamp"))
+        if edited_at is None or edited_at != entry[1].edited_at:
+            del self._messages[payload.message_id]
+
+
+def describe_message(message: discord.Message) -> str:
+    """Returns a short label of the first embed of a message.
+
+    Parameters
+    ------------
+    message: discord.Message
+        The message to describe."""
+    embed = message.embeds[0]
+    return embed.title or embed.description or "Untitled embed"
+
+
+class EmbedIndex:
+    """Per-channel index of the most recent embed messages sent by the bot, used for autocompletion."""
+
+    def __init__(self, per_channel: int = 25, max_channels: int = 10_000, store: "SessionStore | None" = None):
+        """Initializes the index.
+
+        Parameters
+        ------------
+        per_channel: int
+            The number of messages to remember per channel.
+        max_channels: int
+            The number of channels to remember, least recently updated channels are dropped first.
+        store: SessionStore | None
+            The store to persist the index in, if any."""
+        self.per_channel: int = per_channel
+        self.max_channels: int = max_channels
+        self.store: "SessionStore | None" = store
+        self._channels: OrderedDict[int, OrderedDict[int, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return sum(len(messages) for messages in self._channels.values())
+
+    def warm(self) -> None:
+        """Loads the persisted index from the store."""
+        if self.store is None:
+            return
+        for channel_id, message_id, title in self.store.load_indexed_embeds(self.per_channel):
+            self._add(channel_id, message_id, title)
+
+    def add(self, message: discord.Message) -> None:
+        """Adds or updates an embed message.
+
+        Parameters
+        ------------
+        message: discord.Message
+            The message to index."""
+        title = describe_message(message)[:80]
+        self._add(message.channel.id, message.id, title)
+        if self.store is not None:
+            self.store.save_indexed_embed(message.channel.id, message.id, title)
+
+    def remove(self, channel_id: int, message_id: int) -> None:
+        """Removes a message from the index.
+
+        Parameters
+        ------------
+        channel_id: int
+            The ID of the channel of the message.
+        message_id: int
+            The ID of the message."""
+        messages = self._channels.get(channel_id)
+        if messages is None or messages.pop(message_id, None) is None:
+            return
+        if self.store is not None:
+            self.store.delete_indexed_embed(message_id)
+
+    def search(self, channel_id: int, query: str, limit: int = 25) -> list[tuple[int, str]]:
+        """Returns the most recent messages of a channel whose ID or title matches the query.
+
+        Parameters
+        ------------
+        channel_id: int
+            The ID of the channel to search.
+        query: str
+            The text the user typed so far.
+        limit: int
+            The maximum number of results."""
+        messages = self._channels.get(channel_id)
+        if not messages:
+            return []
+        query = query.strip().lower()
+        results = []
+        for message_id, title in reversed(messages.items()):
+            if not query or str(message_id).startswith(query) or query in title.lower():
+                results.append((message_id, title))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _add(self, channel_id: int, message_id: int, title: str) -> None:
+        messages = self._channels.get(channel_id)
+        if messages is None:
+            messages = self._channels[channel_id] = OrderedDict()
+            while len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        self._channels.move_to_end(channel_id)
+        messages[message_id] = title
+        messages.move_to_end(message_id)
+        while len(messages) > self.per_channel:
+            messages.popitem(last=False)
@@ -0,0 +1,248 @@
+import bisect
+import functools
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+import discord
+from aiohttp import web
+
+from .watchdog import deadline_guard
+
+if TYPE_CHECKING:
+    from .profiler import SlowInteractionProfiler
+
+LATENCY_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed bucket bounds."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS):
+        """Initializes an empty histogram.
+
+        Parameters
+        ------------
+        bounds: tuple[float, ...]
+            The sorted upper bounds of the buckets in seconds."""
+        self.bounds: tuple[float, ...] = bounds
+        self.counts: list[int] = [0] * (len(bounds) + 1)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        """Records a single value.
+
+        Parameters
+        ------------
+        value: float
+            The observed value in seconds."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Returns an upper estimate of a quantile, i.e. the bound of the bucket it falls in.
+
+        Parameters
+        ------------
+        q: float
+            The quantile between 0 and 1."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """In-process registry of counters, latency histograms and gauges.
+
+    Counters and histograms are keyed by metric name and a sorted tuple of label pairs. Gauges are callables
+    that are only evaluated when the metrics are rendered, so they cost nothing between scrapes."""
+
+    def __init__(self):
+        """Initializes an empty registry."""
+        self.counters: dict[str, dict[Labels, int]] = {}
+        self.histograms: dict[str, dict[Labels, Histogram]] = {}
+        self.gauges: dict[str, Callable[[], float]] = {}
+        self._runner: web.AppRunner | None = None
+
+    def increment(self, name: str, amount: int = 1, **labels: str) -> None:
+        """Increments a counter.
+
+        Parameters
+        ------------
+        name: str
+            The name of the counter.
+        amount: int
+            The amount to add.
+        **labels: str
+            The labels of the counter."""
+        series = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """Records a duration in a histogram.
+
+        Parameters
+        ------------
+        name: str
+            The name of the histogram.
+        seconds: float
+            The duration in seconds.
+        **labels: str
+            The labels of the histogram."""
+        series = self.histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        if (histogram := series.get(key)) is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str):
+        """Records the duration of the ``with`` block in a histogram and counts errors raised in it.
+
+        Parameters
+        ------------
+        name: str
+            The name of the histogram.
+        **labels: str
+            The labels of the histogram."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.increment(f"{name}_errors_total", **labels)
+            raise
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - started, **labels)
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        """Registers a gauge.
+
+        Parameters
+        ------------
+        name: str
+            The name of the gauge.
+        read: Callable[[], float]
+            Returns the current value of the gauge."""
+        self.gauges[name] = read
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, series in self.counters.items():
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        for name, series in self.histograms.items():
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(histogram.bounds + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        for name, read in self.gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {read()}")
+        return "\n".join(lines) + "\n"
+
+    def slowest(self, name: str, label: str, limit: int = 5) -> list[tuple[str, Histogram]]:
+        """Returns the series of a histogram with the highest 95th percentile.
+
+        Parameters
+        ------------
+        name: str
+            The name of the histogram.
+        label: str
+            The label identifying each series.
+        limit: int
+            The maximum number of series to return."""
+        series = [(dict(labels).get(label, ""), histogram)
+                  for labels, histogram in self.histograms.get(name, {}).items()]
+        series.sort(key=lambda item: item[1].quantile(0.95), reverse=True)
+        return series[:limit]
+
+    async def serve(self, host: str, port: int) -> None:
+        """Starts the HTTP endpoint serving the metrics on ``/metrics``.
+
+        Parameters
+        ------------
+        host: str
+            The address to bind to.
+        port: int
+            The port to listen on."""
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+    async def close(self) -> None:
+        """Stops the HTTP endpoint."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def instrumented(func: Callable | None = None, *, auto_defer: bool = True) -> Callable:
+    """Records the latency and errors of a button, select or modal callback.
+
+    The interaction is expected to be the last positional argument, its client's ``metrics`` receives the
+    ``callback_seconds`` histogram and ``callback_errors_total`` counter labeled with the callback's qualified
+    name. If the client has a ``profiler``, slow callbacks are profiled as well. Unless ``auto_defer`` is disabled,
+    the interaction is deferred if the callback did not respond within the client's ``auto_defer_budget``, see
+    :func:`deadline_guard`. Place it below the ``discord.ui`` decorators so the component still sees the original
+    name.
+
+    Parameters
+    ------------
+    func: Callable | None
+        The callback to instrument.
+    auto_defer: bool
+        Whether to defer slow callbacks. Disable it for callbacks responding with a modal, as a deferred
+        interaction can't open one."""
+    if func is None:
+        return functools.partial(instrumented, auto_defer=auto_defer)
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        interaction: discord.Interaction = args[-1]
+        metrics: Metrics | None = getattr(interaction.client, "metrics", None)
+        if metrics is None:
+            return await func(*args, **kwargs)
+        profiler: "SlowInteractionProfiler | None" = getattr(interaction.client, "profiler", None)
+        budget = getattr(interaction.client, "auto_defer_budget", 0) if auto_defer else 0
+        started = profiler.begin() if profiler is not None else None
+        try:
+            with metrics.timer("callback", callback=name):
+                async with deadline_guard(interaction, budget):
+                    return await func(*args, **kwargs)
+        finally:
+            if started is not None and profiler.end(started, name):
+                metrics.increment("slow_callbacks_total", callback=name)
+
+    return wrapper
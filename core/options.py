@@ -1,19 +1,29 @@
+from typing import TYPE_CHECKING
+
 import discord
 
+from .draft import EmbedDraft, over_limit_embed
+from .metrics import instrumented
+
+if TYPE_CHECKING:
+    from .embedTool import EmbedToolView
+
 
 class FooterTextModal(discord.ui.Modal):
     """Modal for receiving the footer text of an embed to send or edit."""
 
-    def __init__(self, *args, initial_footer: str, tutorial_embed=None, **kwargs):
+    def __init__(self, *args, editor: "EmbedToolView", **kwargs):
         """Initialize the modal.
 
         Parameters
         ------------
-        initial_footer: str
-            The initial footer of the embed.
-        tutorial_embed: discord.Embed | None
-            The embed to show in the tutorial."""
-        self.tutorial_embed: discord.Embed | None = tutorial_embed
+        editor: EmbedToolView
+            The editor whose draft to modify."""
+        self.editor: "EmbedToolView" = editor
+        self.draft: EmbedDraft = editor.draft
+        initial_footer = self.draft.footer_text
+        if initial_footer == "⠀":
+            initial_footer = None
         super().__init__(
             discord.ui.InputText(
                 label="Embed Footer:",
@@ -27,6 +37,7 @@ class FooterTextModal(discord.ui.Modal):
             **kwargs
         )
 
+    @instrumented
     async def callback(self, interaction: discord.Interaction) -> None:
         """Callback for when the modal is submitted.
 
@@ -34,10 +45,13 @@ class FooterTextModal(discord.ui.Modal):
         ------------
         interaction: discord.Interaction
             The interaction that submitted the modal."""
-        user_embed: discord.Embed = interaction.message.embeds[0]
-        icon_url = user_embed.footer.icon_url
-        user_embed.set_footer(text=self.children[0].value, icon_url=icon_url)
-        if self.tutorial_embed:
-            await interaction.response.edit_message(embeds=[user_embed, self.tutorial_embed])
+        if not await self.editor.check_draft(interaction, self.draft):
+            return
+        footer_text = self.children[0].value
+        if not footer_text and self.draft.footer_icon_url:
+            footer_text = "⠀"
+        if (error := self.draft.check("footer_text", footer_text)) is not None:
+            await interaction.response.send_message(embed=over_limit_embed(error), ephemeral=True)
             return
-        await interaction.response.edit_message(embed=user_embed)
+        self.draft.footer_text = footer_text
+        await self.editor.refresh(interaction)
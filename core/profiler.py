@@ -0,0 +1,109 @@
+import asyncio
+import collections
+import os
+import re
+import sys
+import threading
+import time
+from types import FrameType
+
+
+class SlowInteractionProfiler:
+    """Sampling profiler that keeps the stacks of interactions exceeding a latency threshold.
+
+    A background thread samples the event loop thread's stack at a fixed interval, but only while callbacks are
+    in flight. Samples are kept in a bounded ring buffer; when a callback finishes slower than the threshold, the
+    samples taken during it are written as collapsed stacks (one ``frame;frame;frame count`` line per stack, the
+    format flame graph tools read) to a directory that keeps only the newest files. As the loop interleaves
+    callbacks, a profile shows everything the loop did while the slow callback was pending."""
+
+    def __init__(self, directory: str, threshold: float = 1.5, interval: float = 0.01, max_files: int = 100,
+                 window: float = 30):
+        """Initializes the profiler. Sampling starts with the first profiled callback.
+
+        Parameters
+        ------------
+        directory: str
+            The directory to write the collapsed stacks to.
+        threshold: float
+            The duration in seconds after which a callback is considered slow.
+        interval: float
+            The number of seconds between two samples.
+        max_files: int
+            The maximum number of profiles to keep, older profiles are deleted first.
+        window: float
+            The number of seconds of samples to keep, callbacks running longer are only partially covered."""
+        self.directory: str = directory
+        self.threshold: float = threshold
+        self.interval: float = interval
+        self.max_files: int = max_files
+        self.written: int = 0
+        self._samples: collections.deque[tuple[float, str]] = collections.deque(maxlen=int(window / interval))
+        self._in_flight: int = 0
+        self._active: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._loop_thread_id: int | None = None
+
+    def begin(self) -> float:
+        """Marks the start of a callback and returns its start time."""
+        if self._thread is None:
+            self._loop_thread_id = threading.get_ident()
+            self._thread = threading.Thread(target=self._sample, name="slow-interaction-profiler", daemon=True)
+            self._thread.start()
+        self._in_flight += 1
+        self._active.set()
+        return time.perf_counter()
+
+    def end(self, started: float, name: str) -> bool:
+        """Marks the end of a callback and writes its samples if it was slow.
+
+        Parameters
+        ------------
+        started: float
+            The start time returned by :meth:`begin`.
+        name: str
+            The name of the callback.
+
+        Returns
+        ------------
+        bool
+            Whether the callback was slow."""
+        self._in_flight -= 1
+        if not self._in_flight:
+            self._active.clear()
+        duration = time.perf_counter() - started
+        if duration < self.threshold:
+            return False
+        stacks = collections.Counter(stack for sampled, stack in list(self._samples) if sampled >= started)
+        asyncio.get_running_loop().run_in_executor(None, self._write, name, duration, stacks)
+        return True
+
+    def _sample(self) -> None:
+        while True:
+            self._active.wait()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._samples.append((time.perf_counter(), _collapse(frame)))
+            del frame
+            time.sleep(self.interval)
+
+    def _write(self, name: str, duration: float, stacks: collections.Counter) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}" \
+                   f"-{round(duration * 1000)}ms.folded"
+        with open(os.path.join(self.directory, filename), "w") as file:
+            for stack, count in stacks.most_common():
+                file.write(f"{stack} {count}\n")
+        self.written += 1
+        profiles = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".folded")]
+        for entry in sorted(profiles, key=lambda entry: entry.stat().st_mtime)[:-self.max_files]:
+            os.remove(entry.path)
+
+
+def _collapse(frame: FrameType | None) -> str:
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
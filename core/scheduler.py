@@ -0,0 +1,288 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .metrics import Metrics
+
+PUBLISH: int = 0
+PREVIEW: int = 1
+MAX_RETRIES: int = 3
+
+
+class TokenBucket:
+    """Token bucket limiting the request rate of a single route."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: int):
+        """Initializes a full bucket.
+
+        Parameters
+        ------------
+        rate: float
+            The number of tokens added per second.
+        capacity: int
+            The maximum number of tokens, i.e. the allowed burst size."""
+        self.rate: float = rate
+        self.capacity: int = capacity
+        self.tokens: float = capacity
+        self.updated: float = time.monotonic()
+
+    def delay(self) -> float:
+        """Returns how long to wait until a token is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        """Takes a token from the bucket."""
+        self.tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        """Empties the bucket so the next token is only available after a rate limit expired.
+
+        Parameters
+        ------------
+        seconds: float
+            The number of seconds to wait before the next request."""
+        self.delay()
+        self.tokens = 1 - seconds * self.rate
+
+    @property
+    def idle(self) -> bool:
+        """Whether the bucket refilled completely and can be dropped."""
+        return self.tokens + (time.monotonic() - self.updated) * self.rate >= self.capacity
+
+
+class PriorityGate:
+    """Limits the number of requests in flight, handing free slots to the waiter with the lowest priority value."""
+
+    def __init__(self, slots: int):
+        """Initializes the gate.
+
+        Parameters
+        ------------
+        slots: int
+            The maximum number of requests in flight."""
+        self.free: int = slots
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        """Waits for a free slot.
+
+        Parameters
+        ------------
+        priority: int
+            The priority of the request, lower values are served first."""
+        if self.free > 0 and not self._waiters:
+            self.free -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                # The slot was handed over right before the cancellation, pass it on.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Frees a slot, handing it to the next waiter if there is one."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.free += 1
+
+
+class _Job:
+    __slots__ = ("request", "future", "key", "submitted", "retries")
+
+    def __init__(self, request: Callable[[], Awaitable[Any]], key: Hashable | None):
+        self.request: Callable[[], Awaitable[Any]] = request
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.key: Hashable | None = key
+        self.submitted: float = time.monotonic()
+        self.retries: int = 0
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Returns how long to back off if an error is a rate limit response, ``None`` otherwise."""
+    if getattr(error, "status", None) != 429:
+        return None
+    headers = getattr(error, "headers", None) or getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", 1))
+    except ValueError:
+        return 1.0
+
+
+def _follow(source: asyncio.Future, target: asyncio.Future) -> None:
+    """Resolves ``target`` with the outcome of ``source`` once it is done."""
+
+    def copy(_) -> None:
+        if target.done():
+            return
+        if source.cancelled():
+            target.cancel()
+        elif source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+
+    source.add_done_callback(copy)
+
+
+class OutboundScheduler:
+    """Schedules outbound Discord API calls through per-route token buckets.
+
+    Every request is queued on a bucket such as ``("channel", channel_id)`` or ``("webhook", interaction_id)``.
+    Requests ready to be sent then pass a :class:`PriorityGate` shared by all buckets, which limits the requests in
+    flight and serves lower priority values first, so final publishes overtake preview refreshes of other buckets.
+    Pending requests sharing a coalescing key are superseded by the newest one and all submitters receive its result.
+    Rate limited requests pause their bucket for the ``Retry-After`` of the response and are retried."""
+
+    MAX_IDLE_BUCKETS: int = 10_000
+
+    def __init__(self, limits: dict[str, tuple[float, int]] | None = None, metrics: "Metrics | None" = None,
+                 max_in_flight: int = 10):
+        """Initializes the scheduler.
+
+        Parameters
+        ------------
+        limits: dict[str, tuple[float, int]] | None
+            The rate per second and burst size per bucket kind, i.e. the first element of the bucket key.
+        metrics: Metrics | None
+            The metrics to record the duration of sent requests in, if any.
+        max_in_flight: int
+            The maximum number of requests sent at the same time over all buckets."""
+        self.limits: dict[str, tuple[float, int]] = {"channel": (1.0, 5), "webhook": (2.5, 5)}
+        if limits:
+            self.limits.update(limits)
+        self.metrics: "Metrics | None" = metrics
+        self.submitted: int = 0
+        self.coalesced: int = 0
+        self.completed: int = 0
+        self.failed: int = 0
+        self.rate_limited: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+        self._buckets: dict[Hashable, TokenBucket] = {}
+        self._queues: dict[Hashable, list[tuple[int, int, _Job]]] = {}
+        self._workers: dict[Hashable, asyncio.Task] = {}
+        self._pending: dict[Hashable, _Job] = {}
+        self._sequence = itertools.count()
+        self._gate: PriorityGate = PriorityGate(max_in_flight)
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of requests waiting to be sent."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> dict:
+        """Returns queue depth, wait time and throughput counters."""
+        started = self.completed + self.failed
+        return {
+            "queue_depth": self.queue_depth,
+            "active_buckets": len(self._workers),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+            "average_wait": self.total_wait / started if started else 0.0,
+            "max_wait": self.max_wait
+        }
+
+    async def submit(self, bucket: tuple[str, Hashable], request: Callable[[], Awaitable[Any]],
+                     priority: int = PUBLISH, key: Hashable | None = None) -> Any:
+        """Queues a request and returns its result once it was sent.
+
+        Parameters
+        ------------
+        bucket: tuple[str, Hashable]
+            The rate limit bucket of the request, e.g. ``("channel", channel.id)``.
+        request: Callable[[], Awaitable[Any]]
+            Creates the coroutine performing the request. It is only called once the request is sent.
+        priority: int
+            The priority lane of the request, :data:`PUBLISH` or :data:`PREVIEW`.
+        key: Hashable | None
+            Pending requests with the same key are replaced by this one."""
+        self.submitted += 1
+        if key is not None and (job := self._pending.get(key)) is not None:
+            job.request = request
+            self.coalesced += 1
+            return await asyncio.shield(job.future)
+        job = _Job(request, key)
+        if key is not None:
+            self._pending[key] = job
+        heapq.heappush(self._queues.setdefault(bucket, []), (priority, next(self._sequence), job))
+        if bucket not in self._workers:
+            self._workers[bucket] = asyncio.create_task(self._drain(bucket))
+        return await asyncio.shield(job.future)
+
+    async def _drain(self, bucket_key: tuple[str, Hashable]) -> None:
+        if (bucket := self._buckets.get(bucket_key)) is None:
+            bucket = self._buckets[bucket_key] = TokenBucket(*self.limits[bucket_key[0]])
+        queue = self._queues[bucket_key]
+        try:
+            while queue:
+                if delay := bucket.delay():
+                    await asyncio.sleep(delay)
+                    continue
+                await self._gate.acquire(queue[0][0])
+                try:
+                    priority, sequence, job = heapq.heappop(queue)
+                    bucket.consume()
+                    if job.key is not None:
+                        self._pending.pop(job.key, None)
+                    if not job.retries:
+                        wait = time.monotonic() - job.submitted
+                        self.total_wait += wait
+                        self.max_wait = max(self.max_wait, wait)
+                    try:
+                        if self.metrics is None:
+                            result = await job.request()
+                        else:
+                            with self.metrics.timer("outbound", bucket=bucket_key[0]):
+                                result = await job.request()
+                    except Exception as e:
+                        if (retry_after := _retry_after(e)) is not None and job.retries < MAX_RETRIES:
+                            self.rate_limited += 1
+                            job.retries += 1
+                            bucket.pause(retry_after)
+                            self._requeue(queue, priority, sequence, job)
+                        else:
+                            self.failed += 1
+                            job.future.set_exception(e)
+                    else:
+                        self.completed += 1
+                        job.future.set_result(result)
+                finally:
+                    self._gate.release()
+        finally:
+            del self._workers[bucket_key]
+            del self._queues[bucket_key]
+            if len(self._buckets) > self.MAX_IDLE_BUCKETS:
+                for key in [key for key, bucket in self._buckets.items()
+                            if key not in self._workers and bucket.idle]:
+                    del self._buckets[key]
+
+    def _requeue(self, queue: list[tuple[int, int, _Job]], priority: int, sequence: int, job: _Job) -> None:
+        """Queues a rate limited job again, unless a newer request with the same key superseded it meanwhile."""
+        if job.key is not None and (newer := self._pending.get(job.key)) is not None:
+            _follow(newer.future, job.future)
+            return
+        if job.key is not None:
+            self._pending[job.key] = job
+        heapq.heappush(queue, (priority, sequence, job))
@@ -0,0 +1,216 @@
+import datetime
+import json
+
+import discord
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .draft import (EMBED_COUNT_LIMIT, FIELD_COUNT_LIMIT, FIELD_NAME_LIMIT, FIELD_VALUE_LIMIT, TEXT_LABELS,
+                    TEXT_LIMITS, TOTAL_LIMIT, DraftField, EmbedDraft)
+
+MAX_IMPORT_SIZE: int = 64 * 1024
+INPUT_TEXT_LIMIT: int = 4000
+
+_SCHEMA: dict[str, type | dict] = {
+    "title": str,
+    "description": str,
+    "color": int,
+    "timestamp": str,
+    "fields": list,
+    "thumbnail": {"url": str},
+    "image": {"url": str},
+    "footer": {"text": str, "icon_url": str},
+    "author": {"name": str, "icon_url": str}
+}
+_TYPE_NAMES: dict[type, str] = {str: "a string", int: "an integer", list: "a list", bool: "a boolean"}
+
+
+def dumps(payload, indent: bool = True) -> bytes:
+    """Serializes a payload to JSON, using orjson if it is installed.
+
+    Parameters
+    ------------
+    payload
+        The JSON serializable payload.
+    indent: bool
+        Whether to indent the JSON or to write it on a single line."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(payload, indent=2, ensure_ascii=False).encode()
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def loads(data: bytes | str):
+    """Deserializes JSON, using orjson if it is installed.
+
+    Parameters
+    ------------
+    data: bytes | str
+        The JSON document."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def export_embeds(embeds: list[discord.Embed]) -> bytes:
+    """Returns the JSON document of a message's embeds, in the format :func:`import_drafts` reads.
+
+    Only the parts of the embeds the editor supports are exported.
+
+    Parameters
+    ------------
+    embeds: list[discord.Embed]
+        The embeds to export."""
+    return dumps({"embeds": [EmbedDraft.from_embed(embed).to_dict() for embed in embeds]})
+
+
+def import_drafts(data: bytes | str) -> list[EmbedDraft]:
+    """Parses and validates a JSON document of embeds and returns a draft per embed.
+
+    Accepts an object with an ``embeds`` list (the export format and Discord's message payload), a list of embeds
+    or a single embed. The document is validated in a single pass while the drafts are built, so the editor's
+    per-change limit checks are not needed. Keys the editor doesn't support are ignored.
+
+    Parameters
+    ------------
+    data: bytes | str
+        The JSON document.
+
+    Raises
+    ------------
+    ValueError
+        The document is not valid, the message says why."""
+    if len(data) > MAX_IMPORT_SIZE:
+        raise ValueError(f"The JSON can't be larger than {MAX_IMPORT_SIZE // 1024} KiB.")
+    try:
+        document = loads(data)
+    except ValueError as e:
+        raise ValueError(f"The JSON is invalid: {e}") from None
+    if isinstance(document, dict):
+        payloads = document["embeds"] if "embeds" in document else [document]
+    else:
+        payloads = document
+    if not isinstance(payloads, list) or not payloads:
+        raise ValueError("The JSON must contain at least one embed.")
+    if len(payloads) > EMBED_COUNT_LIMIT:
+        raise ValueError(f"Messages can't have more than {EMBED_COUNT_LIMIT} embeds.")
+    drafts = []
+    for index, payload in enumerate(payloads, start=1):
+        prefix = f"Embed {index}: " if len(payloads) > 1 else ""
+        try:
+            drafts.append(_validate(payload))
+        except ValueError as e:
+            raise ValueError(f"{prefix}{e}") from None
+    if (length := sum(draft.length for draft in drafts)) > TOTAL_LIMIT:
+        raise ValueError(f"The embeds of a message can't be longer than {TOTAL_LIMIT} characters in total, "
+                         f"these have {length}.")
+    return drafts
+
+
+def dump_fields(fields: list[DraftField], inputs: int = 5) -> list[str]:
+    """Returns the fields as JSON lines, one field per line, packed into texts that fit a modal's inputs.
+
+    Parameters
+    ------------
+    fields: list[DraftField]
+        The fields to dump.
+    inputs: int
+        The maximum number of texts.
+
+    Raises
+    ------------
+    ValueError
+        The fields don't fit into the inputs."""
+    texts = [""]
+    for field in fields:
+        line = dumps({"name": field.name, "value": field.value, "inline": field.inline}, indent=False).decode()
+        if texts[-1] and len(texts[-1]) + 1 + len(line) > INPUT_TEXT_LIMIT:
+            texts.append("")
+        texts[-1] = f"{texts[-1]}\n{line}" if texts[-1] else line
+    if len(texts) > inputs or any(len(text) > INPUT_TEXT_LIMIT for text in texts):
+        raise ValueError("The fields are too long to be edited at once, please edit them one by one.")
+    return texts
+
+
+def parse_fields(texts: list[str]) -> list[DraftField]:
+    """Parses and validates fields written as JSON lines by :func:`dump_fields`.
+
+    Parameters
+    ------------
+    texts: list[str]
+        The texts containing the fields, empty lines are skipped.
+
+    Raises
+    ------------
+    ValueError
+        The fields are not valid, the message says why."""
+    lines = [line for text in texts for line in text.splitlines() if line.strip()]
+    fields = []
+    for index, line in enumerate(lines, start=1):
+        try:
+            fields.append(loads(line))
+        except ValueError:
+            raise ValueError(f"Field {index} is not valid JSON.") from None
+    _validate_fields(fields)
+    return [DraftField(field["name"], field["value"], field.get("inline", True)) for field in fields]
+
+
+def _validate(payload) -> EmbedDraft:
+    if not isinstance(payload, dict):
+        raise ValueError("Embeds must be objects.")
+    payload = _check_types(payload, _SCHEMA, "")
+    _validate_fields(payload.get("fields", []))
+    if payload.get("footer") and not payload["footer"].get("text"):
+        raise ValueError("`footer.text` is required when there is a footer.")
+    if payload.get("author") and not payload["author"].get("name"):
+        raise ValueError("`author.name` is required when there is an author.")
+    if not 0 <= payload.get("color", 0) <= 0xFFFFFF:
+        raise ValueError("`color` must be between 0 and 16777215.")
+    if "timestamp" in payload:
+        try:
+            datetime.datetime.fromisoformat(payload["timestamp"])
+        except ValueError:
+            raise ValueError("`timestamp` must be an ISO 8601 date.") from None
+    draft = EmbedDraft.from_dict(payload)
+    for attribute, limit in TEXT_LIMITS.items():
+        if len(getattr(draft, attribute) or "") > limit:
+            raise ValueError(f"The {TEXT_LABELS[attribute]} can't be longer than {limit} characters.")
+    if draft.empty:
+        raise ValueError("Embeds can't be empty.")
+    return draft
+
+
+def _validate_fields(fields: list) -> None:
+    if len(fields) > FIELD_COUNT_LIMIT:
+        raise ValueError(f"Embeds can't have more than {FIELD_COUNT_LIMIT} fields.")
+    for index, field in enumerate(fields, start=1):
+        if not isinstance(field, dict) or not isinstance(field.get("name"), str) \
+                or not isinstance(field.get("value"), str) or not isinstance(field.get("inline", True), bool):
+            raise ValueError(f"Field {index} must have a string `name` and `value` and a boolean `inline`.")
+        if not field["name"] or not field["value"]:
+            raise ValueError(f"Field {index} must have a name and a value.")
+        if len(field["name"]) > FIELD_NAME_LIMIT:
+            raise ValueError(f"The name of field {index} can't be longer than {FIELD_NAME_LIMIT} characters.")
+        if len(field["value"]) > FIELD_VALUE_LIMIT:
+            raise ValueError(f"The value of field {index} can't be longer than {FIELD_VALUE_LIMIT} characters.")
+
+
+def _check_types(payload: dict, schema: dict, path: str) -> dict:
+    """Checks the types of the known keys and returns the payload without its ``null`` values."""
+    checked = {}
+    for key, expected in schema.items():
+        value = payload.get(key)
+        if value is None:
+            continue
+        if isinstance(expected, dict):
+            if not isinstance(value, dict):
+                raise ValueError(f"`{path}{key}` must be an object.")
+            value = _check_types(value, expected, f"{path}{key}.")
+        elif not isinstance(value, expected) or expected is int and isinstance(value, bool):
+            raise ValueError(f"`{path}{key}` must be {_TYPE_NAMES[expected]}.")
+        checked[key] = value
+    return checked
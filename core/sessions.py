@@ -0,0 +1,395 @@
+import asyncio
+import json
+import sqlite3
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+import discord
+
+SESSION_MAX_AGE: float = 24 * 60 * 60
+
+
+class SessionStore:
+    """SQLite backed store of editor session state.
+
+    The database is opened in WAL mode so writes from the event loop stay cheap and several bot processes can share
+    one file."""
+
+    def __init__(self, path: str):
+        """Opens the store, creating the database if needed.
+
+        Parameters
+        ------------
+        path: str
+            The path of the SQLite database file."""
+        self.path: str = path
+        self._connection: sqlite3.Connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embed_index "
+            "(message_id INTEGER PRIMARY KEY, channel_id INTEGER NOT NULL, title TEXT NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS broadcasts "
+            "(id TEXT PRIMARY KEY, payload TEXT NOT NULL, cluster INTEGER NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS broadcast_targets (broadcast_id TEXT NOT NULL, channel_id INTEGER NOT NULL, "
+            "status TEXT NOT NULL, PRIMARY KEY (broadcast_id, channel_id))"
+        )
+
+    @contextmanager
+    def _transaction(self):
+        self._connection.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def save(self, session_id: str, state: dict) -> None:
+        """Stores the state of a session, replacing any previous state.
+
+        Parameters
+        ------------
+        session_id: str
+            The ID of the session.
+        state: dict
+            The JSON serializable state of the session."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO sessions (id, state, updated_at) VALUES (?, ?, ?)",
+            (session_id, json.dumps(state, separators=(",", ":")), time.time())
+        )
+
+    def load(self, session_id: str) -> dict | None:
+        """Returns the state of a session or ``None`` if it does not exist.
+
+        Parameters
+        ------------
+        session_id: str
+            The ID of the session."""
+        row = self._connection.execute("SELECT state FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def latest_session(self, user_id: int) -> str | None:
+        """Returns the ID of the most recently updated session of a user or ``None`` if they have none.
+
+        Parameters
+        ------------
+        user_id: int
+            The ID of the user."""
+        row = self._connection.execute(
+            "SELECT id FROM sessions WHERE json_extract(state, '$.user_id') = ? ORDER BY updated_at DESC LIMIT 1",
+            (user_id,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def delete(self, session_id: str) -> None:
+        """Deletes a session.
+
+        Parameters
+        ------------
+        session_id: str
+            The ID of the session."""
+        self._connection.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def purge(self, max_age: float = SESSION_MAX_AGE) -> int:
+        """Deletes all sessions that were not updated recently and returns how many were deleted.
+
+        Parameters
+        ------------
+        max_age: float
+            The age in seconds after which a session is deleted."""
+        cursor = self._connection.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - max_age,))
+        self._connection.execute("DELETE FROM broadcast_targets WHERE broadcast_id IN "
+                                 "(SELECT id FROM broadcasts WHERE created_at < ?)", (time.time() - max_age,))
+        self._connection.execute("DELETE FROM broadcasts WHERE created_at < ?", (time.time() - max_age,))
+        return cursor.rowcount
+
+    def save_broadcast(self, broadcast_id: str, payloads: list[dict], channel_ids: list[int], cluster: int) -> None:
+        """Stores a broadcast with all its target channels pending.
+
+        Parameters
+        ------------
+        broadcast_id: str
+            The ID of the broadcast.
+        payloads: list[dict]
+            The payloads of the embeds to send.
+        channel_ids: list[int]
+            The IDs of the channels to send the embeds to.
+        cluster: int
+            The cluster responsible for resuming the broadcast."""
+        with self._transaction():
+            self._connection.execute(
+                "INSERT INTO broadcasts (id, payload, cluster, created_at) VALUES (?, ?, ?, ?)",
+                (broadcast_id, json.dumps(payloads, separators=(",", ":")), cluster, time.time())
+            )
+            self._connection.executemany(
+                "INSERT INTO broadcast_targets (broadcast_id, channel_id, status) VALUES (?, ?, 'pending')",
+                [(broadcast_id, channel_id) for channel_id in channel_ids]
+            )
+
+    def set_broadcast_status(self, broadcast_id: str, channel_id: int, status: str) -> None:
+        """Records the outcome of sending a broadcast to a channel.
+
+        Parameters
+        ------------
+        broadcast_id: str
+            The ID of the broadcast.
+        channel_id: int
+            The ID of the channel.
+        status: str
+            ``sent`` or ``failed``."""
+        self._connection.execute(
+            "UPDATE broadcast_targets SET status = ? WHERE broadcast_id = ? AND channel_id = ?",
+            (status, broadcast_id, channel_id)
+        )
+
+    def load_pending_broadcasts(self, cluster: int) -> list[tuple[str, list[dict], list[int]]]:
+        """Returns the broadcasts of a cluster that still have pending channels.
+
+        Parameters
+        ------------
+        cluster: int
+            The cluster to load the broadcasts of."""
+        pending: dict[str, tuple[str, list[dict], list[int]]] = {}
+        for broadcast_id, payload, channel_id in self._connection.execute(
+            "SELECT broadcasts.id, broadcasts.payload, broadcast_targets.channel_id FROM broadcasts "
+            "JOIN broadcast_targets ON broadcast_targets.broadcast_id = broadcasts.id "
+            "WHERE broadcasts.cluster = ? AND broadcast_targets.status = 'pending' ORDER BY broadcasts.created_at",
+            (cluster,)
+        ):
+            if broadcast_id not in pending:
+                payloads = json.loads(payload)
+                # Broadcasts stored before messages could have several embeds hold a single payload.
+                pending[broadcast_id] = (broadcast_id, [payloads] if isinstance(payloads, dict) else payloads, [])
+            pending[broadcast_id][2].append(channel_id)
+        return list(pending.values())
+
+    def delete_broadcast(self, broadcast_id: str) -> None:
+        """Deletes a finished broadcast.
+
+        Parameters
+        ------------
+        broadcast_id: str
+            The ID of the broadcast."""
+        with self._transaction():
+            self._connection.execute("DELETE FROM broadcast_targets WHERE broadcast_id = ?", (broadcast_id,))
+            self._connection.execute("DELETE FROM broadcasts WHERE id = ?", (broadcast_id,))
+
+    def save_indexed_embed(self, channel_id: int, message_id: int, title: str) -> None:
+        """Stores an entry of the embed index.
+
+        Parameters
+        ------------
+        channel_id: int
+            The ID of the channel of the message.
+        message_id: int
+            The ID of the message.
+        title: str
+            The label of the message."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO embed_index (message_id, channel_id, title) VALUES (?, ?, ?)",
+            (message_id, channel_id, title)
+        )
+
+    def delete_indexed_embed(self, message_id: int) -> None:
+        """Deletes an entry of the embed index.
+
+        Parameters
+        ------------
+        message_id: int
+            The ID of the message."""
+        self._connection.execute("DELETE FROM embed_index WHERE message_id = ?", (message_id,))
+
+    def load_indexed_embeds(self, per_channel: int) -> list[tuple[int, int, str]]:
+        """Returns the most recent entries of the embed index per channel, oldest first.
+
+        Older entries beyond ``per_channel`` are deleted.
+
+        Parameters
+        ------------
+        per_channel: int
+            The number of entries to keep per channel."""
+        self._connection.execute(
+            "DELETE FROM embed_index WHERE message_id IN (SELECT message_id FROM (SELECT message_id, ROW_NUMBER() "
+            "OVER (PARTITION BY channel_id ORDER BY message_id DESC) AS position FROM embed_index) WHERE position > ?)",
+            (per_channel,)
+        )
+        return self._connection.execute(
+            "SELECT channel_id, message_id, title FROM embed_index ORDER BY message_id"
+        ).fetchall()
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._connection.close()
+
+
+class TrackedView(discord.ui.View):
+    """View that reports its activity to a :class:`SessionRegistry`."""
+
+    BASE_SIZE: int = 2048
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.registry: SessionRegistry | None = None
+
+    def estimated_size(self) -> int:
+        """Returns the estimated memory held by this view in bytes."""
+        return self.BASE_SIZE
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if self.registry is not None:
+            self.registry.touch(self)
+        return True
+
+    async def on_timeout(self) -> None:
+        if self.registry is not None:
+            self.registry.remove(self)
+        await super().on_timeout()
+
+    def stop(self) -> None:
+        super().stop()
+        if self.registry is not None:
+            self.registry.remove(self)
+
+
+class SessionRegistry:
+    """Registry of all live editor views.
+
+    Enforces a maximum number of sessions and a memory budget, evicting the least recently used views first.
+    Evicted views are disabled the same way as on timeout."""
+
+    def __init__(self, max_sessions: int = 5000, max_bytes: int = 64 * 1024 * 1024):
+        """Initializes the registry.
+
+        Parameters
+        ------------
+        max_sessions: int
+            The maximum number of live views.
+        max_bytes: int
+            The maximum estimated memory of all live views in bytes."""
+        self.max_sessions: int = max_sessions
+        self.max_bytes: int = max_bytes
+        self.evictions: int = 0
+        self.total_bytes: int = 0
+        self._views: OrderedDict[str, TrackedView] = OrderedDict()
+        self._sessions: dict[str, TrackedView] = {}
+        self._sizes: dict[str, int] = {}
+        self._evictions: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def add(self, view: TrackedView) -> None:
+        """Starts tracking a view, evicting other views if the limits are exceeded.
+
+        Parameters
+        ------------
+        view: TrackedView
+            The view to track."""
+        view.registry = self
+        self._views[view.id] = view
+        if (session_id := getattr(view, "session_id", None)) is not None:
+            self._sessions[session_id] = view
+        self._update_size(view)
+        self._enforce_limits()
+
+    def touch(self, view: TrackedView) -> None:
+        """Marks a view as recently used and updates its estimated size.
+
+        Parameters
+        ------------
+        view: TrackedView
+            The view that was interacted with."""
+        if view.id not in self._views:
+            return
+        self._views.move_to_end(view.id)
+        self._update_size(view)
+        self._enforce_limits()
+
+    def remove(self, view: TrackedView) -> None:
+        """Stops tracking a view.
+
+        Parameters
+        ------------
+        view: TrackedView
+            The view to stop tracking."""
+        if self._views.pop(view.id, None) is not None:
+            self.total_bytes -= self._sizes.pop(view.id)
+            self._forget_session(view)
+
+    def stats(self) -> dict:
+        """Returns the current number of views per type and their estimated memory."""
+        counts = Counter(type(view).__name__ for view in self._views.values())
+        return {
+            "sessions": len(self._views),
+            "per_type": dict(counts),
+            "estimated_bytes": self.total_bytes,
+            "bytes_per_session": self.total_bytes // len(self._views) if self._views else 0,
+            "evictions": self.evictions
+        }
+
+    def latest(self, view_type: type[TrackedView], **attributes) -> TrackedView | None:
+        """Returns the most recently used view of a type whose attributes match.
+
+        Parameters
+        ------------
+        view_type: type[TrackedView]
+            The type of view to look for.
+        **attributes
+            The attribute values the view must have."""
+        for view in reversed(self._views.values()):
+            if isinstance(view, view_type) and all(getattr(view, name) == value
+                                                   for name, value in attributes.items()):
+                return view
+        return None
+
+    def session(self, session_id: str) -> TrackedView | None:
+        """Returns the live view of a persisted session, if there is one.
+
+        Parameters
+        ------------
+        session_id: str
+            The ID of the session."""
+        return self._sessions.get(session_id)
+
+    def _forget_session(self, view: TrackedView) -> None:
+        session_id = getattr(view, "session_id", None)
+        if session_id is not None and self._sessions.get(session_id) is view:
+            del self._sessions[session_id]
+
+    def sizes(self) -> dict[str, int]:
+        """Returns the estimated memory in bytes of each live view, keyed by view ID."""
+        return dict(self._sizes)
+
+    def _update_size(self, view: TrackedView) -> None:
+        size = view.estimated_size()
+        self.total_bytes += size - self._sizes.get(view.id, 0)
+        self._sizes[view.id] = size
+
+    def _enforce_limits(self) -> None:
+        while len(self._views) > 1 and (len(self._views) > self.max_sessions or self.total_bytes > self.max_bytes):
+            _, view = self._views.popitem(last=False)
+            self.total_bytes -= self._sizes.pop(view.id)
+            self._forget_session(view)
+            self.evictions += 1
+            view.registry = None
+            task = asyncio.create_task(self._evict(view))
+            self._evictions.add(task)
+            task.add_done_callback(self._evictions.discard)
+
+    @staticmethod
+    async def _evict(view: TrackedView) -> None:
+        try:
+            await view.on_timeout()
+        finally:
+            view.stop()
@@ -0,0 +1,5 @@
+import os
+import time
+
+IMPORT_STARTED: float = time.perf_counter()
+PROFILE_STARTUP: bool = os.environ.get("EMBED_TOOL_PROFILE_STARTUP") == "1"
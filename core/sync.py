@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+
+import discord
+
+
+def command_tree_hash(commands: list[discord.ApplicationCommand], application_id: int) -> str:
+    """Returns a deterministic hash of the application command tree.
+
+    Parameters
+    ------------
+    commands: list[discord.ApplicationCommand]
+        The commands to hash, including their options and permissions.
+    application_id: int
+        The ID of the application the commands are registered for."""
+    tree = sorted(
+        ({"guild_ids": command.guild_ids, **command.to_dict()} for command in commands),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    payload = json.dumps({"application_id": application_id, "commands": tree}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CommandSyncCache:
+    """Local record of the last synced command tree, used to skip redundant command syncs on startup."""
+
+    def __init__(self, path: str):
+        """Initializes the cache.
+
+        Parameters
+        ------------
+        path: str
+            The path of the JSON file storing the hash and command IDs."""
+        self.path: str = path
+
+    def restore(self, bot: discord.Bot, command_hash: str) -> bool:
+        """Assigns the stored command IDs if the command tree did not change since the last sync.
+
+        Parameters
+        ------------
+        bot: discord.Bot
+            The bot whose pending commands to restore.
+        command_hash: str
+            The hash of the current command tree.
+
+        Returns
+        ------------
+        bool
+            Whether the IDs were restored and the sync can be skipped."""
+        try:
+            with open(self.path) as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if cached.get("hash") != command_hash:
+            return False
+        commands = bot.pending_application_commands
+        ids = cached["ids"]
+        if any(f"{command.type}:{command.name}" not in ids for command in commands):
+            return False
+        for command in commands:
+            command.id = ids[f"{command.type}:{command.name}"]
+            bot._application_commands[command.id] = command
+        return True
+
+    def save(self, bot: discord.Bot, command_hash: str) -> None:
+        """Stores the hash and the IDs of the synced commands.
+
+        Parameters
+        ------------
+        bot: discord.Bot
+            The bot whose commands were synced.
+        command_hash: str
+            The hash of the synced command tree."""
+        ids = {f"{command.type}:{command.name}": command.id
+               for command in bot.pending_application_commands if command.id is not None}
+        with open(self.path, "w") as file:
+            json.dump({"hash": command_hash, "ids": ids}, file)
+
+    def clear(self) -> None:
+        """Forgets the last synced command tree so the next start syncs again."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,110 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import discord
+
+
+class ResponseProxy:
+    """Wraps an :class:`discord.InteractionResponse` so a late response still reaches the user after an auto-defer.
+
+    Responses are serialized with the watchdog. Once the watchdog deferred the interaction, ``send_message``
+    becomes a followup, ``edit_message`` edits the original response and ``defer`` is a no-op, so callbacks don't
+    need to know whether they were deferred."""
+
+    def __init__(self, interaction: discord.Interaction, response: discord.InteractionResponse):
+        """Initializes the proxy.
+
+        Parameters
+        ------------
+        interaction: discord.Interaction
+            The interaction the response belongs to.
+        response: discord.InteractionResponse
+            The wrapped response."""
+        self.interaction: discord.Interaction = interaction
+        self.response: discord.InteractionResponse = response
+        self.auto_deferred: bool = False
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    def __getattr__(self, name: str):
+        return getattr(self.response, name)
+
+    def is_done(self) -> bool:
+        return self.response.is_done()
+
+    async def auto_defer(self) -> bool:
+        """Defers the interaction unless it was responded to already.
+
+        Returns
+        ------------
+        bool
+            Whether the interaction was deferred."""
+        async with self._lock:
+            if self.response.is_done():
+                return False
+            await self.response.defer(ephemeral=True)
+            self.auto_deferred = True
+            return True
+
+    async def defer(self, *args, **kwargs) -> None:
+        async with self._lock:
+            if not self.auto_deferred:
+                await self.response.defer(*args, **kwargs)
+
+    async def send_message(self, *args, **kwargs):
+        async with self._lock:
+            if not self.auto_deferred:
+                return await self.response.send_message(*args, **kwargs)
+        kwargs.pop("delete_after", None)
+        return await self.interaction.followup.send(*args, **kwargs)
+
+    async def edit_message(self, *args, **kwargs):
+        async with self._lock:
+            if not self.auto_deferred:
+                return await self.response.edit_message(*args, **kwargs)
+        return await self.interaction.edit_original_response(*args, **kwargs)
+
+    async def send_modal(self, modal: discord.ui.Modal):
+        async with self._lock:
+            return await self.response.send_modal(modal)
+
+
+@asynccontextmanager
+async def deadline_guard(interaction: discord.Interaction, budget: float):
+    """Defers the interaction if the ``with`` block did not respond to it within the budget.
+
+    Installs a :class:`ResponseProxy` as the interaction's response, so the rest of the block transparently
+    switches to followups and edits of the original response.
+
+    Parameters
+    ------------
+    interaction: discord.Interaction
+        The interaction to guard.
+    budget: float
+        The number of seconds to wait for a response before deferring. Non-positive values disable the guard."""
+    if budget <= 0 or interaction.response.is_done():
+        yield
+        return
+    response = interaction.response
+    if not isinstance(response, ResponseProxy):
+        response = ResponseProxy(interaction, response)
+        interaction._cs_response = response
+
+    expired = False
+
+    async def watch() -> None:
+        nonlocal expired
+        await asyncio.sleep(budget)
+        expired = True
+        if await response.auto_defer():
+            metrics = getattr(interaction.client, "metrics", None)
+            if metrics is not None:
+                metrics.increment("auto_deferred_total")
+
+    watchdog = asyncio.create_task(watch())
+    try:
+        yield
+    finally:
+        if expired:
+            await watchdog
+        else:
+            watchdog.cancel()
@@ -1,3 +1,5 @@
+import os
+
 import dotenv
 
 import core
@@ -5,4 +7,13 @@ import core
 dotenv.load_dotenv(".env")
 
 if __name__ == "__main__":
-    core.EmbedTool().run("EMBED_TOOL_TOKEN")
+    clusters = int(os.environ.get("EMBED_TOOL_CLUSTERS", 0))
+    shard_count = int(os.environ["EMBED_TOOL_SHARD_COUNT"]) if os.environ.get("EMBED_TOOL_SHARD_COUNT") else None
+    if clusters > 1:
+        from core.cluster import launch
+
+        launch("EMBED_TOOL_TOKEN", clusters, shard_count)
+    elif clusters == 1 or shard_count is not None:
+        core.AutoShardedEmbedTool(shard_count=shard_count).run("EMBED_TOOL_TOKEN")
+    else:
+        core.EmbedTool().run("EMBED_TOOL_TOKEN")
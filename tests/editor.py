@@ -0,0 +1,29 @@
+"""Helpers driving an editor session with the fake bot of the session benchmark."""
+from benchmarks.sessions import FakeBot, FakeContext, FakeGuild, FakeInteraction, FakeMember, Recorder, click
+from cogs.threads import Embeds
+
+
+async def open_editor():
+    bot = FakeBot(0)
+    guild = FakeGuild(0)
+    user = FakeMember("User")
+    ctx = FakeContext(bot, guild, user)
+    await Embeds.embed_send.callback(Embeds(bot), ctx, None)
+    recorder = Recorder()
+
+    async def modal(button: str, *values: str) -> FakeInteraction:
+        opened = await click(recorder, bot, guild, user, ctx.view, button)
+        interaction = FakeInteraction(bot, guild, user)
+        for child, value in zip(opened.response.modal.children, values):
+            child.value = value
+        await opened.response.modal.callback(interaction)
+        return interaction
+
+    async def view_click(view, name: str, values: list[str] | None = None) -> FakeInteraction:
+        return await click(recorder, bot, guild, user, view, name, values)
+
+    return ctx.view, modal, view_click, recorder, bot, guild, user
+
+
+def fields_of(draft) -> list[tuple[str, str]]:
+    return [(field.name, field.value) for field in draft.fields]
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.sessions import FakeInteraction
+from core import EmbedDraft, import_drafts
+from core.draft import (EMBED_COUNT_LIMIT, FIELD_COUNT_LIMIT, FIELD_NAME_LIMIT, FIELD_VALUE_LIMIT, TEXT_LIMITS,
+                        TOTAL_LIMIT, DraftHistory)
+from editor import fields_of, open_editor
+
+
+@pytest.mark.parametrize("attribute", ["title", "description", "footer_text", "author_name"])
+def test_text_limit(attribute):
+    draft = EmbedDraft()
+    limit = TEXT_LIMITS[attribute]
+    assert draft.check(attribute, "x" * limit) is None
+    assert draft.check(attribute, "x" * (limit + 1)) is not None
+
+
+def expected_length(draft: EmbedDraft) -> int:
+    texts = [getattr(draft, attribute) or "" for attribute in TEXT_LIMITS]
+    return sum(map(len, texts)) + sum(len(field.name) + len(field.value) for field in draft.fields)
+
+
+def test_length_tracks_field_changes_and_undo():
+    draft = EmbedDraft()
+    draft.history = DraftHistory()
+    draft.title = "Title"
+    draft.add_field("First", "value", True)
+    draft.add_field("Second", "value", True)
+    draft.history.checkpoint()
+    lengths = [draft.length]
+    draft.set_field_at(0, "Replaced", "a longer value", False)
+    draft.history.checkpoint()
+    lengths.append(draft.length)
+    draft.remove_field(1)
+    assert draft.length == expected_length(draft) == 27
+    assert draft.history.undo(draft)
+    assert draft.length == expected_length(draft) == lengths[1]
+    assert draft.history.undo(draft)
+    assert draft.length == expected_length(draft) == lengths[0]
+    assert draft.history.redo(draft)
+    assert draft.length == expected_length(draft) == lengths[1]
+
+
+def test_modals_reject_fields_over_the_total_limit():
+    async def run():
+        editor, modal, view_click, recorder, bot, guild, user = await open_editor()
+        await modal("set_description", "x" * 4000)
+        await modal("set_title", "x" * TEXT_LIMITS["title"])
+        await modal("add_field", "x" * FIELD_NAME_LIMIT, "x" * FIELD_VALUE_LIMIT, "true")
+        await modal("add_field", "Small", "field", "true")
+        assert editor.draft.length == expected_length(editor.draft) == 5546
+        added = await modal("add_field", "x" * FIELD_NAME_LIMIT, "x" * FIELD_VALUE_LIMIT, "true")
+        assert added.response.message["embed"].title == "Embed Limit Reached"
+        opened = await view_click(editor, "edit_field")
+        picked = await view_click(opened.followup.view, "edit_field", ["1"])
+        edited = FakeInteraction(bot, guild, user)
+        for child, value in zip(picked.response.modal.children, ("Small", "x" * 500, "true")):
+            child.value = value
+        await picked.response.modal.callback(edited)
+        assert edited.response.message["embed"].title == "Embed Limit Reached"
+        assert fields_of(editor.draft)[1] == ("Small", "field")
+        assert editor.draft.length == expected_length(editor.draft) == 5546
+
+    asyncio.run(run())
+
+
+def test_field_name_limit():
+    draft = EmbedDraft()
+    assert draft.check_field("x" * FIELD_NAME_LIMIT, "value") is None
+    assert draft.check_field("x" * (FIELD_NAME_LIMIT + 1), "value") is not None
+
+
+def test_field_value_limit():
+    draft = EmbedDraft()
+    assert draft.check_field("name", "x" * FIELD_VALUE_LIMIT) is None
+    assert draft.check_field("name", "x" * (FIELD_VALUE_LIMIT + 1)) is not None
+
+
+def test_field_count_limit():
+    draft = EmbedDraft()
+    for index in range(FIELD_COUNT_LIMIT - 1):
+        draft.add_field(f"Field {index}", "value", True)
+    assert draft.check_field("name", "value") is None
+    draft.add_field("Last", "value", True)
+    assert draft.check_field("name", "value") is not None
+    assert draft.check_field("name", "value", index=0) is None
+
+
+def test_total_limit():
+    draft = EmbedDraft()
+    draft.description = "x" * 4000
+    draft.title = "x" * 200
+    remaining = TOTAL_LIMIT - draft.length
+    assert draft.check("footer_text", "x" * remaining) is None
+    assert draft.check("footer_text", "x" * (remaining + 1)) is not None
+    draft.footer_text = "x" * (remaining - 50)
+    assert draft.check_field("x" * 10, "x" * 40) is None
+    assert draft.check_field("x" * 10, "x" * 41) is not None
+
+
+def test_total_limit_tracks_replaced_text():
+    draft = EmbedDraft()
+    draft.description = "x" * 4096
+    draft.footer_text = "x" * 1904
+    assert draft.length == TOTAL_LIMIT
+    assert draft.check("description", "x" * 10) is None
+    assert draft.check("title", "x") is not None
+
+
+def test_embed_count_limit():
+    embed = {"title": "Title"}
+    assert len(import_drafts(json.dumps([embed] * EMBED_COUNT_LIMIT))) == EMBED_COUNT_LIMIT
+    with pytest.raises(ValueError):
+        import_drafts(json.dumps([embed] * (EMBED_COUNT_LIMIT + 1)))
+
+
+def test_import_total_limit_spans_all_embeds():
+    embed = {"description": "x" * 4000}
+    assert len(import_drafts(json.dumps([{"description": "x" * 3000}] * 2))) == 2
+    with pytest.raises(ValueError):
+        import_drafts(json.dumps([embed] * 2))
@@ -0,0 +1,41 @@
+import asyncio
+
+from benchmarks.sessions import FakeInteraction
+from core.embedTool import EMPTY_EMBED_HINT
+from editor import open_editor
+
+
+def test_new_embed_starts_empty_and_is_not_sent():
+    async def run():
+        editor, modal, view_click, recorder, bot, guild, user = await open_editor()
+        await view_click(editor, "new_embed")
+        assert editor.draft.empty
+        assert editor.render()[0].description == EMPTY_EMBED_HINT
+        sent = []
+        send = guild.channel.send
+
+        async def record(*args, **kwargs):
+            sent.append(kwargs["embeds"])
+            return await send(*args, **kwargs)
+
+        guild.channel.send = record
+        await view_click(editor, "send_embed")
+        assert len(sent) == 1 and len(sent[0]) == 1
+        assert sent[0][0].description != EMPTY_EMBED_HINT
+
+    asyncio.run(run())
+
+
+def test_stale_title_modal_is_rejected_after_switching_embeds():
+    async def run():
+        editor, modal, view_click, recorder, bot, guild, user = await open_editor()
+        first = editor.draft
+        opened = await view_click(editor, "set_title")
+        await view_click(editor, "new_embed")
+        submitted = FakeInteraction(bot, guild, user)
+        opened.response.modal.children[0].value = "Changed"
+        await opened.response.modal.callback(submitted)
+        assert submitted.response.message["embed"].title == "Error"
+        assert first.title != "Changed" and editor.draft.title is None
+
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+import asyncio
+
+from benchmarks.sessions import FakeInteraction, submit
+from editor import fields_of, open_editor
+
+
+def test_stale_bulk_edit_is_rejected_after_switching_embeds():
+    async def run():
+        editor, modal, view_click, recorder, bot, guild, user = await open_editor()
+        await modal("add_field", "First", "1", "true")
+        first = editor.draft
+        opened = await view_click(editor, "edit_field")
+        bulk = await view_click(opened.followup.view, "edit_all_fields")
+        await view_click(editor, "new_embed")
+        await modal("add_field", "Second", "2", "true")
+        second = editor.draft
+        submitted = FakeInteraction(bot, guild, user)
+        await bulk.response.modal.callback(submitted)
+        assert submitted.response.message["embed"].title == "Error"
+        assert fields_of(first) == [("First", "1")]
+        assert fields_of(second) == [("Second", "2")]
+
+    asyncio.run(run())
+
+
+def test_stale_remove_select_is_rejected_after_switching_embeds():
+    async def run():
+        editor, modal, view_click, *_ = await open_editor()
+        await modal("add_field", "First", "1", "true")
+        opened = await view_click(editor, "remove_field")
+        await view_click(editor, "new_embed")
+        await modal("add_field", "Second", "2", "true")
+        removed = await view_click(opened.followup.view, "remove_field", ["0"])
+        assert removed.response.message["embed"].title == "Error"
+        assert [fields_of(draft) for draft in editor.drafts] == [[("First", "1")], [("Second", "2")]]
+
+    asyncio.run(run())
+
+
+def test_stale_edit_modal_is_rejected_after_the_fields_changed():
+    async def run():
+        editor, modal, view_click, recorder, bot, guild, user = await open_editor()
+        await modal("add_field", "First", "1", "true")
+        await modal("add_field", "Second", "2", "true")
+        opened = await view_click(editor, "edit_field")
+        picked = await view_click(opened.followup.view, "edit_field", ["1"])
+        removing = await view_click(editor, "remove_field")
+        await view_click(removing.followup.view, "remove_field", ["0"])
+        submitted = FakeInteraction(bot, guild, user)
+        for child, value in zip(picked.response.modal.children, ("Edited", "value", "true")):
+            child.value = value
+        await picked.response.modal.callback(submitted)
+        assert submitted.response.message["embed"].title == "Error"
+        assert fields_of(editor.draft) == [("Second", "2")]
+
+    asyncio.run(run())
+
+
+def test_modal_applies_to_its_draft_after_switching_back():
+    async def run():
+        editor, modal, view_click, recorder, bot, guild, user = await open_editor()
+        await modal("add_field", "First", "1", "true")
+        opened = await view_click(editor, "edit_field")
+        reorder = await view_click(opened.followup.view, "reorder_fields")
+        await view_click(editor, "new_embed")
+        await view_click(editor, "cycle_embed")
+        await submit(recorder, bot, guild, user, reorder, "1")
+        assert editor.index == 0
+        assert fields_of(editor.draft) == [("First", "1")]
+
+    asyncio.run(run())
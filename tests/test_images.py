@@ -0,0 +1,98 @@
+import asyncio
+
+from aiohttp import web
+
+from core.images import ImageValidator
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+async def serve(requests: list[tuple[str, str]]) -> tuple[web.AppRunner, str]:
+    async def image(request):
+        requests.append((request.method, request.path))
+        return web.Response(body=PNG, content_type="image/png")
+
+    async def page(request):
+        requests.append((request.method, request.path))
+        return web.Response(text="<html></html>", content_type="text/html")
+
+    async def no_head(request):
+        requests.append((request.method, request.path))
+        if request.method == "HEAD":
+            return web.Response(status=405)
+        return web.Response(body=PNG, content_type="image/png")
+
+    async def private(request):
+        requests.append((request.method, request.path))
+        raise web.HTTPFound("http://169.254.169.254/latest/meta-data")
+
+    async def local(request):
+        requests.append((request.method, request.path))
+        raise web.HTTPFound("/image.png")
+
+    app = web.Application()
+    for path, handler in (("/image.png", image), ("/page", page), ("/no-head.png", no_head),
+                          ("/private", private), ("/local", local)):
+        app.router.add_route("*", path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+def check(*urls: str, **kwargs) -> tuple[list, list[tuple[str, str]]]:
+    async def run():
+        requests = []
+        runner, base = await serve(requests)
+        validator = ImageValidator(allowed_networks=["127.0.0.1/32"], **kwargs)
+        try:
+            results = []
+            for url in urls:
+                if url == "sleep":
+                    await asyncio.sleep(0.1)
+                else:
+                    results.append(await validator.validate(base + url))
+            return results, requests
+        finally:
+            await validator.close()
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+def test_non_images_are_rejected():
+    results, _ = check("/page", "/image.png")
+    assert results == ["The URL points to text/html, not an image.", None]
+
+
+def test_refused_head_falls_back_to_get():
+    results, requests = check("/no-head.png")
+    assert results == [None]
+    assert requests == [("HEAD", "/no-head.png"), ("GET", "/no-head.png")]
+
+
+def test_redirects_to_private_addresses_are_rejected():
+    results, requests = check("/private", "/local")
+    assert results == ["The image URL could not be reached.", None]
+    assert requests == [("HEAD", "/private"), ("HEAD", "/local"), ("HEAD", "/image.png")]
+
+
+def test_loopback_is_rejected_unless_allowed():
+    async def run():
+        requests = []
+        runner, base = await serve(requests)
+        validator = ImageValidator()
+        try:
+            return await validator.validate(base + "/image.png"), requests
+        finally:
+            await validator.close()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == ("The image URL could not be reached.", [])
+
+
+def test_results_are_cached_until_they_expire():
+    _, requests = check("/image.png", "/image.png")
+    assert requests == [("HEAD", "/image.png")]
+    _, requests = check("/image.png", "sleep", "/image.png", ttl=0.05)
+    assert requests == [("HEAD", "/image.png")] * 2
@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+
+from core.scheduler import PREVIEW, PUBLISH, OutboundScheduler
+
+
+def test_pending_requests_with_the_same_key_are_coalesced():
+    async def run():
+        scheduler = OutboundScheduler({"webhook": (1000.0, 1)})
+        sent = []
+        release = asyncio.Event()
+
+        async def blocking():
+            await release.wait()
+            sent.append(0)
+            return 0
+
+        def request(value):
+            async def send():
+                sent.append(value)
+                return value
+            return send
+
+        first = asyncio.create_task(scheduler.submit(("webhook", 1), blocking, PREVIEW, key="preview"))
+        await asyncio.sleep(0)
+        later = [asyncio.create_task(scheduler.submit(("webhook", 1), request(i), PREVIEW, key="preview"))
+                 for i in range(1, 4)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await first == 0
+        assert await asyncio.gather(*later) == [3, 3, 3]
+        assert sent == [0, 3]
+        assert scheduler.coalesced == 2
+
+    asyncio.run(run())
+
+
+def test_token_bucket_paces_requests():
+    async def run():
+        scheduler = OutboundScheduler({"channel": (20.0, 1)})
+        sent = []
+
+        async def request():
+            sent.append(time.monotonic())
+
+        await asyncio.gather(*(scheduler.submit(("channel", 1), request) for _ in range(4)))
+        gaps = [b - a for a, b in zip(sent, sent[1:])]
+        assert len(gaps) == 3 and min(gaps) >= 0.045
+
+    asyncio.run(run())
+
+
+def test_rate_limited_requests_wait_for_retry_after():
+    async def run():
+        calls = []
+
+        async def handler(request):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                return web.Response(status=429, headers={"Retry-After": "0.2"})
+            return web.Response(text="ok")
+
+        app = web.Application()
+        app.router.add_post("/messages", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        scheduler = OutboundScheduler({"channel": (1000.0, 5)})
+        try:
+            async with aiohttp.ClientSession(raise_for_status=True) as session:
+                async def request():
+                    async with session.post(f"http://127.0.0.1:{port}/messages") as response:
+                        return await response.text()
+
+                assert await scheduler.submit(("channel", 1), request) == "ok"
+        finally:
+            await runner.cleanup()
+        assert len(calls) == 2 and calls[1] - calls[0] >= 0.18
+        assert scheduler.rate_limited == 1 and scheduler.failed == 0
+
+    asyncio.run(run())
+
+
+def test_publishes_overtake_previews_of_other_buckets():
+    async def run():
+        scheduler = OutboundScheduler({"channel": (1000.0, 5), "webhook": (1000.0, 5)}, max_in_flight=1)
+        order = []
+        release = asyncio.Event()
+
+        async def blocking():
+            await release.wait()
+
+        def request(name):
+            async def send():
+                order.append(name)
+            return send
+
+        busy = asyncio.create_task(scheduler.submit(("channel", 1), blocking))
+        await asyncio.sleep(0)
+        preview = asyncio.create_task(scheduler.submit(("webhook", 2), request("preview"), PREVIEW))
+        await asyncio.sleep(0)
+        publish = asyncio.create_task(scheduler.submit(("channel", 3), request("publish"), PUBLISH))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(busy, preview, publish)
+        assert order == ["publish", "preview"]
+
+    asyncio.run(run())